@@ -0,0 +1,133 @@
+"""
+Async counterparts of the crud functions, for `async def` endpoints.
+
+Each function runs the matching sync implementation on the AsyncSession's
+greenlet-backed sync session (`AsyncSession.run_sync`), so queries, rollup
+maintenance and validation stay in one place while every round trip goes
+through the async driver (aiosqlite / asyncpg).
+
+run_sync executes that code on the event-loop thread; only the driver's I/O
+yields. So nothing else that blocks may run inside it:
+
+- the summary cache is read and filled by awaited calls around run_sync, and
+  writes defer their cache invalidation until run_sync returns (see cache.py);
+- create_user takes a hash computed on the password pool (passwords.py).
+"""
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import cache, crud, rollups, schemas, singleflight
+from .database import AsyncSessionLocal
+
+# Coroutines asking for the same summary share one run_sync round trip
+summary_flights = singleflight.AsyncGroup()
+
+
+async def _summary(db: AsyncSession, user_id: int, kind: str, period: cache.Period, compute) -> dict:
+    """Cached summary, computed once for all concurrent callers.
+
+    The flight outlives any one caller, so it runs on a session of its own
+    (on the caller's engine) rather than on the request session of whichever
+    caller happened to start it.
+    """
+    async def from_rollups() -> dict:
+        async with AsyncSessionLocal(bind=db.bind) as session:
+            return await session.run_sync(compute, user_id, *period)
+
+    return await summary_flights.do(
+        (user_id, kind, period), lambda: cache.summaries.get_or_compute_async(user_id, kind, period, from_rollups),
+    )
+
+
+async def _write(db: AsyncSession, fn, *args):
+    """run_sync for a committing crud function; cache invalidation is awaited afterwards."""
+    db.sync_session.info[cache.DEFER_INVALIDATION] = True
+    try:
+        return await db.run_sync(fn, *args)
+    finally:
+        db.sync_session.info.pop(cache.DEFER_INVALIDATION, None)
+        await cache.invalidate_committed(db.sync_session)
+
+
+# ── Users ─────────────────────────────────────────────────────────────────────
+
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.run_sync(crud.get_user, user_id)
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.run_sync(crud.get_user_by_email, email)
+
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str):
+    """`hashed_password` is required: hashing inline here would block the event loop."""
+    return await _write(db, crud.create_user, user, hashed_password)
+
+
+async def update_password_hash(db: AsyncSession, user_id: int, hashed_password: str):
+    return await _write(db, crud.update_password_hash, user_id, hashed_password)
+
+
+# ── Expenses ──────────────────────────────────────────────────────────────────
+
+async def get_expense(db: AsyncSession, expense_id: int):
+    return await db.run_sync(crud.get_expense, expense_id)
+
+
+async def get_expenses(db: AsyncSession, user_id: int, **filters):
+    return await db.run_sync(crud.get_expenses, user_id, **filters)
+
+
+async def create_expense(db: AsyncSession, expense: schemas.ExpenseCreate, user_id: int):
+    return await _write(db, crud.create_expense, expense, user_id)
+
+
+async def update_expense(db: AsyncSession, expense_id: int, expense: schemas.ExpenseUpdate, user_id: int):
+    return await _write(db, crud.update_expense, expense_id, expense, user_id)
+
+
+async def delete_expense(db: AsyncSession, expense_id: int, user_id: int):
+    return await _write(db, crud.delete_expense, expense_id, user_id)
+
+
+async def get_expense_summary(
+    db: AsyncSession,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    period_label: str = "",
+) -> dict:
+    return await _summary(db, user_id, "expense", (start_date, end_date, period_label), rollups.expense_summary)
+
+
+# ── Invoices ──────────────────────────────────────────────────────────────────
+
+async def get_invoice(db: AsyncSession, invoice_id: int):
+    return await db.run_sync(crud.get_invoice, invoice_id)
+
+
+async def get_invoices(db: AsyncSession, user_id: int, **filters):
+    return await db.run_sync(crud.get_invoices, user_id, **filters)
+
+
+async def create_invoice(db: AsyncSession, invoice: schemas.InvoiceCreate, user_id: int):
+    return await _write(db, crud.create_invoice, invoice, user_id)
+
+
+async def update_invoice(db: AsyncSession, invoice_id: int, invoice: schemas.InvoiceUpdate, user_id: int):
+    return await _write(db, crud.update_invoice, invoice_id, invoice, user_id)
+
+
+async def delete_invoice(db: AsyncSession, invoice_id: int, user_id: int):
+    return await _write(db, crud.delete_invoice, invoice_id, user_id)
+
+
+async def get_invoice_summary(
+    db: AsyncSession,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    period_label: str = "",
+) -> dict:
+    return await _summary(db, user_id, "invoice", (start_date, end_date, period_label), rollups.invoice_summary)
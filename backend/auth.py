@@ -1,5 +1,9 @@
+import threading
+import time
+import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 from jose import JWTError, jwt
 import bcrypt
@@ -10,6 +14,7 @@ from fastapi.security import OAuth2PasswordBearer
 from . import crud, schemas
 from .config import settings
 from .database import get_db
+from .lru import LRUCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 
@@ -22,19 +27,90 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(
-        password.encode("utf-8"), bcrypt.gensalt()
+        password.encode("utf-8"), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     ).decode("utf-8")
 
 
+def token_claims(user) -> dict:
+    """Claims identifying `user`; in stateless mode they carry the profile too."""
+    claims = {"sub": user.email, "uid": user.id}
+    if settings.AUTH_STATELESS:
+        claims["usr"] = {
+            "name": user.name,
+            "business_name": user.business_name,
+            "phone": user.phone,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+        }
+    return claims
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+# ── Resolved-user cache ───────────────────────────────────────────────────────
+
+class UserCache:
+    """Bounded LRU of users resolved from tokens, keyed by (sub, jti), with a TTL.
+
+    Entries are detached `schemas.User` snapshots. crud.update_user drops a
+    user's entries in this process; other workers see the change within the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: LRUCache[Tuple[str, Optional[str]], schemas.User] = LRUCache(
+            max_entries, ttl_seconds, clock, on_evict=self._unindex,
+        )
+        self._by_user = defaultdict(set)  # user id -> {key}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _unindex(self, key, user: schemas.User):
+        keys = self._by_user[user.id]
+        keys.discard(key)
+        if not keys:
+            del self._by_user[user.id]
+
+    def _drop(self, key):
+        user = self._entries.pop(key)
+        if user is not None:
+            self._unindex(key, user)
+
+    def get(self, key) -> Optional[schemas.User]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, user: schemas.User):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._drop(key)
+            self._by_user[user.id].add(key)
+            self._entries.set(key, user)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+
 def authenticate_user(db: Session, email: str, password: str):
     user = crud.get_user_by_email(db, email=email)
     if not user or not verify_password(password, user.hashed_password):
@@ -42,9 +118,11 @@ def authenticate_user(db: Session, email: str, password: str):
     return user
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ):
+    # Plain def: FastAPI runs it in the threadpool, so the blocking lookup
+    # never stalls the event loop of async endpoints that depend on it.
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -58,7 +136,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = crud.get_user_by_email(db, email=email)
+    # Stateless tokens carry the profile: no lookup at all
+    if settings.AUTH_STATELESS and "usr" in payload and "uid" in payload:
+        return schemas.User(id=payload["uid"], email=email, **payload["usr"])
+
+    key = (email, payload.get("jti"))
+    user = user_cache.get(key)
     if user is None:
-        raise credentials_exception
+        db_user = crud.get_user_by_email(db, email=email)
+        if db_user is None:
+            raise credentials_exception
+        user = schemas.User.model_validate(db_user)
+        user_cache.set(key, user)
     return user
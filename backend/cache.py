@@ -0,0 +1,349 @@
+"""
+Per-tenant cache for expense and invoice summaries.
+
+Entries are keyed by (owner_id, kind, period), where kind is "expense" or
+"invoice" and period is (start_date, end_date, label). rollups.py notes the
+(owner, kind, day) of every rollup row a write changes on the session; when that
+session commits, only the cached summaries whose date range contains one of
+those days are dropped. A rolled-back write drops nothing.
+
+The backend is picked with SUMMARY_CACHE_URL:
+
+    memory://              per-process LRU with a TTL (default)
+    redis://host:6379/0    shared by every worker; any Redis-compatible server
+    none                   no caching
+
+The TTL only bounds staleness for writes made outside this process's sessions,
+e.g. `python -m backend.rollups rebuild` against a running app with the memory
+backend.
+
+Async callers (async_crud.py) use get_or_compute_async and defer a session's
+invalidation until after run_sync (DEFER_INVALIDATION, invalidate_committed),
+so a Redis round trip runs in a worker thread instead of on the event loop.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# (start_date, end_date, label)
+Period = Tuple[date, date, str]
+
+KINDS = ("expense", "invoice")
+
+# Session.info key for the (owner_id, kind, day) triples touched by pending writes
+_TOUCHED = "summary_cache_touched"
+# Session.info flag: commits leave their triples under _COMMITTED for invalidate_committed()
+DEFER_INVALIDATION = "summary_cache_defer"
+_COMMITTED = "summary_cache_committed"
+
+
+def _covers(period: Period, days: Iterable[Optional[date]]) -> bool:
+    start, end = period[0], period[1]
+    return any(day is None or start <= day <= end for day in days)
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+class MemoryBackend:
+    """Per-process LRU with a TTL. Safe to share between threadpool workers."""
+
+    name = "memory"
+    blocking = False  # no I/O: cheap enough to call on the event loop
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: LRUCache[tuple, dict] = LRUCache(max_entries, ttl_seconds, clock, on_evict=self._unindex)
+        self._index = defaultdict(set)  # (owner_id, kind) -> {period}
+        # (owner_id, kind) -> value of a process-wide counter at its last invalidation,
+        # at most max_entries of them; owners without one report the highest evicted value
+        self._generations: "OrderedDict[tuple, int]" = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _unindex(self, key: tuple, value: Optional[dict] = None):
+        periods = self._index.get(key[:2])
+        if periods is not None:
+            periods.discard(key[2])
+            if not periods:
+                del self._index[key[:2]]
+
+    def _drop(self, key: tuple):
+        self._entries.pop(key)
+        self._unindex(key)
+
+    def _generation(self, owner_kind: tuple) -> int:
+        return self._generations.get(owner_kind, self._floor)
+
+    def generation(self, owner_id: int, kind: str) -> int:
+        with self._lock:
+            return self._generation((owner_id, kind))
+
+    def get(self, owner_id: int, kind: str, period: Period) -> Optional[dict]:
+        with self._lock:
+            return self._entries.get((owner_id, kind, period))
+
+    def set(self, owner_id: int, kind: str, period: Period, value: dict, generation: int):
+        key = (owner_id, kind, period)
+        with self._lock:
+            if self._generation((owner_id, kind)) != generation:
+                return  # invalidated while the value was being computed
+            self._index[(owner_id, kind)].add(period)
+            self._entries.set(key, value)
+
+    def invalidate(self, owner_id: int, kind: str, days: Iterable[Optional[date]]):
+        days = list(days)
+        with self._lock:
+            self._counter += 1
+            self._generations[(owner_id, kind)] = self._counter
+            self._generations.move_to_end((owner_id, kind))
+            while len(self._generations) > self.max_entries:
+                # An evicted owner reports at least its own generation, so a
+                # value computed before its invalidation is still refused
+                self._floor = max(self._floor, self._generations.popitem(last=False)[1])
+            for period in [p for p in self._index.get((owner_id, kind), ()) if _covers(p, days)]:
+                self._drop((owner_id, kind, period))
+
+    def clear(self):
+        with self._lock:
+            self._counter += 1
+            self._floor = self._counter  # newer than any generation read so far
+            self._generations.clear()
+            self._entries.clear()
+            self._index.clear()
+
+
+class RedisBackend:
+    """Cache shared through a Redis-compatible server (needs the `redis` package).
+
+    Each entry is a JSON string with a server-side TTL; a set per (owner, kind)
+    indexes the cached periods so a write can find the ones it covers. LRU
+    eviction is left to the server's maxmemory-policy.
+    """
+
+    name = "redis"
+    blocking = True  # network round trips: async callers run them in a thread
+
+    def __init__(self, client, ttl_seconds: float, prefix: str = "vyapar:summary"):
+        self._client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl_seconds: float) -> "RedisBackend":
+        import redis  # optional dependency, only needed for this backend
+
+        return cls(redis.Redis.from_url(url), ttl_seconds)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=f"{self.prefix}:*:entry:*"))
+
+    def _key(self, owner_id: int, kind: str, suffix: str) -> str:
+        return f"{self.prefix}:{owner_id}:{kind}:{suffix}"
+
+    def _entry_key(self, owner_id: int, kind: str, period: Period) -> str:
+        return self._key(owner_id, kind, f"entry:{period[0].isoformat()}:{period[1].isoformat()}:{period[2]}")
+
+    @staticmethod
+    def _period(entry_key: str) -> Period:
+        start, end, label = entry_key.split(":entry:", 1)[1].split(":", 2)
+        return date.fromisoformat(start), date.fromisoformat(end), label
+
+    def generation(self, owner_id: int, kind: str) -> int:
+        return int(self._client.get(self._key(owner_id, kind, "gen")) or 0)
+
+    def get(self, owner_id: int, kind: str, period: Period) -> Optional[dict]:
+        raw = self._client.get(self._entry_key(owner_id, kind, period))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, owner_id: int, kind: str, period: Period, value: dict, generation: int):
+        from redis.exceptions import WatchError
+
+        gen_key, index_key = self._key(owner_id, kind, "gen"), self._key(owner_id, kind, "index")
+        entry_key = self._entry_key(owner_id, kind, period)
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(gen_key)
+                if int(pipe.get(gen_key) or 0) != generation:
+                    return  # invalidated while the value was being computed
+                pipe.multi()
+                pipe.set(entry_key, json.dumps(value), ex=self.ttl_seconds)
+                pipe.sadd(index_key, entry_key)
+                pipe.expire(index_key, self.ttl_seconds)
+                pipe.execute()
+            except WatchError:
+                pass  # a write landed between the check and the store
+
+    def invalidate(self, owner_id: int, kind: str, days: Iterable[Optional[date]]):
+        days = list(days)
+        index_key = self._key(owner_id, kind, "index")
+        stale = [
+            member for member in (m.decode() if isinstance(m, bytes) else m for m in self._client.smembers(index_key))
+            if _covers(self._period(member), days)
+        ]
+        pipe = self._client.pipeline()
+        pipe.incr(self._key(owner_id, kind, "gen"))
+        if stale:
+            pipe.delete(*stale)
+            pipe.srem(index_key, *stale)
+        pipe.execute()
+
+    def clear(self):
+        for key in self._client.scan_iter(match=f"{self.prefix}:*"):
+            key = key.decode() if isinstance(key, bytes) else key
+            if key.endswith(":gen"):
+                self._client.incr(key)
+            else:
+                self._client.delete(key)
+
+
+def make_backend(url: str, max_entries: int, ttl_seconds: float):
+    """Backend for a SUMMARY_CACHE_URL, or None to disable caching."""
+    if url in ("", "none"):
+        return None
+    if url.startswith("memory://"):
+        return MemoryBackend(max_entries, ttl_seconds)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(url, ttl_seconds)
+    raise ValueError(f"Unsupported SUMMARY_CACHE_URL: {url!r}")
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+class SummaryCache:
+    """Read-through summary cache with hit/miss counters for this process."""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, owner_id: int, kind: str, period: Period, compute: Callable[[], dict]) -> dict:
+        if self.backend is None:
+            return compute()
+        value = self.backend.get(owner_id, kind, period)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        # Read the generation first: a write committing during compute() bumps it
+        # and the value, possibly computed from the old rows, is not stored
+        generation = self.backend.generation(owner_id, kind)
+        value = compute()
+        self.backend.set(owner_id, kind, period, value, generation)
+        return value
+
+    async def _off_loop(self, fn, *args):
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get_or_compute_async(self, owner_id: int, kind: str, period: Period,
+                                   compute: Callable[[], Awaitable[dict]]) -> dict:
+        """get_or_compute for coroutines: blocking backends are called from a worker thread."""
+        if self.backend is None:
+            return await compute()
+        value = await self._off_loop(self.backend.get, owner_id, kind, period)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        generation = await self._off_loop(self.backend.generation, owner_id, kind)
+        value = await compute()
+        await self._off_loop(self.backend.set, owner_id, kind, period, value, generation)
+        return value
+
+    async def invalidate_async(self, touched: Iterable[Tuple[Optional[int], Optional[str], Optional[date]]]):
+        await self._off_loop(self.invalidate, touched)
+
+    def invalidate(self, touched: Iterable[Tuple[Optional[int], Optional[str], Optional[date]]]):
+        """Drop summaries covering any (owner_id, kind, day); None is a wildcard."""
+        if self.backend is None:
+            return
+        by_owner_kind = defaultdict(set)
+        for owner_id, kind, day in touched:
+            if owner_id is None:
+                self.backend.clear()
+                self.invalidations += 1
+                return
+            for k in (kind,) if kind else KINDS:
+                by_owner_kind[(owner_id, k)].add(day)
+        for (owner_id, kind), days in by_owner_kind.items():
+            self.backend.invalidate(owner_id, kind, days)
+        self.invalidations += len(by_owner_kind)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+        self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+summaries = SummaryCache(make_backend(
+    settings.SUMMARY_CACHE_URL, settings.SUMMARY_CACHE_MAX_ENTRIES, settings.SUMMARY_CACHE_TTL_SECONDS,
+))
+
+
+# ── Write-through invalidation ────────────────────────────────────────────────
+
+def touch(db: Session, kind: str, owner_days: Iterable[Tuple[Optional[int], Optional[date]]]):
+    """Note the (owner_id, day) pairs a pending write changes; owner None means everyone."""
+    db.info.setdefault(_TOUCHED, set()).update((owner_id, kind, day) for owner_id, day in owner_days)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    touched = session.info.pop(_TOUCHED, None)
+    if not touched:
+        return
+    if session.info.get(DEFER_INVALIDATION):
+        session.info.setdefault(_COMMITTED, set()).update(touched)
+        return
+    try:
+        summaries.invalidate(touched)
+    except Exception as e:
+        # The write is committed either way; the TTL bounds how stale a summary gets
+        logger.error(f"Summary cache invalidation failed: {type(e).__name__}: {e}")
+
+
+async def invalidate_committed(session: Session):
+    """Apply the invalidations that commits on `session` deferred (DEFER_INVALIDATION)."""
+    touched = session.info.pop(_COMMITTED, None)
+    if not touched:
+        return
+    try:
+        await summaries.invalidate_async(touched)
+    except Exception as e:
+        logger.error(f"Summary cache invalidation failed: {type(e).__name__}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session):
+    session.info.pop(_TOUCHED, None)
@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -6,13 +7,74 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Users resolved from tokens are cached per (sub, jti); 0 disables the cache
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    # Stateless: tokens carry the user id and profile, requests skip the lookup
+    # (profile edits show up in /me after the next login)
+    AUTH_STATELESS: bool = False
+    # bcrypt cost for new hashes; logins upgrade hashes made at another cost
+    BCRYPT_ROUNDS: int = 12
+    # Dedicated hashing pool for sign-up/login (see passwords.py); 0 = one per CPU
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    # Token buckets for sign-in/sign-up attempts (see ratelimit.py)
+    AUTH_RATE_LIMIT_ENABLED: bool = True
+    AUTH_RATE_PER_IP_PER_MINUTE: float = 30
+    AUTH_BURST_PER_IP: int = 10
+    AUTH_RATE_PER_EMAIL_PER_MINUTE: float = 6
+    AUTH_BURST_PER_EMAIL: int = 5
+    # Shared secret for GET /internal/stats (X-Stats-Token header); empty hides the endpoint
+    STATS_TOKEN: str = ""
 
     # Database (SQLite for dev, PostgreSQL for prod)
     DATABASE_URL: str = "sqlite:///./vyapar.db"
 
+    # Engine profile: "production" applies the pool and SQLite settings below,
+    # "default" leaves SQLAlchemy's and the driver's own defaults untouched
+    DB_PROFILE: str = "production"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds; keep below server/proxy idle timeouts
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
     # Gemini API (free tier: 15 RPM for pro, 60 RPM for flash)
     GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-2.5-flash-lite"
+    # Classify + extract text messages in one call (two calls when off or on failure)
+    LLM_COMBINED_EXTRACTION: bool = True
+    # Skip Gemini's intent call when the local classifier (see intents.py) is this sure
+    LOCAL_INTENT_ENABLED: bool = True
+    LOCAL_INTENT_THRESHOLD: float = 0.9
+    # Parse simple expense messages with rules (see extraction.py) before asking Gemini
+    LOCAL_EXTRACTION_ENABLED: bool = True
+    # Answer common GST questions from the offline index (see gst_kb.py) at this cosine score
+    GST_KB_ENABLED: bool = True
+    GST_KB_MIN_SCORE: float = 0.8
+    # Gemini response cache (see llm_cache.py): memory://, sqlite:///path/llm_cache.db or none
+    LLM_CACHE_URL: str = "memory://"
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    # Client-side Gemini rate limit (see llm_limiter.py); per worker process
+    GEMINI_RATE_LIMIT_ENABLED: bool = True
+    GEMINI_RPM: int = 15
+    GEMINI_BURST: int = 3  # must stay below GEMINI_RPM: the bucket refills at RPM - BURST
+    GEMINI_QUEUE_MAX: int = 50  # waiting calls per priority class
+
+    # Summary cache (see cache.py): memory://, redis://host:6379/0 or none
+    SUMMARY_CACHE_URL: str = "memory://"
+    SUMMARY_CACHE_TTL_SECONDS: int = 300
+    SUMMARY_CACHE_MAX_ENTRIES: int = 10000
+
+    # Background jobs (see scheduler.py)
+    SCHEDULER_ENABLED: bool = True
+    OVERDUE_CHECK_INTERVAL_SECONDS: int = 3600
+    # Delete tombstones are kept this long; older sync tokens get a full resync
+    SYNC_MAX_AGE_DAYS: int = 30
 
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
@@ -24,5 +86,14 @@ class Settings(BaseSettings):
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
+    @model_validator(mode="after")
+    def _check_gemini_rate_limit(self):
+        if self.GEMINI_RATE_LIMIT_ENABLED and self.GEMINI_RPM <= self.GEMINI_BURST:
+            # A refill rate of zero would let queued calls only ever time out
+            raise ValueError(
+                f"GEMINI_RPM ({self.GEMINI_RPM}) must be greater than GEMINI_BURST ({self.GEMINI_BURST})"
+            )
+        return self
+
 
 settings = Settings()
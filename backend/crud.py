@@ -1,11 +1,18 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from datetime import date, datetime
-from typing import Optional, List
+from sqlalchemy import func, extract, insert, or_, select, update, delete
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional, List, Tuple
+import base64
+import json
 import uuid
 
-from . import models, schemas, auth
+from . import models, schemas, auth, cache, rollups, singleflight, versions, search as search_index
+from .config import settings
 
+# Identical summaries requested at the same moment (several devices, duplicate
+# dashboard requests) are computed once and shared
+summary_flights = singleflight.Group()
 
 # ── Users ─────────────────────────────────────────────────────────────────────
 
@@ -21,8 +28,8 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.User).offset(skip).limit(limit).all()
 
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = auth.get_password_hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    hashed_password = hashed_password or auth.get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
@@ -44,27 +51,271 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
             setattr(db_user, key, value)
         db.commit()
         db.refresh(db_user)
+        auth.user_cache.invalidate(user_id)
     return db_user
 
 
+def update_password_hash(db: Session, user_id: int, hashed_password: str):
+    db.execute(update(models.User).where(models.User.id == user_id).values(hashed_password=hashed_password))
+    db.commit()
+
+
+# ── Keyset pagination ─────────────────────────────────────────────────────────
+
+def encode_cursor(row_date: date, row_id: int) -> str:
+    """Opaque cursor pointing just past (date, id) in newest-first order."""
+    raw = json.dumps({"d": row_date.isoformat(), "i": row_id}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return date.fromisoformat(data["d"]), int(data["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _seek(query, model, cursor: Optional[str]):
+    """Skip straight past the cursor row using the (owner_id, date) index."""
+    if not cursor:
+        return query
+    after_date, after_id = decode_cursor(cursor)
+    return query.filter(
+        model.date <= after_date,
+        or_(model.date < after_date, model.id < after_id),
+    )
+
+
+def _page(query, model, limit: int):
+    rows = query.order_by(model.date.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].date, rows[-1].id)
+
+
+# ── Delta sync ────────────────────────────────────────────────────────────────
+#
+# A sync token is an opaque database timestamp. Rows are matched with
+# updated_at >= token, and the next token is the database clock minus a small
+# overlap: timestamps can have one-second resolution (SQLite) or be taken at
+# transaction start (PostgreSQL), so a row may be sent twice but never missed.
+# Clients apply deletions first, then upsert the returned rows by id.
+#
+# Tombstones are kept for SYNC_MAX_AGE_DAYS and then pruned by the scheduler;
+# a token older than that gets a full resync (full_resync: true) instead, and
+# the client replaces its local copy with the response.
+
+SYNC_OVERLAP = timedelta(seconds=2)
+
+# SQLite stores CURRENT_TIMESTAMP as "YYYY-MM-DD HH:MM:SS" and compares it as a
+# string against the bound "YYYY-MM-DD HH:MM:SS.ffffff", so ">= token" would
+# drop rows stamped in the token's own second; "> token - 1 µs" keeps them.
+_SYNC_TICK = timedelta(microseconds=1)
+
+
+def _changed_since(column, after: datetime):
+    return column > after - _SYNC_TICK
+
+
+def encode_sync_token(ts: datetime) -> str:
+    raw = json.dumps({"t": ts.isoformat()}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token: str) -> datetime:
+    """Inverse of encode_sync_token. Raises ValueError for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return datetime.fromisoformat(json.loads(raw)["t"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid sync token") from e
+
+
+def get_changes(db: Session, user_id: int, since: Optional[str] = None) -> dict:
+    """Expenses/invoices changed and ids deleted since a sync token, plus the next token.
+
+    Without a token, or with one older than SYNC_MAX_AGE_DAYS (its tombstones
+    may be gone), every row is returned and full_resync is set.
+    """
+    after = decode_sync_token(since) if since else None
+    now = db.scalar(select(func.now())).replace(tzinfo=None)
+    if after and after < now - timedelta(days=settings.SYNC_MAX_AGE_DAYS):
+        after = None
+    changes = {"full_resync": after is None}
+    for key, model in (("expenses", models.Expense), ("invoices", models.Invoice)):
+        query = db.query(model).filter(model.owner_id == user_id)
+        if after:
+            query = query.filter(_changed_since(model.updated_at, after))
+        rows = query.order_by(model.updated_at, model.id).all()
+
+        deleted = []
+        if after:
+            live = {row.id for row in rows}  # SQLite may reuse the id of a deleted row
+            t = models.SyncTombstone
+            deleted = [
+                entity_id for (entity_id,) in db.query(t.entity_id).filter(
+                    t.owner_id == user_id, t.entity == model.__tablename__, _changed_since(t.deleted_at, after),
+                ).distinct().order_by(t.entity_id)
+                if entity_id not in live
+            ]
+        changes[key] = rows
+        changes[f"deleted_{key}"] = deleted
+
+    next_after = now - SYNC_OVERLAP
+    changes["next_token"] = encode_sync_token(max(next_after, after) if after else next_after)
+    return changes
+
+
+# ── Owned-row writes ──────────────────────────────────────────────────────────
+#
+# Where the dialect supports RETURNING (PostgreSQL, SQLite >= 3.35) an update or
+# delete is a single UPDATE/DELETE ... WHERE id AND owner_id RETURNING statement;
+# an update that moves rollup totals first reads just the old rollup columns.
+# The returned object is expunged before commit, so nothing re-SELECTs it.
+# Other dialects keep the load / mutate / commit / refresh path.
+
+def _owned(model, row_id: int, user_id: int):
+    return (model.id == row_id, model.owner_id == user_id)
+
+
+def _update_owned(db: Session, model, row_id: int, user_id: int, data: dict,
+                  rollup_fields, contribution, apply_changes):
+    """Update one of the user's rows and move its rollup contribution."""
+    if not data or not db.get_bind().dialect.update_returning:
+        row = db.query(model).filter(*_owned(model, row_id, user_id)).first()
+        if row and data:
+            old = contribution(row)
+            for key, value in data.items():
+                setattr(row, key, value)
+            apply_changes(db, removed=[old], added=[contribution(row)])
+            versions.bump(db, [user_id])
+            db.commit()
+            db.refresh(row)
+        return row
+
+    old = None
+    if rollup_fields.intersection(data):
+        old = db.execute(
+            select(*(getattr(model, f) for f in sorted(rollup_fields)))
+            .where(*_owned(model, row_id, user_id))
+            .with_for_update()
+        ).first()
+        if old is None:
+            db.rollback()
+            return None
+
+    row = db.scalars(
+        update(model).where(*_owned(model, row_id, user_id)).values(**data).returning(model),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is None:
+        db.rollback()
+        return None
+    if old is not None:
+        apply_changes(db, removed=[contribution(old)], added=[contribution(row)])
+    versions.bump(db, [user_id])
+    db.expunge(row)
+    db.commit()
+    return row
+
+
+def _delete_owned(db: Session, model, row_id: int, user_id: int, contribution, apply_changes):
+    """Delete one of the user's rows and take its contribution out of the rollups."""
+    if not db.get_bind().dialect.delete_returning:
+        row = db.query(model).filter(*_owned(model, row_id, user_id)).first()
+        if row:
+            apply_changes(db, removed=[contribution(row)])
+            _tombstone(db, model, row)
+            versions.bump(db, [user_id])
+            db.delete(row)
+            db.commit()
+        return row
+
+    row = db.scalars(
+        delete(model).where(*_owned(model, row_id, user_id)).returning(model),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is None:
+        db.rollback()
+        return None
+    apply_changes(db, removed=[contribution(row)])
+    _tombstone(db, model, row)
+    versions.bump(db, [user_id])
+    db.expunge(row)
+    db.commit()
+    return row
+
+
+def _tombstone(db: Session, model, row):
+    """Leave a trace of a hard delete for delta sync."""
+    db.add(models.SyncTombstone(owner_id=row.owner_id, entity=model.__tablename__, entity_id=row.id))
+
+
+def prune_sync_tombstones(db: Session) -> int:
+    """Delete tombstones older than SYNC_MAX_AGE_DAYS; tokens that old get a full resync anyway."""
+    now = db.scalar(select(func.now())).replace(tzinfo=None)
+    cutoff = now - timedelta(days=settings.SYNC_MAX_AGE_DAYS)
+    pruned = db.execute(delete(models.SyncTombstone).where(models.SyncTombstone.deleted_at < cutoff)).rowcount
+    db.commit()
+    return pruned
+
+
+def _bulk_update_owned(db: Session, model, user_id: int, ids: List[int], data: dict,
+                       rollup_fields, contribution, apply_changes) -> dict:
+    """Apply one patch to many of the user's rows with a single UPDATE ... WHERE id IN."""
+    ids = list(dict.fromkeys(ids))
+    owned = (model.owner_id == user_id, model.id.in_(ids))
+    touches_rollups = bool(rollup_fields.intersection(data))
+    no_sync = {"synchronize_session": False}
+
+    if touches_rollups or not db.get_bind().dialect.update_returning:
+        columns = [getattr(model, f) for f in sorted(rollup_fields)] if touches_rollups else []
+        old = db.execute(select(model.id, *columns).where(*owned).with_for_update()).all()
+        updated = [row.id for row in old]
+        if updated:
+            db.execute(update(model).where(model.owner_id == user_id, model.id.in_(updated)).values(**data),
+                       execution_options=no_sync)
+        if touches_rollups:
+            # The patch is the same for every row, so new totals follow from the old ones
+            apply_changes(
+                db,
+                removed=[contribution(row) for row in old],
+                added=[contribution(SimpleNamespace(**{**row._asdict(), **data})) for row in old],
+            )
+    else:
+        updated = db.scalars(
+            update(model).where(*owned).values(**data).returning(model.id), execution_options=no_sync,
+        ).all()
+    if updated:
+        versions.bump(db, [user_id])
+    db.commit()
+
+    done = set(updated)
+    return {
+        "updated": len(done),
+        "not_found": len(ids) - len(done),
+        "results": [{"id": i, "status": "updated" if i in done else "not_found"} for i in ids],
+    }
+
+
 # ── Expenses ──────────────────────────────────────────────────────────────────
 
 def get_expense(db: Session, expense_id: int):
     return db.query(models.Expense).filter(models.Expense.id == expense_id).first()
 
 
-def get_expenses(
-    db: Session,
-    user_id: int,
-    skip: int = 0,
-    limit: int = 100,
+def _filter_expenses(
+    query,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     category: Optional[str] = None,
     vendor: Optional[str] = None,
     search: Optional[str] = None,
 ):
-    query = db.query(models.Expense).filter(models.Expense.owner_id == user_id)
     if start_date:
         query = query.filter(models.Expense.date >= start_date)
     if end_date:
@@ -74,43 +325,103 @@ def get_expenses(
     if vendor:
         query = query.filter(models.Expense.vendor.ilike(f"%{vendor}%"))
     if search:
-        query = query.filter(
-            models.Expense.description.ilike(f"%{search}%")
-            | models.Expense.vendor.ilike(f"%{search}%")
-            | models.Expense.notes.ilike(f"%{search}%")
-        )
-    return query.order_by(models.Expense.date.desc()).offset(skip).limit(limit).all()
+        query = search_index.apply_filter(query.session, query, models.Expense, search)
+    return query
+
+
+def get_expenses(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    vendor: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    query = db.query(models.Expense).filter(models.Expense.owner_id == user_id)
+    query = _filter_expenses(query, start_date, end_date, category, vendor, search)
+    return (
+        query.order_by(models.Expense.date.desc(), models.Expense.id.desc())
+        .offset(skip).limit(limit).all()
+    )
+
+
+def get_expenses_page(
+    db: Session,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    **filters,
+) -> Tuple[List[models.Expense], Optional[str]]:
+    """Keyset page of expenses (newest first) and the cursor for the next page."""
+    query = db.query(models.Expense).filter(models.Expense.owner_id == user_id)
+    query = _filter_expenses(query, **filters)
+    query = _seek(query, models.Expense, cursor)
+    return _page(query, models.Expense, limit)
+
+
+def iter_expense_rows(db: Session, user_id: int, columns: List[str], batch_size: int = 1000, **filters):
+    """Stream plain column tuples (no ORM objects), oldest first, via yield_per."""
+    query = db.query(*(getattr(models.Expense, c) for c in columns)).filter(models.Expense.owner_id == user_id)
+    query = _filter_expenses(query, **filters)
+    return query.order_by(models.Expense.date, models.Expense.id).yield_per(batch_size)
+
+
+def search_expenses(db: Session, user_id: int, q: str, limit: int = 20):
+    """Expenses matching every term of `q`, best match first."""
+    query = db.query(models.Expense).filter(models.Expense.owner_id == user_id)
+    return search_index.ranked(db, query, models.Expense, q).limit(limit).all()
 
 
 def create_expense(db: Session, expense: schemas.ExpenseCreate, user_id: int):
     db_expense = models.Expense(**expense.model_dump(), owner_id=user_id)
     db.add(db_expense)
+    rollups.apply_expense_changes(db, added=[rollups.expense_contribution(db_expense)])
+    versions.bump(db, [user_id])
     db.commit()
     db.refresh(db_expense)
     return db_expense
 
 
+def bulk_create_expenses(db: Session, expenses: List[dict], user_id: int) -> int:
+    """Insert many validated expense dicts with one executemany and one commit."""
+    rows = [{**expense, "owner_id": user_id} for expense in expenses]
+    db.execute(insert(models.Expense), rows)
+    rollups.apply_expense_changes(
+        db, added=[rollups.expense_contribution(SimpleNamespace(**row)) for row in rows]
+    )
+    versions.bump(db, [user_id])
+    db.commit()
+    return len(rows)
+
+
 def update_expense(db: Session, expense_id: int, expense: schemas.ExpenseUpdate, user_id: int):
-    db_expense = db.query(models.Expense).filter(
-        models.Expense.id == expense_id, models.Expense.owner_id == user_id
-    ).first()
-    if db_expense:
-        update_data = expense.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_expense, key, value)
-        db.commit()
-        db.refresh(db_expense)
-    return db_expense
+    return _update_owned(
+        db, models.Expense, expense_id, user_id, expense.model_dump(exclude_unset=True),
+        rollups.EXPENSE_FIELDS, rollups.expense_contribution, rollups.apply_expense_changes,
+    )
+
+
+def find_expense_ids(db: Session, user_id: int, limit: int, **filters) -> List[int]:
+    """Ids of the user's expenses matching the list filters, newest first."""
+    query = db.query(models.Expense.id).filter(models.Expense.owner_id == user_id)
+    query = _filter_expenses(query, **filters)
+    return [row.id for row in query.order_by(models.Expense.date.desc(), models.Expense.id.desc()).limit(limit)]
+
+
+def bulk_update_expenses(db: Session, user_id: int, ids: List[int], patch: schemas.ExpenseUpdate) -> dict:
+    return _bulk_update_owned(
+        db, models.Expense, user_id, ids, patch.model_dump(exclude_unset=True),
+        rollups.EXPENSE_FIELDS, rollups.expense_contribution, rollups.apply_expense_changes,
+    )
 
 
 def delete_expense(db: Session, expense_id: int, user_id: int):
-    db_expense = db.query(models.Expense).filter(
-        models.Expense.id == expense_id, models.Expense.owner_id == user_id
-    ).first()
-    if db_expense:
-        db.delete(db_expense)
-        db.commit()
-    return db_expense
+    return _delete_owned(
+        db, models.Expense, expense_id, user_id, rollups.expense_contribution, rollups.apply_expense_changes,
+    )
 
 
 def get_expense_summary(
@@ -120,38 +431,11 @@ def get_expense_summary(
     end_date: date,
     period_label: str = "",
 ) -> dict:
-    """Aggregate expense data for a date range."""
-    query = db.query(models.Expense).filter(
-        models.Expense.owner_id == user_id,
-        models.Expense.date >= start_date,
-        models.Expense.date <= end_date,
-    )
-    expenses = query.all()
-
-    total = sum(e.amount for e in expenses)
-    gst_total = sum(e.gst_amount for e in expenses)
-
-    # Group by category
-    by_category = {}
-    for e in expenses:
-        cat = e.category or "misc"
-        by_category[cat] = by_category.get(cat, 0) + e.amount
-
-    # Top vendors
-    vendor_totals = {}
-    for e in expenses:
-        if e.vendor:
-            vendor_totals[e.vendor] = vendor_totals.get(e.vendor, 0) + e.amount
-    top_vendors = sorted(vendor_totals, key=vendor_totals.get, reverse=True)[:5]
-
-    return {
-        "total_amount": round(total, 2),
-        "expense_count": len(expenses),
-        "by_category": {k: round(v, 2) for k, v in by_category.items()},
-        "top_vendors": top_vendors,
-        "gst_total": round(gst_total, 2),
-        "period": period_label,
-    }
+    """Aggregate expense data for a date range from the daily rollups (cached)."""
+    period = (start_date, end_date, period_label)
+    return cache.summaries.get_or_compute(user_id, "expense", period, lambda: summary_flights.do(
+        (user_id, "expense", period), lambda: rollups.expense_summary(db, user_id, start_date, end_date, period_label),
+    ))
 
 
 # ── Invoices ──────────────────────────────────────────────────────────────────
@@ -160,17 +444,13 @@ def get_invoice(db: Session, invoice_id: int):
     return db.query(models.Invoice).filter(models.Invoice.id == invoice_id).first()
 
 
-def get_invoices(
-    db: Session,
-    user_id: int,
-    skip: int = 0,
-    limit: int = 100,
+def _filter_invoices(
+    query,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
 ):
-    query = db.query(models.Invoice).filter(models.Invoice.owner_id == user_id)
     if start_date:
         query = query.filter(models.Invoice.date >= start_date)
     if end_date:
@@ -178,11 +458,53 @@ def get_invoices(
     if status:
         query = query.filter(models.Invoice.status == status)
     if search:
-        query = query.filter(
-            models.Invoice.customer_name.ilike(f"%{search}%")
-            | models.Invoice.description.ilike(f"%{search}%")
-        )
-    return query.order_by(models.Invoice.date.desc()).offset(skip).limit(limit).all()
+        query = search_index.apply_filter(query.session, query, models.Invoice, search)
+    return query
+
+
+def get_invoices(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    query = db.query(models.Invoice).filter(models.Invoice.owner_id == user_id)
+    query = _filter_invoices(query, start_date, end_date, status, search)
+    return (
+        query.order_by(models.Invoice.date.desc(), models.Invoice.id.desc())
+        .offset(skip).limit(limit).all()
+    )
+
+
+def get_invoices_page(
+    db: Session,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    **filters,
+) -> Tuple[List[models.Invoice], Optional[str]]:
+    """Keyset page of invoices (newest first) and the cursor for the next page."""
+    query = db.query(models.Invoice).filter(models.Invoice.owner_id == user_id)
+    query = _filter_invoices(query, **filters)
+    query = _seek(query, models.Invoice, cursor)
+    return _page(query, models.Invoice, limit)
+
+
+def iter_invoice_rows(db: Session, user_id: int, columns: List[str], batch_size: int = 1000, **filters):
+    """Stream plain column tuples (no ORM objects), oldest first, via yield_per."""
+    query = db.query(*(getattr(models.Invoice, c) for c in columns)).filter(models.Invoice.owner_id == user_id)
+    query = _filter_invoices(query, **filters)
+    return query.order_by(models.Invoice.date, models.Invoice.id).yield_per(batch_size)
+
+
+def search_invoices(db: Session, user_id: int, q: str, limit: int = 20):
+    """Invoices matching every term of `q`, best match first."""
+    query = db.query(models.Invoice).filter(models.Invoice.owner_id == user_id)
+    return search_index.ranked(db, query, models.Invoice, q).limit(limit).all()
 
 
 def _generate_invoice_number() -> str:
@@ -197,32 +519,64 @@ def create_invoice(db: Session, invoice: schemas.InvoiceCreate, user_id: int):
     data["invoice_number"] = _generate_invoice_number()
     db_invoice = models.Invoice(**data, owner_id=user_id)
     db.add(db_invoice)
+    rollups.apply_invoice_changes(db, added=[rollups.invoice_contribution(db_invoice)])
+    versions.bump(db, [user_id])
     db.commit()
     db.refresh(db_invoice)
     return db_invoice
 
 
 def update_invoice(db: Session, invoice_id: int, invoice: schemas.InvoiceUpdate, user_id: int):
-    db_invoice = db.query(models.Invoice).filter(
-        models.Invoice.id == invoice_id, models.Invoice.owner_id == user_id
-    ).first()
-    if db_invoice:
-        update_data = invoice.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_invoice, key, value)
-        db.commit()
-        db.refresh(db_invoice)
-    return db_invoice
+    return _update_owned(
+        db, models.Invoice, invoice_id, user_id, invoice.model_dump(exclude_unset=True),
+        rollups.INVOICE_FIELDS, rollups.invoice_contribution, rollups.apply_invoice_changes,
+    )
+
+
+def find_invoice_ids(db: Session, user_id: int, limit: int, **filters) -> List[int]:
+    """Ids of the user's invoices matching the list filters, newest first."""
+    query = db.query(models.Invoice.id).filter(models.Invoice.owner_id == user_id)
+    query = _filter_invoices(query, **filters)
+    return [row.id for row in query.order_by(models.Invoice.date.desc(), models.Invoice.id.desc()).limit(limit)]
+
+
+def bulk_update_invoices(db: Session, user_id: int, ids: List[int], patch: schemas.InvoiceUpdate) -> dict:
+    return _bulk_update_owned(
+        db, models.Invoice, user_id, ids, patch.model_dump(exclude_unset=True),
+        rollups.INVOICE_FIELDS, rollups.invoice_contribution, rollups.apply_invoice_changes,
+    )
 
 
 def delete_invoice(db: Session, invoice_id: int, user_id: int):
-    db_invoice = db.query(models.Invoice).filter(
-        models.Invoice.id == invoice_id, models.Invoice.owner_id == user_id
-    ).first()
-    if db_invoice:
-        db.delete(db_invoice)
-        db.commit()
-    return db_invoice
+    return _delete_owned(
+        db, models.Invoice, invoice_id, user_id, rollups.invoice_contribution, rollups.apply_invoice_changes,
+    )
+
+
+def mark_overdue_invoices(db: Session, today: date) -> int:
+    """Flip every sent invoice due before `today` to overdue in one UPDATE; returns the count."""
+    inv = models.Invoice
+    past_due = (inv.status == "sent", inv.due_date < today)
+    flip = update(inv).where(*past_due).values(status="overdue")
+    no_sync = {"synchronize_session": False}
+    if db.get_bind().dialect.update_returning:
+        flipped = db.execute(flip.returning(inv.owner_id, inv.date, inv.total_amount), execution_options=no_sync).all()
+    else:
+        flipped = db.execute(select(inv.owner_id, inv.date, inv.total_amount).where(*past_due)).all()
+        db.execute(flip, execution_options=no_sync)
+
+    moved = {}
+    for owner_id, day, total in flipped:
+        amount, count = moved.get((owner_id, day), (0.0, 0))
+        moved[(owner_id, day)] = (amount + total, count + 1)
+    rollups.apply_invoice_changes(
+        db,
+        removed=[((owner_id, day, "sent"), values) for (owner_id, day), values in moved.items()],
+        added=[((owner_id, day, "overdue"), values) for (owner_id, day), values in moved.items()],
+    )
+    versions.bump(db, {owner_id for owner_id, _ in moved})
+    db.commit()
+    return len(flipped)
 
 
 def get_invoice_summary(
@@ -232,30 +586,8 @@ def get_invoice_summary(
     end_date: date,
     period_label: str = "",
 ) -> dict:
-    """Aggregate invoice data for a date range."""
-    query = db.query(models.Invoice).filter(
-        models.Invoice.owner_id == user_id,
-        models.Invoice.date >= start_date,
-        models.Invoice.date <= end_date,
-    )
-    invoices = query.all()
-
-    total = sum(i.total_amount for i in invoices)
-    paid = sum(i.total_amount for i in invoices if i.status == "paid")
-    pending = sum(i.total_amount for i in invoices if i.status in ("draft", "sent"))
-    overdue = sum(1 for i in invoices if i.status == "overdue")
-
-    by_status = {}
-    for i in invoices:
-        st = i.status or "draft"
-        by_status[st] = by_status.get(st, 0) + 1
-
-    return {
-        "total_amount": round(total, 2),
-        "invoice_count": len(invoices),
-        "paid_amount": round(paid, 2),
-        "pending_amount": round(pending, 2),
-        "overdue_count": overdue,
-        "by_status": by_status,
-        "period": period_label,
-    }
+    """Aggregate invoice data for a date range from the daily rollups (cached)."""
+    period = (start_date, end_date, period_label)
+    return cache.summaries.get_or_compute(user_id, "invoice", period, lambda: summary_flights.do(
+        (user_id, "invoice", period), lambda: rollups.invoice_summary(db, user_id, start_date, end_date, period_label),
+    ))
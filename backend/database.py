@@ -1,15 +1,105 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
 
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+ENGINE_PROFILES = ("default", "production")
+
+# Async drivers for the same databases, used by the async routes
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _is_sqlite_memory(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, profile: Optional[str] = None) -> dict:
+    """create_engine() keyword arguments for `url` under an engine profile."""
+    profile = profile or settings.DB_PROFILE
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}; expected one of {ENGINE_PROFILES}")
+    url = make_url(url)
+    options = {}
+    if url.drivername in ("sqlite", "sqlite+pysqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    if profile == "default" or _is_sqlite_memory(url):
+        return options  # in-memory SQLite uses a single-connection pool
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if url.get_backend_name() != "sqlite":
+        # Server connections die behind our back (restarts, idle timeouts, PgBouncer)
+        options.update(pool_pre_ping=settings.DB_POOL_PRE_PING, pool_recycle=settings.DB_POOL_RECYCLE)
+    return options
+
+
+def sqlite_pragmas(profile: Optional[str] = None) -> List[str]:
+    """PRAGMAs run on every new SQLite connection under an engine profile."""
+    if (profile or settings.DB_PROFILE) == "default":
+        return []
+    return [
+        # WAL lets readers (exports, summaries) run alongside the single writer
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        # NORMAL is durable across app crashes in WAL mode and skips most fsyncs
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        # Queue behind a busy writer instead of failing with "database is locked"
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+
+
+def _install_pragmas(sync_engine, profile: Optional[str]):
+    pragmas = sqlite_pragmas(profile) if sync_engine.dialect.name == "sqlite" else []
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+def make_engine(url: str, profile: Optional[str] = None):
+    """A sync Engine configured by the engine profile."""
+    engine = create_engine(url, **engine_options(url, profile))
+    _install_pragmas(engine, profile)
+    return engine
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def make_async_engine(url: str, profile: Optional[str] = None):
+    """An AsyncEngine on the async driver for `url`, configured by the engine profile."""
+    async_url = async_database_url(url)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, profile))
+    _install_pragmas(async_engine.sync_engine, profile)
+    return async_engine
+
+
+engine = make_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = make_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     """Dependency that provides a database session per request."""
@@ -18,3 +108,26 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency that provides an AsyncSession per request, for async endpoints."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def run_migrations(bind=None):
+    """Upgrade the database to the latest Alembic revision."""
+    from alembic import command
+    from alembic.config import Config
+
+    bind = bind or engine
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    with bind.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        # Databases created by the old create_all() bootstrap have no version row
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
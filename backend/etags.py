@@ -0,0 +1,44 @@
+"""
+Conditional GETs for ledger reads.
+
+Read endpoints depend on `conditional_get`, which derives a strong ETag from the
+user's change version (see versions.py) and the request, and answers a matching
+If-None-Match with 304 before the endpoint runs its query.
+"""
+import hashlib
+from datetime import date
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from . import auth, versions
+from .config import settings
+from .database import get_db
+
+
+def make_etag(owner_id: int, version: int, request: Request) -> str:
+    # Today's date covers endpoints whose defaults move with the calendar
+    # (summary/daily, "this month"); APP_VERSION covers response format changes.
+    key = f"{settings.APP_VERSION}|{date.today().isoformat()}|{owner_id}|{request.url.path}?{request.url.query}"
+    return f'"{version}-{hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Set the ETag header, or short-circuit with 304 when the client's copy is current."""
+    etag = make_etag(current_user.id, versions.current(db, current_user.id), request)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
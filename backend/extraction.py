@@ -0,0 +1,276 @@
+"""
+Rule-based expense extraction — parses simple messages without a Gemini call.
+
+"₹500 petrol cash" has everything extract_expense needs in plain sight: an
+amount, a category keyword and a payment method. parse_expense() finds them
+with regexes and keyword tables and returns the same dict the LLM prompt asks
+for, or None when a required field (amount, description) is missing or the
+amount is ambiguous ("10 bags 4200 and 300 transport"), in which case the
+caller asks Gemini as before.
+
+Handles ₹ / Rs / rupaye amounts with Indian digit grouping (1,50,000), k /
+hazaar / lakh / crore multipliers and Devanagari numerals; relative dates
+(aaj, kal, parso, today, yesterday) and dd/mm[/yyyy] or "5 april" dates;
+payment methods; known vendors (Swiggy, HP, Airtel, ...) and "to Mehta
+Traders" / "Ramesh ko ..." payees; and category keywords in English, Hinglish
+and Hindi. "kal" is read as yesterday: nobody records tomorrow's expense.
+"""
+import re
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+# ── Amounts ──
+
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+_NUMBER = re.compile(
+    r"(?<![\w.,/])(\d{1,3}(?:,\d{2,3})+|\d+)(?:\.(\d+))?"
+    r"(?:\s*(k|thousand|hazaa?r|हज़ार|हजार|lakhs?|lacs?|लाख|crores?|cr|करोड़)(?![\w]))?",
+    re.IGNORECASE,
+)
+_MULTIPLIERS = [
+    (re.compile(r"^(k|thousand|hazaa?r|हज़ार|हजार)$", re.I), 1_000),
+    (re.compile(r"^(lakhs?|lacs?|लाख)$", re.I), 100_000),
+    (re.compile(r"^(crores?|cr|करोड़)$", re.I), 10_000_000),
+]
+_CURRENCY_BEFORE = re.compile(r"(₹|\brs\.?|\binr|\brupees?|\brupaye|\brupay|रुपये|रुपए|रु\.?)\s*$", re.I)
+_CURRENCY_AFTER = re.compile(r"^\s*(/-|₹|rs\b|rupees?\b|rupaye\b|rupay\b|रुपये|रुपए|रु\b)", re.I)
+# A number followed by one of these is a quantity, not the amount
+_UNIT_AFTER = re.compile(
+    r"^\s*(%|x\b|kg|kgs|gm|grams?|bags?|pcs|pieces?|nos|units?|litres?|liters?|ltr|km|days?|nights?"
+    r"|hours?|hrs?|months?|boxes|box|packets?|dozen|bottles?|meters?|mtrs?|sq|chairs?|tyres?|people|log\b|din\b)",
+    re.I,
+)
+# Per-unit prices, sums and percentages need arithmetic the rules don't attempt
+_ARITHMETIC = re.compile(r"\beach\b|\bper\b|\bprati\b|@|\+|%", re.I)
+
+
+def _parse_number(match: "re.Match") -> float:
+    value = float(match.group(1).replace(",", "") + (f".{match.group(2)}" if match.group(2) else ""))
+    unit = match.group(3)
+    if unit:
+        for pattern, factor in _MULTIPLIERS:
+            if pattern.match(unit):
+                value *= factor
+    return value
+
+
+def _find_amount(text: str) -> Optional[Tuple[float, List[Tuple[int, int]]]]:
+    """The single amount in `text` and the spans it (and its currency marker) occupy.
+
+    Currency-marked numbers win over bare ones; quantities and phone-number-sized
+    numbers are ignored. None if there is no amount, more than one candidate, or
+    the total would need arithmetic ("3 tyres at 2400 each", "450 + 18% gst").
+    """
+    if _ARITHMETIC.search(text):
+        return None
+    marked, bare = [], []
+    for m in _NUMBER.finditer(text):
+        before, after = text[:m.start()], text[m.end():]
+        if _UNIT_AFTER.match(after):
+            continue
+        cur_before, cur_after = _CURRENCY_BEFORE.search(before), _CURRENCY_AFTER.match(after)
+        spans = [(m.start(), m.end())]
+        if cur_before:
+            spans.append((cur_before.start(), m.start()))
+        if cur_after:
+            spans.append((m.end(), m.end() + cur_after.end()))
+        value = _parse_number(m)
+        if cur_before or cur_after:
+            marked.append((value, spans))
+        elif len(m.group(1).replace(",", "")) < 10:
+            bare.append((value, spans))
+    candidates = marked or bare
+    if len({value for value, _ in candidates}) != 1 or candidates[0][0] <= 0:
+        return None
+    return candidates[0][0], [span for _, spans in candidates for span in spans]
+
+
+# ── Dates ──
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*"
+_NUMERIC_DATE = re.compile(r"(?<![\d/])(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?(?![\d/])")
+_DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+{_MONTH}\b", re.I)
+_MONTH_DAY = re.compile(rf"\b{_MONTH}\s+(\d{{1,2}})(?:st|nd|rd|th)?\b", re.I)
+_DEVANAGARI_WORD = r"(?<![\u0900-\u097F]){}(?![\u0900-\u097F])"
+_RELATIVE = [
+    (re.compile(r"\bday before yesterday\b|\bparso\b|" + _DEVANAGARI_WORD.format("परसों"), re.I), 2),
+    (re.compile(r"\byesterday\b|\bkal\b|" + _DEVANAGARI_WORD.format("कल"), re.I), 1),
+    (re.compile(r"\btoday\b|\baaj\b|" + _DEVANAGARI_WORD.format("आज"), re.I), 0),
+]
+
+
+def _make_date(day: int, month: int, year: Optional[int], today: date) -> Optional[date]:
+    if year is not None and year < 100:
+        year += 2000
+    try:
+        parsed = date(year or today.year, month, day)
+    except ValueError:
+        return None
+    if year is None and parsed > today:
+        parsed = parsed.replace(year=today.year - 1)  # "25 dec" in January is last December
+    return parsed
+
+
+def _find_date(text: str, today: date) -> Tuple[date, List[Tuple[int, int]]]:
+    """The date a message mentions (today if none) and the spans to drop from it."""
+    m = _NUMERIC_DATE.search(text)
+    if m:
+        parsed = _make_date(int(m.group(1)), int(m.group(2)), int(m.group(3)) if m.group(3) else None, today)
+        if parsed:
+            return parsed, [m.span()]
+    for pattern, day_group, month_group in ((_DAY_MONTH, 1, 2), (_MONTH_DAY, 2, 1)):
+        m = pattern.search(text)
+        if m:
+            parsed = _make_date(int(m.group(day_group)), _MONTHS[m.group(month_group)[:3].lower()], None, today)
+            if parsed:
+                return parsed, [m.span()]
+    for pattern, days_ago in _RELATIVE:
+        m = pattern.search(text)
+        if m:
+            return today - timedelta(days=days_ago), [m.span()]
+    return today, []
+
+
+# ── Payment method, vendor, category ──
+
+_PAYMENT = [
+    ("upi", re.compile(r"\b(?:via |by |through |on )?(upi|gpay|google pay|phonepe|phone pe|paytm|bhim)\b(?: se)?", re.I)),
+    ("cheque", re.compile(r"\b(?:via |by |through )?(cheque|check)\b(?: se)?", re.I)),
+    ("bank", re.compile(
+        r"\b(?:via |by |through )(bank|card|debit card|credit card|net ?banking)\b(?: transfer)?"
+        r"|\bbank transfer\b|\b(neft|imps|rtgs)\b|\btransferred\b|\bcard se\b", re.I)),
+    ("cash", re.compile(r"\b(?:in |by )?(cash|nakad|nagad)\b(?: (?:me|mein|se))?|नकद", re.I)),
+]
+
+# keyword -> (vendor name, category)
+_VENDORS = [
+    (re.compile(r"\bswiggy\b", re.I), "Swiggy", "food"),
+    (re.compile(r"\bzomato\b", re.I), "Zomato", "food"),
+    (re.compile(r"\buber\b", re.I), "Uber", "travel"),
+    (re.compile(r"\bola\b", re.I), "Ola", "travel"),
+    (re.compile(r"\brapido\b", re.I), "Rapido", "travel"),
+    (re.compile(r"\birctc\b", re.I), "IRCTC", "travel"),
+    (re.compile(r"\bindigo\b", re.I), "IndiGo", "travel"),
+    (re.compile(r"\b(hp|hpcl)(?: petrol)? pump\b|\bhpcl\b", re.I), "HP Pump", "fuel"),
+    (re.compile(r"\bindian oil\b|\biocl\b", re.I), "Indian Oil", "fuel"),
+    (re.compile(r"\bbharat petroleum\b|\bbpcl\b", re.I), "Bharat Petroleum", "fuel"),
+    (re.compile(r"\bairtel\b", re.I), "Airtel", "utility"),
+    (re.compile(r"\bjio\b", re.I), "Jio", "utility"),
+    (re.compile(r"\bbsnl\b", re.I), "BSNL", "utility"),
+    (re.compile(r"\bamazon\b", re.I), "Amazon", None),
+    (re.compile(r"\bflipkart\b", re.I), "Flipkart", None),
+]
+_NAME = r"[A-Z][\w&'.]*"
+_BUSINESS_WORD = r"(?:store|stores|traders|trading|supplier|suppliers|dealer|enterprises|shop|mart|pump|ji|sahab|bhai)"
+_PAYEE_TO = re.compile(rf"\b(?:to|at|from)\s+({_NAME}(?:\s+(?:{_NAME}|{_BUSINESS_WORD}))*)")
+_PAYEE_KO = re.compile(r"^\s*((?:[^\W\d_]+\s+){0,2}[^\W\d_]+)\s+(?:ko|को)\b")
+
+_CATEGORIES = [
+    ("fuel", r"petrol|diesel|fuel|cng|पेट्रोल|डीजल"),
+    ("salary", r"salary|salaries|wages?|tankhwa+h?|mazdoori|labour|सैलरी|वेतन|तनख्वाह"),
+    ("utility", r"electricity|bijli|light ka bill|light bill|water bill|internet|wifi|broadband|"
+                r"phone bill|mobile bill|recharge|gas cylinder|water tanker|tanker|rent|kiraya|किराया|बिजली"),
+    ("travel", r"auto|cab|taxi|train|flight|bus|ticket|hotel|toll|parking|travel|ऑटो"),
+    ("food", r"chai|tea|coffee|lunch|dinner|breakfast|khana|nashta|snacks?|food|meal|groceries|"
+             r"sabzi|sabji|atta|rice|chawal|dal|sweets|mithai|चाय|नाश्ता|खाना|सब्ज़ी|सब्जी"),
+    ("raw_material", r"raw material|cement|steel|sariya|bricks?|sand|kapda|fabric|cloth|yarn|timber|"
+                     r"plywood|packaging material|सीमेंट|कपड़ा"),
+]
+_CATEGORY_PATTERNS = [(cat, re.compile(rf"(?<![\w])(?:{words})(?![\w])", re.I)) for cat, words in _CATEGORIES]
+
+# ── Description ──
+
+_FILLER = {
+    "paid", "pay", "spent", "spend", "bought", "purchased", "purchase", "kharida", "kharidi", "kharide",
+    "diye", "diya", "di", "de", "dena", "bhara", "bhari", "liya", "liye", "le", "li", "kiya", "kharch",
+    "kharcha", "hue", "hua", "mangwaya", "dala", "dalwaya", "deducted",
+    "दिए", "दिया", "दी", "भरा", "खरीदा", "खरीदी", "लिया", "डलवाया", "भरवाया", "खर्च", "हुए",
+}
+_CONNECTORS = {
+    "for", "on", "of", "to", "at", "from", "the", "a", "an", "and", "by", "via", "in", "with",
+    "ka", "ki", "ke", "ko", "se", "me", "mein", "pe", "par", "liye", "wala", "wali",
+    "का", "की", "के", "को", "से", "में", "पर", "लिए",
+}
+
+
+def _strip_spans(text: str, spans: List[Tuple[int, int]]) -> str:
+    keep = list(text)
+    for start, end in spans:
+        for i in range(start, end):
+            keep[i] = " "
+    return "".join(keep)
+
+
+def _description(text: str) -> str:
+    words = [w.strip(".,!?;:()'\"-") for w in text.split()]
+    words = [w for w in words if w and w.lower() not in _FILLER]
+    while words and words[0].lower() in _CONNECTORS:
+        words.pop(0)
+    while words and words[-1].lower() in _CONNECTORS:
+        words.pop()
+    description = " ".join(words)
+    return description[:1].upper() + description[1:]
+
+
+def parse_expense(text: str, today: Optional[date] = None) -> Optional[dict]:
+    """Expense fields from a simple message, or None if it needs the LLM."""
+    today = today or date.today()
+    text = text.translate(_DEVANAGARI_DIGITS)
+
+    spent_on, spans = _find_date(text, today)
+    found = _find_amount(_strip_spans(text, spans))
+    if found is None:
+        return None
+    amount, amount_spans = found
+    spans += amount_spans
+
+    payment_method = "cash"
+    for method, pattern in _PAYMENT:
+        m = pattern.search(text)
+        if m:
+            payment_method = method
+            spans.append(m.span())
+            break
+
+    vendor, category = None, None
+    for pattern, name, vendor_category in _VENDORS:
+        m = pattern.search(text)
+        if m:
+            vendor, category = name, vendor_category
+            lead = re.search(r"\b(?:at|from|to|on)\s+$", text[:m.start()], re.I)
+            spans.append((lead.start() if lead else m.start(), m.end()))
+            break
+    if vendor is None:
+        m = _PAYEE_TO.search(_strip_spans(text, spans))
+        if m:
+            vendor = m.group(1).strip()
+            spans.append(m.span())
+        else:
+            m = _PAYEE_KO.match(_strip_spans(text, spans))
+            if m and not any(w.lower() in _FILLER | _CONNECTORS for w in m.group(1).split()):
+                vendor = m.group(1).strip().title()
+                spans.append(m.span())
+
+    for cat, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(text):
+            category = cat
+            break
+
+    description = _description(_strip_spans(text, spans))
+    if not description and vendor:
+        description = f"Payment to {vendor}"
+    if not description:
+        return None
+    return {
+        "date": spent_on.isoformat(),
+        "description": description,
+        "amount": amount,
+        "category": category or "misc",
+        "vendor": vendor,
+        "payment_method": payment_method,
+        "gst_applicable": bool(re.search(r"\bgst\b|जीएसटी", text, re.I)),
+        "notes": None,
+    }
@@ -0,0 +1,155 @@
+"""
+Offline GST knowledge index — answers common GST questions without Gemini.
+
+Most GST questions from SME owners are about rates, registration limits, ITC
+and due dates, and the answers change only when the GST Council meets. They
+live in data/gst_kb.json: a rate table (item, aliases, rate, note) and a short
+FAQ (paraphrased questions, one answer), reviewed against the rates in force
+from 22 Sep 2025.
+
+At first use every alias and paraphrase becomes one TF-IDF vector (words
+after stop-word removal, a few GST phrases folded to single tokens, trailing
+plural "s" dropped). A question is scored by cosine similarity against them,
+and an entry's score is that of its best paraphrase. Words the index has never
+seen count against the match with the highest IDF, so "GST on cement mixer"
+does not answer as "cement". Below GST_KB_MIN_SCORE, or when two different
+entries score about the same ("cement or steel?"), answer() returns None and
+the question goes to the LLM.
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+KB_FILE = os.path.join(os.path.dirname(__file__), "data", "gst_kb.json")
+
+# Two entries this close to each other are a tie, not an answer
+_TIE_RATIO = 0.9
+
+_PHRASES = [
+    (re.compile(r"\binput tax credits?\b"), "itc"),
+    (re.compile(r"\be[\s-]?way[\s-]?bills?\b"), "ewaybill"),
+    (re.compile(r"\be[\s-]?invoic\w*"), "einvoice"),
+    (re.compile(r"\bgstr[\s-]?(\d+[a-z]?)\b"), r"gstr\1"),
+    (re.compile(r"\b3b\b"), "gstr3b"),
+    (re.compile(r"\b(compulsory|mandatory|required|zaroori|jaruri)\b"), "mandatory"),
+    (re.compile(r"\breverse[\s-]charge\b"), "rcm"),
+    (re.compile(r"\b(due date|last date|deadline|kab file|when to file)\b"), "due"),
+    (re.compile(r"\b(registration|register|registered)\b"), "register"),
+]
+_WORD = re.compile(r"[\w\u0900-\u097F]+")
+_STOPWORDS = set("""
+a an the is are am was be do does did i my me we our you your it its to of on in for at by with from
+what which how when much many any there this that these those should can could will would please tell
+and or have has had need needed allowed ok
+gst rate tax percent percentage applicable charged levied service now current currently abhi
+kya hai hain kitna kitni kitne lagta lagti lagega lagegi par pe ka ki ke ko mein me se hota hoti
+batao bataiye bhai ji ab tak liye wala wali kab
+जीएसटी पर कितना कितनी है क्या लगता लगती का की के में
+""".split())
+
+
+def tokens(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    for pattern, replacement in _PHRASES:
+        text = pattern.sub(replacement, text)
+    words = []
+    for word in _WORD.findall(text):
+        if word.isdigit():
+            continue  # amounts and years say nothing about which entry applies
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in _STOPWORDS:
+            words.append(word)
+    return words
+
+
+def _rate_answer(row: dict, footer: str) -> str:
+    item = row["item"][:1].lower() + row["item"][1:]
+    answer = f"GST rate for {item}: {row['rate']}."
+    if row.get("note"):
+        answer += f" {row['note'][:1].upper()}{row['note'][1:]}."
+    return f"{answer}\n\n{footer}"
+
+
+class GstIndex:
+    """TF-IDF cosine index over the paraphrases of each knowledge-base entry."""
+
+    def __init__(self, entries: Dict[str, str], paraphrases: List[Tuple[str, str]]):
+        self.entries = entries  # id -> answer
+        docs = [(entry_id, tokens(text)) for entry_id, text in paraphrases]
+        df = Counter(word for _, words in docs for word in set(words))
+        n = len(docs)
+        self.idf = {word: math.log((1 + n) / (1 + count)) + 1 for word, count in df.items()}
+        self.unseen_idf = math.log(1 + n) + 1
+        self.docs = [(entry_id, self._vector(words)) for entry_id, words in docs if words]
+
+    def _vector(self, words: List[str]) -> Dict[str, float]:
+        counts = Counter(words)
+        vector = {w: (1 + math.log(c)) * self.idf.get(w, self.unseen_idf) for w, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {w: v / norm for w, v in vector.items()}
+
+    def search(self, question: str, limit: int = 2) -> List[Tuple[str, float]]:
+        """Best (entry_id, score) pairs, one per entry, highest first."""
+        query = self._vector(tokens(question))
+        if not query:
+            return []
+        best: Dict[str, float] = {}
+        for entry_id, doc in self.docs:
+            score = sum(weight * doc.get(word, 0.0) for word, weight in query.items())
+            if score > best.get(entry_id, 0.0):
+                best[entry_id] = score
+        return sorted(best.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+
+
+def load_index(path: str = KB_FILE) -> GstIndex:
+    with open(path, encoding="utf-8") as f:
+        kb = json.load(f)
+    entries, paraphrases = {}, []
+    for row in kb["rates"]:
+        entry_id = f"rate:{row['aliases'][0]}"
+        entries[entry_id] = _rate_answer(row, kb["footer"])
+        paraphrases += [(entry_id, alias) for alias in row["aliases"]]
+    for row in kb["faq"]:
+        entries[row["id"]] = f"{row['answer']}\n\n{kb['footer']}"
+        paraphrases += [(row["id"], question) for question in row["questions"]]
+    return GstIndex(entries, paraphrases)
+
+
+_index: Optional[GstIndex] = None
+_index_lock = threading.Lock()
+
+
+def _get_index() -> GstIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_index()
+                logger.info(f"GST knowledge index built: {len(_index.entries)} entries, {len(_index.docs)} phrasings")
+    return _index
+
+
+def match(question: str) -> Optional[Tuple[str, float]]:
+    """The (entry_id, score) that answers `question`, or None if nothing is close enough."""
+    hits = _get_index().search(question)
+    if not hits or hits[0][1] < settings.GST_KB_MIN_SCORE:
+        return None
+    if len(hits) > 1 and hits[1][1] >= _TIE_RATIO * hits[0][1]:
+        return None
+    return hits[0]
+
+
+def answer(question: str) -> Optional[str]:
+    hit = match(question)
+    return _get_index().entries[hit[0]] if hit else None
@@ -0,0 +1,181 @@
+"""
+Local intent classifier — answers obvious messages without a Gemini call.
+
+Most WhatsApp messages are unambiguous ("petrol 800 upi se", "hisaab dikhao",
+"hi"), and sending them to Gemini just to learn the label costs a round trip
+and a slot of the per-minute quota. This module scores a message with two
+cheap signals:
+
+  * a multinomial naive Bayes model over character 2–4-grams (plus words),
+    trained at first use from data/intent_train.tsv. Character n-grams cope
+    with Hinglish spelling drift (kharcha / kharch / karcha) and with
+    Devanagari without any tokenizer;
+  * a short list of high-precision regex rules.
+
+The two are averaged into a probability per intent; when the rule and the
+model disagree neither side can reach the threshold, so the message goes to
+the LLM. classify() returns (intent, confidence) and callers use the local
+answer only when confidence >= LOCAL_INTENT_THRESHOLD.
+
+Amounts are normalised to "#" before scoring so "500" and "2200" look alike.
+"""
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ["expense_record", "invoice_create", "gst_query", "summary_request", "fallback"]
+TRAINING_FILE = os.path.join(os.path.dirname(__file__), "data", "intent_train.tsv")
+
+_DIGITS = re.compile(r"\d+(?:[.,]\d+)*")
+_SPACE = re.compile(r"\s+")
+_AMOUNT = re.compile(r"\d")
+
+
+def normalize(text: str) -> str:
+    text = text.lower().replace("₹", " ").replace("rs.", " ").replace("rs ", " ")
+    text = _DIGITS.sub("#", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def features(text: str) -> List[str]:
+    """Character 2–4-grams of the padded text plus whole words."""
+    norm = normalize(text)
+    padded = f" {norm} "
+    grams = [padded[i:i + n] for n in (2, 3, 4) for i in range(len(padded) - n + 1)]
+    return grams + [f"w:{w}" for w in re.findall(r"\w+", norm)]
+
+
+# ── Rules ──
+# Checked in order; the first match votes. Keep these precise: a rule that
+# fires wrongly costs an LLM call at best (disagreement) and a wrong reply at worst.
+
+_RULES: List[Tuple[str, "re.Pattern"]] = [
+    ("fallback", re.compile(
+        r"^(hi+|hello|hey( there)?|namaste|namaskar( ji)?|good (morning|afternoon|evening|night)"
+        r"|thanks?( you)?( so much)?|ok(ay)?( thanks)?|bye|dhanyavaa?d|shukriya|नमस्ते|धन्यवाद)[\s!.?]*$")),
+    ("summary_request", re.compile(
+        r"summary|hisa+b|हिसाब|\breport\b|रिपोर्ट|kitna kharch|kharcha hua|खर्चा कितना"
+        r"|how much did i spend|spend on|pending (invoices|from)|baaki hai|gst input")),
+    ("invoice_create", re.compile(
+        r"invoice|इनवॉइस|\bbill (bana|bhej)|\b(generate|make|create|send|raise) (a |an )?bill|बिल बना|बिल भेज")),
+    ("gst_query", re.compile(
+        r"\bgst\b|\bgstr\b|जीएसटी|\bitc\b|input tax credit|इनपुट टैक्स|\bhsn\b|reverse charge"
+        r"|composition scheme|\b[cis]gst\b|e.?way bill")),
+]
+_EXPENSE_VERB = re.compile(
+    r"\b(paid|spent|bought|purchased|transferred|diye|diya|di|bhara|kharid\w*|kharch\w*|liya|mangwaya)\b"
+    r"|दिए|दिया|दी|भरा|खरीदा|खर्च|डलवाया")
+
+
+def rule_intent(text: str) -> Optional[str]:
+    norm = text.lower().strip()
+    for intent, pattern in _RULES:
+        if pattern.search(norm):
+            return intent
+    if _AMOUNT.search(norm) and _EXPENSE_VERB.search(norm):
+        return "expense_record"
+    return None
+
+
+# ── Naive Bayes ──
+
+class NaiveBayes:
+    """Multinomial naive Bayes over feature counts, with Laplace smoothing."""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.log_prior: Dict[str, float] = {}
+        self.log_likelihood: Dict[str, Dict[str, float]] = {}
+        self.log_unseen: Dict[str, float] = {}
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "NaiveBayes":
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        docs = Counter()
+        for text, label in examples:
+            counts[label].update(features(text))
+            docs[label] += 1
+        vocab = set().union(*counts.values())
+        total_docs = sum(docs.values())
+        for label, c in counts.items():
+            denom = sum(c.values()) + self.alpha * len(vocab)
+            self.log_prior[label] = math.log(docs[label] / total_docs)
+            self.log_likelihood[label] = {f: math.log((n + self.alpha) / denom) for f, n in c.items()}
+            self.log_unseen[label] = math.log(self.alpha / denom)
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        feats = features(text)
+        scores = {
+            label: self.log_prior[label] + sum(table.get(f, self.log_unseen[label]) for f in feats)
+            for label, table in self.log_likelihood.items()
+        }
+        # NB's independence assumption makes raw posteriors wildly overconfident
+        # with hundreds of overlapping n-grams; temper by sqrt(#features).
+        scale = 1 / math.sqrt(max(len(feats), 1))
+        top = max(scores.values())
+        exp = {label: math.exp((s - top) * scale) for label, s in scores.items()}
+        total = sum(exp.values())
+        return {label: v / total for label, v in exp.items()}
+
+
+def load_examples(path: str = TRAINING_FILE) -> List[Tuple[str, str]]:
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            text, label = line.rsplit("\t", 1)
+            if label not in INTENTS:
+                raise ValueError(f"{path}: unknown intent {label!r}")
+            examples.append((text, label))
+    return examples
+
+
+_model: Optional[NaiveBayes] = None
+_model_lock = threading.Lock()
+
+
+def _get_model() -> NaiveBayes:
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                examples = load_examples()
+                _model = NaiveBayes().fit(examples)
+                logger.info(f"Local intent model trained on {len(examples)} examples")
+    return _model
+
+
+def scores(text: str) -> Dict[str, float]:
+    """Blended probability per intent: half the model, half the rule vote (if any)."""
+    proba = _get_model().predict_proba(text)
+    rule = rule_intent(text)
+    if rule is None:
+        return proba
+    return {label: 0.5 * p + (0.5 if label == rule else 0.0) for label, p in proba.items()}
+
+
+def classify(text: str) -> Tuple[str, float]:
+    """Most likely intent and its confidence in [0, 1]."""
+    blended = scores(text)
+    intent = max(blended, key=blended.get)
+    return intent, blended[intent]
+
+
+def confident_intent(text: str) -> Optional[str]:
+    """The local intent if enabled and above LOCAL_INTENT_THRESHOLD, else None (ask the LLM)."""
+    if not settings.LOCAL_INTENT_ENABLED:
+        return None
+    intent, confidence = classify(text)
+    if confidence < settings.LOCAL_INTENT_THRESHOLD:
+        return None
+    return intent
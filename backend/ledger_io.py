@@ -0,0 +1,182 @@
+"""
+Bulk ledger import/export in CSV or NDJSON.
+
+Import streams an upload row by row: rows are validated with the same schemas
+as the JSON API, inserted in chunks with one executemany INSERT and one commit
+per chunk, and bad rows are reported individually instead of failing the file.
+
+Export streams plain column tuples from a yield_per query straight into
+(optionally gzipped) CSV/NDJSON chunks, so memory stays flat however large the
+ledger is.
+"""
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from . import crud, schemas
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+EXPORT_BATCH_SIZE = 1000
+
+EXPENSE_EXPORT_COLUMNS = [
+    "id", "date", "description", "amount", "category", "vendor", "payment_method", "currency",
+    "gst_applicable", "gst_amount", "tags", "notes", "source", "created_at", "updated_at",
+]
+INVOICE_EXPORT_COLUMNS = [
+    "id", "invoice_number", "date", "customer_name", "customer_email", "customer_phone", "description",
+    "amount", "currency", "gst_rate", "gst_amount", "total_amount", "status", "due_date", "tags", "notes",
+    "created_at", "updated_at",
+]
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Guess csv/ndjson from the upload's filename or content type."""
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "ndjson"
+    return None
+
+
+def iter_records(fileobj: IO[bytes], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row_number, record, parse_error) without reading the whole file."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            # Empty cells mean "not given" so schema defaults apply
+            yield row_number, {k: v for k, v in row.items() if k and v not in ("", None)}, None
+    else:
+        for row_number, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Each line must be a JSON object"
+                continue
+            yield row_number, record, None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def import_expenses(db, fileobj: IO[bytes], fmt: str, user_id: int, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """Validate and insert every expense in an uploaded file."""
+    imported, failed, errors = 0, 0, []
+    batch, batch_rows = [], []
+
+    def report(row_number: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "error": message})
+
+    def flush():
+        nonlocal imported
+        if not batch:
+            return
+        try:
+            imported += crud.bulk_create_expenses(db, batch, user_id)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Import chunk failed: {type(e).__name__}: {e}")
+            for row_number in batch_rows:
+                report(row_number, "Database error while saving this row")
+        batch.clear()
+        batch_rows.clear()
+
+    row_number = 0
+    try:
+        for row_number, record, parse_error in iter_records(fileobj, fmt):
+            if parse_error:
+                report(row_number, parse_error)
+                continue
+            record.setdefault("source", "import")
+            try:
+                expense = schemas.ExpenseCreate.model_validate(record)
+            except ValidationError as e:
+                report(row_number, _validation_message(e))
+                continue
+            batch.append(expense.model_dump())
+            batch_rows.append(row_number)
+            if len(batch) >= chunk_size:
+                flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        report(row_number + 1, f"Unreadable file, import stopped: {e}")
+    flush()
+
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode(rows: Iterable[tuple], columns: List[str], fmt: str) -> Iterator[str]:
+    """Serialize rows into text chunks of EXPORT_BATCH_SIZE rows each."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, map(_json_value, row))), ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(rows: Iterable[tuple], columns: List[str], fmt: str, compress: bool = False, on_close=None) -> Iterator[bytes]:
+    """Byte chunks for a StreamingResponse; calls on_close() when done or aborted."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None  # gzip framing
+    try:
+        for chunk in _encode(rows, columns, fmt):
+            data = chunk.encode("utf-8")
+            if compressor:
+                data = compressor.compress(data)
+                if not data:
+                    continue
+            yield data
+        if compressor:
+            yield compressor.flush()
+    finally:
+        if on_close:
+            on_close()
+
+
+def export_filename(kind: str, fmt: str, compress: bool) -> str:
+    return f"{kind}-{date.today().isoformat()}.{fmt}" + (".gz" if compress else "")
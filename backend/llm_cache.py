@@ -0,0 +1,220 @@
+"""
+Content-addressed cache for Gemini responses.
+
+People send the same things over and over ("hi", "GST on restaurant?"), and
+every repeat costs a slot of the per-minute quota and about a second. Each
+llm_service call is keyed by
+
+    (function, model, prompt version, normalized input)
+
+where the prompt version is a hash of the prompt rendered with a fixed
+placeholder (INPUT) where the user's text goes. Prompts that embed today's
+date therefore change version at midnight, so a cached answer can never carry
+a stale "today"; editing a prompt template retires its old entries the same
+way. The input is normalized
+(Unicode NFKC, case, whitespace, surrounding punctuation) so near-identical
+messages share an entry. Only the raw response text is stored, and only after
+the caller has parsed it successfully; post-processing runs on every hit.
+
+The backend is picked with LLM_CACHE_URL:
+
+    memory://                     per-process LRU with a TTL (default)
+    sqlite:///path/llm_cache.db   same, persisted so hits survive restarts
+    none                          no caching
+
+Entries expire after LLM_CACHE_TTL_SECONDS; at most LLM_CACHE_MAX_ENTRIES are
+kept, least recently used first out.
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Callable, Optional
+
+from .config import settings
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_SPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?;:\"'।"
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _SPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+
+# Stands in for the user's text in a rendered prompt template
+INPUT = "\x00"
+
+
+def make_key(function: str, model: str, template: str, text: str) -> str:
+    """Content address of one call; `template` is the prompt rendered with INPUT for the text."""
+    version = hashlib.sha256(template.encode()).hexdigest()[:16]
+    payload = json.dumps([function, model, version, normalize(text)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+class MemoryBackend:
+    """Per-process LRU with a TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self._entries: LRUCache[str, str] = LRUCache(max_entries, ttl_seconds, clock)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries.set(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """LRU with a TTL in a local SQLite file, so the cache survives restarts.
+
+    Lookups are primary-key reads on a small local file (well under a
+    millisecond), cheap enough to run inline on the event loop next to a
+    Gemini round trip.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock  # wall clock: expiry times outlive the process
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_used_at ON llm_responses (used_at)")
+
+    @classmethod
+    def from_url(cls, url: str, max_entries: int, ttl_seconds: float) -> "SQLiteBackend":
+        return cls(url[len("sqlite:///"):], max_entries, ttl_seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM llm_responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_responses SET used_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str):
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            self._conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN ("
+                " SELECT key FROM llm_responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+
+
+def make_backend(url: str, max_entries: int, ttl_seconds: float):
+    """Backend for an LLM_CACHE_URL, or None to disable caching."""
+    if url in ("", "none"):
+        return None
+    if url.startswith("memory://"):
+        return MemoryBackend(max_entries, ttl_seconds)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend.from_url(url, max_entries, ttl_seconds)
+    raise ValueError(f"Unsupported LLM_CACHE_URL: {url!r}")
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+class ResponseCache:
+    """Response-text cache with per-function hit/miss counters for this process."""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def get(self, function: str, key: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"LLM cache read failed: {type(e).__name__}: {e}")
+            value = None
+        (self.hits if value is not None else self.misses)[function] += 1
+        return value
+
+    def set(self, key: str, value: str):
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            # The answer is already in hand; a failed store only costs a later call
+            logger.error(f"LLM cache write failed: {type(e).__name__}: {e}")
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+        self.hits.clear()
+        self.misses.clear()
+
+    def stats(self) -> dict:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "by_function": {
+                function: {"hits": self.hits[function], "misses": self.misses[function]}
+                for function in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+
+responses = ResponseCache(make_backend(
+    settings.LLM_CACHE_URL, settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS,
+))
@@ -0,0 +1,232 @@
+"""
+Client-side rate limiter for Gemini calls, with priority queueing.
+
+The free tier allows a few requests per minute per API key; a burst of
+webhook messages used to fire them all at once and turn the overflow into
+429s. Every model call (cache hits excluded) now takes a token from one
+process-wide bucket holding up to GEMINI_BURST tokens. It refills at
+GEMINI_RPM - GEMINI_BURST per minute, so a full burst plus a minute of refill
+never exceeds GEMINI_RPM calls in any minute. When the bucket is empty the
+call waits in a queue for its priority class, served strictly in this order:
+
+    interactive   intent and expense/invoice extraction for webhook text
+    receipt       receipt OCR
+    gst           GST questions the offline index could not answer
+    chat          greetings and fallback chit-chat
+
+Within a class, users are served round-robin, so one chatty user cannot
+starve the others. Each queue holds at most GEMINI_QUEUE_MAX calls and each
+class has a deadline (DEADLINES); a call that would overflow its queue or
+outwaits its deadline raises LimiterBusy, which llm_service handles like any
+other failed call (fallback intent, canned reply) — without spending quota.
+A 429 from Gemini empties the bucket so queued calls back off.
+
+The user is read from the `user` context variable, set by the webhook routes.
+State is per process, so with several workers the effective limit is per
+worker: divide GEMINI_RPM accordingly.
+"""
+import asyncio
+import time
+from collections import Counter, OrderedDict, deque
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Hashable, Optional
+
+from .config import settings
+
+PRIORITIES = ("interactive", "receipt", "gst", "chat")
+
+# Seconds a call may wait for a token before giving up; chit-chat has a canned reply to fall back on
+DEADLINES = {"interactive": 20.0, "receipt": 30.0, "gst": 15.0, "chat": 5.0}
+
+# Recent waits kept per class for the percentiles in stats()
+_WAIT_SAMPLES = 1000
+
+user: ContextVar[Optional[Hashable]] = ContextVar("llm_user", default=None)
+
+
+class LimiterBusy(RuntimeError):
+    """No Gemini slot within the deadline, or the queue for this class is full."""
+
+
+class PriorityLimiter:
+    """Token bucket with per-priority, per-user round-robin wait queues (one event loop)."""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_queue: int,
+                 deadlines: Dict[str, float] = DEADLINES, clock: Callable[[], float] = time.monotonic):
+        if rate_per_minute <= 0:
+            raise ValueError(f"Refill rate must be positive, got {rate_per_minute} per minute")
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.burst = burst
+        self.max_queue = max_queue
+        self.deadlines = deadlines
+        self._clock = clock
+        self._tokens = float(burst)
+        self._at = clock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # priority -> user -> waiting futures, users in round-robin order
+        self._queues: Dict[str, "OrderedDict[Hashable, Deque[asyncio.Future]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._depth = Counter()
+        self.granted = Counter()
+        self.queue_full = Counter()
+        self.timed_out = Counter()
+        self.max_depth = Counter()
+        self._waits: Dict[str, Deque[float]] = {p: deque(maxlen=_WAIT_SAMPLES) for p in PRIORITIES}
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._at) * self.rate)
+        self._at = now
+
+    def _bind(self, loop: asyncio.AbstractEventLoop):
+        """Futures and timers belong to one loop; forget those of a previous one."""
+        if self._loop is not loop:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            for queue in self._queues.values():
+                queue.clear()
+            self._depth.clear()
+            self._loop = loop
+
+    async def acquire(self, priority: str, key: Optional[Hashable] = None):
+        """Wait for a token; raises LimiterBusy on a full queue or a missed deadline."""
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority: {priority!r}")
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+        self._refill()
+        if self._tokens >= 1 and not any(self._depth.values()):
+            self._tokens -= 1
+            self.granted[priority] += 1
+            self._waits[priority].append(0.0)
+            return
+        if self._depth[priority] >= self.max_queue:
+            self.queue_full[priority] += 1
+            raise LimiterBusy(f"Gemini queue for {priority} calls is full ({self.max_queue} waiting)")
+
+        future = loop.create_future()
+        self._queues[priority].setdefault(key, deque()).append(future)
+        self._depth[priority] += 1
+        self.max_depth[priority] = max(self.max_depth[priority], self._depth[priority])
+        started = self._clock()
+        self._schedule()
+        try:
+            await asyncio.wait_for(future, self.deadlines[priority])
+        except asyncio.TimeoutError:
+            self.timed_out[priority] += 1
+            raise LimiterBusy(f"No Gemini slot for {priority} call within {self.deadlines[priority]:g}s") from None
+        finally:
+            if not future.done() or future.cancelled():
+                self._discard(priority, key, future)
+        self._waits[priority].append(self._clock() - started)
+
+    def _discard(self, priority: str, key: Hashable, future: asyncio.Future):
+        queue = self._queues[priority].get(key)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            self._depth[priority] -= 1
+            if not queue:
+                del self._queues[priority][key]
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in PRIORITIES:
+            users = self._queues[priority]
+            while users:
+                key, queue = next(iter(users.items()))
+                future = queue.popleft()
+                self._depth[priority] -= 1
+                if queue:
+                    users.move_to_end(key)
+                else:
+                    del users[key]
+                if not future.done():
+                    return future
+        return None
+
+    def _dispatch(self):
+        self._timer = None
+        self._refill()
+        while self._tokens >= 1:
+            future = self._next_waiter()
+            if future is None:
+                break
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is not None or not any(self._depth.values()):
+            return
+        self._refill()
+        delay = max(0.0, (1 - self._tokens) / self.rate)
+        self._timer = self._loop.call_later(delay, self._dispatch)
+
+    def penalize(self):
+        """Gemini answered 429: spend what is left so queued calls wait for a refill."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+    def reset(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        for queue in self._queues.values():
+            queue.clear()
+        self._depth.clear()
+        self._tokens = float(self.burst)
+        self._at = self._clock()
+        for counter in (self.granted, self.queue_full, self.timed_out, self.max_depth):
+            counter.clear()
+        for waits in self._waits.values():
+            waits.clear()
+
+    def stats(self) -> dict:
+        self._refill()
+        classes = {}
+        for priority in PRIORITIES:
+            waits = sorted(self._waits[priority])
+            classes[priority] = {
+                "queued": self._depth[priority],
+                "max_queued": self.max_depth[priority],
+                "granted": self.granted[priority],
+                "queue_full": self.queue_full[priority],
+                "timed_out": self.timed_out[priority],
+                "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+                "wait_ms_p99": round(waits[min(len(waits) - 1, int(0.99 * len(waits)))] * 1000, 1) if waits else None,
+            }
+        return {"tokens": round(self._tokens, 2), "classes": classes}
+
+
+# Built on first use: with the limiter disabled, GEMINI_RPM need not leave a refill rate
+gemini: Optional[PriorityLimiter] = None
+
+
+def _limiter() -> PriorityLimiter:
+    global gemini
+    if gemini is None:
+        gemini = PriorityLimiter(settings.GEMINI_RPM - settings.GEMINI_BURST, settings.GEMINI_BURST,
+                                 settings.GEMINI_QUEUE_MAX)
+    return gemini
+
+
+async def acquire(priority: str):
+    """Take a Gemini slot for the current user's call of this priority class."""
+    if settings.GEMINI_RATE_LIMIT_ENABLED:
+        await _limiter().acquire(priority, user.get())
+
+
+def penalize():
+    if settings.GEMINI_RATE_LIMIT_ENABLED:
+        _limiter().penalize()
+
+
+def stats() -> dict:
+    limiter = _limiter() if settings.GEMINI_RATE_LIMIT_ENABLED else gemini
+    return {"enabled": settings.GEMINI_RATE_LIMIT_ENABLED, "rate_per_minute": settings.GEMINI_RPM,
+            "burst": settings.GEMINI_BURST, **(limiter.stats() if limiter else {})}
+
+
+def reset():
+    if gemini is not None:
+        gemini.reset()
@@ -6,11 +6,14 @@ Free tier: 60 RPM for gemini-2.0-flash.
 import json
 import logging
 import base64
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 from datetime import date
 
 import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted
 from .config import settings
+from . import extraction, gst_kb, llm_cache, llm_limiter
+from .intents import INTENTS
 import sys
 import os
 try:
@@ -22,6 +25,26 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_INPUT = llm_cache.INPUT
+
+
+class UnknownIntent(ValueError):
+    """The model answered with a label outside INTENTS."""
+
+
+# Limiter priority class of each call (see llm_limiter.py)
+_PRIORITY = {
+    "classify_intent": "interactive",
+    "classify_and_extract": "interactive",
+    "extract_expense": "interactive",
+    "extract_invoice": "interactive",
+    "extract_from_receipt_image": "receipt",
+    "answer_gst_query": "gst",
+    "chat_response": "chat",
+}
+
 # Configure Gemini
 _model = None
 
@@ -36,6 +59,34 @@ def _get_model():
     return _model
 
 
+async def _call_model(function: str, prompt, **kwargs):
+    """generate_content_async once the rate limiter grants this call a slot."""
+    model = _get_model()  # no API key: fail now, without spending a slot or queueing
+    await llm_limiter.acquire(_PRIORITY[function])
+    try:
+        return await model.generate_content_async(prompt, **kwargs)
+    except ResourceExhausted:
+        llm_limiter.penalize()
+        raise
+
+
+async def _generate(function: str, text: str, template: str, parse: Callable[[str], T], **kwargs) -> T:
+    """One Gemini call through the response cache (see llm_cache.py) and rate limiter.
+
+    `template` is the prompt with _INPUT where the user's `text` goes, so it
+    versions the cache entry without depending on the input; `parse` turns the
+    reply text into the caller's result, and a reply is only cached once it parses.
+    """
+    key = llm_cache.make_key(function, settings.GEMINI_MODEL, template, text)
+    cached = llm_cache.responses.get(function, key)
+    if cached is not None:
+        return parse(cached)
+    response = await _call_model(function, template.replace(_INPUT, text), **kwargs)
+    result = parse(response.text)
+    llm_cache.responses.set(key, response.text)
+    return result
+
+
 def _parse_json_from_text(text: str) -> dict:
     """Extract JSON from LLM response, handling markdown code blocks."""
     text = text.strip()
@@ -55,29 +106,92 @@ def _parse_json_from_text(text: str) -> dict:
         raise ValueError(f"Could not parse JSON from: {text[:200]}")
 
 
-async def classify_intent(text: str) -> str:
-    """Classify user intent into: expense_record, invoice_create, gst_query, summary_request, or fallback."""
-    model = _get_model()
-    prompt = f"""You are an intent classifier for an Indian SME accounting assistant. 
-Classify the following text into exactly ONE of these intents:
-- expense_record: User wants to record an expense/payment they made
+_INTENT_GUIDE = """- expense_record: User wants to record an expense/payment they made
 - invoice_create: User wants to create/send an invoice to a customer
 - gst_query: User is asking about GST rates, rules, compliance
 - summary_request: User wants to see expense/invoice summaries or reports
-- fallback: Anything else, greetings, or unclear intent
+- fallback: Anything else, greetings, or unclear intent"""
+
+
+def _expense_fields(today: str) -> str:
+    return f"""{{
+    "date": "YYYY-MM-DD (use {today} if not mentioned)",
+    "description": "what was purchased/paid for",
+    "amount": 0.0,
+    "category": "one of: fuel, raw_material, utility, salary, travel, food, misc",
+    "vendor": "who was paid (or null if unknown)",
+    "payment_method": "one of: cash, upi, bank, cheque (default cash)",
+    "gst_applicable": false,
+    "notes": "any extra details or null"
+}}"""
 
-Text: "{text}"
+
+def _invoice_fields(today: str) -> str:
+    return f"""{{
+    "date": "YYYY-MM-DD (use {today} if not mentioned)",
+    "customer_name": "customer/client name",
+    "customer_phone": "phone number or null",
+    "description": "what the invoice is for",
+    "amount": 0.0,
+    "gst_rate": 18.0,
+    "due_date": "YYYY-MM-DD or null",
+    "notes": "any extra details or null"
+}}"""
+
+
+def _finish_expense(data: dict, today: str) -> dict:
+    """Fill the fields the webhook relies on."""
+    data.setdefault("date", today)
+    data.setdefault("description", "Unknown expense")
+    data.setdefault("amount", 0)
+    data.setdefault("category", "misc")
+    data.setdefault("payment_method", "cash")
+    data.setdefault("gst_applicable", False)
+    return data
+
+
+def _finish_invoice(data: dict, today: str) -> dict:
+    """Fill defaults and compute GST and the total."""
+    data.setdefault("date", today)
+    data.setdefault("customer_name", "Unknown")
+    data.setdefault("amount", 0)
+    data.setdefault("gst_rate", 18.0)
+    # Calculate GST using Vyapar-RL rules
+    amount = float(data.get("amount", 0))
+    description = data.get("description", "")
+    # Use RL rules to find the correct slab, otherwise fallback to LLM's rate
+    expected_slab = get_expected_slab(description)
+    gst_rate = float(data.get("gst_rate", expected_slab))
+    if gst_rate == 18.0 and expected_slab != 18:
+        gst_rate = float(expected_slab) # Override LLM default if rule matches
+        data["gst_rate"] = gst_rate
+
+    data["gst_amount"] = round(amount * gst_rate / 100, 2)
+    data["total_amount"] = round(amount + data["gst_amount"], 2)
+    return data
+
+
+async def classify_intent(text: str) -> str:
+    """Classify user intent into: expense_record, invoice_create, gst_query, summary_request, or fallback."""
+    template = f"""You are an intent classifier for an Indian SME accounting assistant. 
+Classify the following text into exactly ONE of these intents:
+{_INTENT_GUIDE}
+
+Text: "{_INPUT}"
 
 Respond with ONLY the intent label, nothing else."""
 
-    try:
-        response = await model.generate_content_async(prompt)
-        intent = response.text.strip().lower().replace('"', '').replace("'", "")
-        valid_intents = ["expense_record", "invoice_create", "gst_query", "summary_request", "fallback"]
-        if intent not in valid_intents:
-            logger.warning(f"Unknown intent '{intent}', falling back")
-            return "fallback"
+    def parse(reply: str) -> str:
+        intent = reply.strip().lower().replace('"', '').replace("'", "")
+        if intent not in INTENTS:
+            raise UnknownIntent(intent)
         return intent
+
+    try:
+        return await _generate("classify_intent", text, template, parse)
+    except UnknownIntent as e:
+        logger.warning(f"Unknown intent '{e}', falling back")
+        return "fallback"
     except Exception as e:
         logger.error(f"Intent classification failed: {type(e).__name__}: {e}")
         return "fallback"
@@ -86,35 +200,21 @@ Respond with ONLY the intent label, nothing else."""
 async def extract_expense(text: str) -> dict:
     """Extract structured expense data from natural language text (Hindi/English)."""
     today = date.today().isoformat()
-    model = _get_model()
-    prompt = f"""You are an expense extraction AI for Indian SMEs. Extract expense details from the following text.
+    if settings.LOCAL_EXTRACTION_ENABLED:
+        parsed = extraction.parse_expense(text)
+        if parsed:
+            return _finish_expense(parsed, today)
+    template = f"""You are an expense extraction AI for Indian SMEs. Extract expense details from the following text.
 The text may be in Hindi, English, or Hinglish.
 
-Text: "{text}"
+Text: "{_INPUT}"
 
 Return ONLY a valid JSON object with these fields:
-{{
-    "date": "YYYY-MM-DD (use {today} if not mentioned)",
-    "description": "what was purchased/paid for",
-    "amount": 0.0,
-    "category": "one of: fuel, raw_material, utility, salary, travel, food, misc",
-    "vendor": "who was paid (or null if unknown)",
-    "payment_method": "one of: cash, upi, bank, cheque (default cash)",
-    "gst_applicable": false,
-    "notes": "any extra details or null"
-}}"""
+{_expense_fields(today)}"""
 
     try:
-        response = await model.generate_content_async(prompt)
-        data = _parse_json_from_text(response.text)
-        # Ensure required fields
-        data.setdefault("date", today)
-        data.setdefault("description", "Unknown expense")
-        data.setdefault("amount", 0)
-        data.setdefault("category", "misc")
-        data.setdefault("payment_method", "cash")
-        data.setdefault("gst_applicable", False)
-        return data
+        data = await _generate("extract_expense", text, template, _parse_json_from_text)
+        return _finish_expense(data, today)
     except Exception as e:
         logger.error(f"Expense extraction failed: {e}")
         raise ValueError(f"Could not extract expense data: {e}")
@@ -123,51 +223,74 @@ Return ONLY a valid JSON object with these fields:
 async def extract_invoice(text: str) -> dict:
     """Extract structured invoice data from natural language text."""
     today = date.today().isoformat()
-    model = _get_model()
-    prompt = f"""You are an invoice extraction AI for Indian SMEs. Extract invoice details from the following text.
+    template = f"""You are an invoice extraction AI for Indian SMEs. Extract invoice details from the following text.
 
-Text: "{text}"
+Text: "{_INPUT}"
 
 Return ONLY a valid JSON object with these fields:
-{{
-    "date": "YYYY-MM-DD (use {today} if not mentioned)",
-    "customer_name": "customer/client name",
-    "customer_phone": "phone number or null",
-    "description": "what the invoice is for",
-    "amount": 0.0,
-    "gst_rate": 18.0,
-    "due_date": "YYYY-MM-DD or null",
-    "notes": "any extra details or null"
-}}"""
+{_invoice_fields(today)}"""
 
     try:
-        response = await model.generate_content_async(prompt)
-        data = _parse_json_from_text(response.text)
-        data.setdefault("date", today)
-        data.setdefault("customer_name", "Unknown")
-        data.setdefault("amount", 0)
-        data.setdefault("gst_rate", 18.0)
-        # Calculate GST using Vyapar-RL rules
-        amount = float(data.get("amount", 0))
-        description = data.get("description", "")
-        # Use RL rules to find the correct slab, otherwise fallback to LLM's rate
-        expected_slab = get_expected_slab(description)
-        gst_rate = float(data.get("gst_rate", expected_slab))
-        if gst_rate == 18.0 and expected_slab != 18:
-            gst_rate = float(expected_slab) # Override LLM default if rule matches
-            data["gst_rate"] = gst_rate
-
-        data["gst_amount"] = round(amount * gst_rate / 100, 2)
-        data["total_amount"] = round(amount + data["gst_amount"], 2)
-        return data
+        data = await _generate("extract_invoice", text, template, _parse_json_from_text)
+        return _finish_invoice(data, today)
     except Exception as e:
         logger.error(f"Invoice extraction failed: {e}")
         raise ValueError(f"Could not extract invoice data: {e}")
 
 
+async def classify_and_extract(text: str) -> Optional[dict]:
+    """Classify intent and extract the expense/invoice payload in one call.
+
+    Returns {"intent": ..., "data": dict or None}, where data is only set for
+    expense_record / invoice_create and is post-processed like extract_expense /
+    extract_invoice. Returns None when the combined answer is unusable, so the
+    caller can fall back to classify_intent + extract_*.
+    """
+    today = date.today().isoformat()
+    template = f"""You are the intent classifier and data extractor for an Indian SME accounting assistant.
+The text may be in Hindi, English, or Hinglish.
+
+Text: "{_INPUT}"
+
+Classify the text into exactly ONE of these intents:
+{_INTENT_GUIDE}
+
+Return ONLY a valid JSON object:
+{{
+    "intent": "the intent label",
+    "expense": null, or for expense_record only: {_expense_fields(today)},
+    "invoice": null, or for invoice_create only: {_invoice_fields(today)}
+}}"""
+
+    def parse(reply: str) -> dict:
+        answer = _parse_json_from_text(reply)
+        answer["intent"] = str(answer.get("intent", "")).strip().lower()
+        if answer["intent"] not in INTENTS:
+            raise UnknownIntent(answer["intent"])
+        return answer
+
+    try:
+        answer = await _generate(
+            "classify_and_extract", text, template, parse,
+            generation_config={"response_mime_type": "application/json"},
+        )
+        intent = answer["intent"]
+        data = None
+        if intent == "expense_record" and isinstance(answer.get("expense"), dict):
+            data = _finish_expense(answer["expense"], today)
+        elif intent == "invoice_create" and isinstance(answer.get("invoice"), dict):
+            data = _finish_invoice(answer["invoice"], today)
+        return {"intent": intent, "data": data}
+    except UnknownIntent as e:
+        logger.warning(f"Combined call returned unknown intent '{e}'")
+        return None
+    except Exception as e:
+        logger.error(f"Combined classify/extract failed: {type(e).__name__}: {e}")
+        return None
+
+
 async def extract_from_receipt_image(image_bytes: bytes, mime_type: str = "image/jpeg") -> dict:
     """Use Gemini Vision to extract data from a receipt/bill image. Replaces EasyOCR + LLM pipeline."""
-    model = _get_model()
     today = date.today().isoformat()
 
     image_part = {
@@ -192,7 +315,7 @@ Return ONLY a valid JSON object:
 }}"""
 
     try:
-        response = await model.generate_content_async([prompt, image_part])
+        response = await _call_model("extract_from_receipt_image", [prompt, image_part])
         data = _parse_json_from_text(response.text)
         data.setdefault("date", today)
         data.setdefault("description", "Receipt expense")
@@ -206,17 +329,19 @@ Return ONLY a valid JSON object:
 
 async def answer_gst_query(question: str) -> str:
     """Answer GST-related questions for Indian SME owners."""
-    model = _get_model()
-    prompt = f"""You are a helpful GST (Goods and Services Tax) expert assistant for Indian SME owners.
+    if settings.GST_KB_ENABLED:
+        answer = gst_kb.answer(question)
+        if answer:
+            return answer
+    template = f"""You are a helpful GST (Goods and Services Tax) expert assistant for Indian SME owners.
 Answer the following question concisely and accurately. Use simple language.
 If you mention tax rates, specify which category they apply to.
 Keep the answer under 200 words.
 
-Question: {question}"""
+Question: {_INPUT}"""
 
     try:
-        response = await model.generate_content_async(prompt)
-        return response.text.strip()
+        return await _generate("answer_gst_query", question, template, str.strip)
     except Exception as e:
         logger.error(f"GST query failed: {e}")
         return "Sorry, I couldn't process your GST query right now. Please try again."
@@ -224,9 +349,8 @@ Question: {question}"""
 
 async def chat_response(text: str) -> str:
     """General chat response for greetings and fallback messages."""
-    model = _get_model()
-    prompt = f"""You are Vyapar AI, a friendly WhatsApp accounting assistant for Indian SME owners.
-The user said: "{text}"
+    template = f"""You are Vyapar AI, a friendly WhatsApp accounting assistant for Indian SME owners.
+The user said: "{_INPUT}"
 
 Respond naturally and briefly. If they seem to need help, mention that you can:
 - Record expenses (voice, text, or photo of bills)
@@ -237,8 +361,7 @@ Respond naturally and briefly. If they seem to need help, mention that you can:
 Keep response under 50 words. Be warm and professional."""
 
     try:
-        response = await model.generate_content_async(prompt)
-        return response.text.strip()
+        return await _generate("chat_response", text, template, str.strip)
     except Exception as e:
         logger.error(f"Chat response failed: {e}")
         return "Hello! I'm Vyapar AI. I can help you record expenses, create invoices, and answer GST questions. How can I help?"
@@ -0,0 +1,68 @@
+"""
+Bounded LRU mapping with a per-entry TTL, shared by the in-process caches.
+
+The summary cache (cache.py), the resolved-user cache (auth.py) and the
+Gemini response cache (llm_cache.py) all keep entries in insertion/recency
+order, drop an entry once it expires, and evict the least recently used one
+past a size limit. They differ in what they index on top, so this class does
+no locking of its own: each owner holds its lock around these calls together
+with its own bookkeeping, and learns of expired or evicted entries through
+`on_evict`.
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """At most `max_entries` values, each readable for `ttl_seconds` after it was set."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic,
+                 on_evict: Optional[Callable[[K, V], None]] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._on_evict = on_evict
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._entries)
+
+    def _evict(self, key: K):
+        _, value = self._entries.pop(key)
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+    def get(self, key: K) -> Optional[V]:
+        """The live value for `key`, now the most recently used; None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: K, value: V):
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def pop(self, key: K) -> Optional[V]:
+        """Remove `key` without calling on_evict; returns its value, expired or not."""
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def clear(self):
+        self._entries.clear()
@@ -3,18 +3,21 @@ Vyapar AI — WhatsApp AI Accounting Assistant for Indian SMEs
 Production backend: FastAPI + Gemini API + SQLAlchemy
 """
 import logging
+import secrets
 import uuid
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import Session
 
+from . import cache, llm_cache, llm_limiter, passwords, ratelimit, scheduler
 from .config import settings
-from .database import engine
-from . import models
-from .routers import auth, expenses, invoices, webhook
+from .database import SessionLocal, get_db, run_migrations
+from .routers import auth, expenses, invoices, sync, webhook
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+# Bring the schema up to date (alembic upgrade head)
+run_migrations()
 
 # Configure logging
 logging.basicConfig(
@@ -27,11 +30,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger("vyapar")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background jobs with the app and stop them on shutdown."""
+    jobs = None
+    if settings.SCHEDULER_ENABLED:
+        jobs = scheduler.Scheduler(SessionLocal, settings.OVERDUE_CHECK_INTERVAL_SECONDS)
+        jobs.start()
+    yield
+    if jobs:
+        await jobs.stop()
+
+
 # App
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="AI-powered accounting assistant for Indian SMEs",
+    lifespan=lifespan,
 )
 
 # CORS — allow frontend
@@ -62,18 +79,44 @@ async def add_request_id(request: Request, call_next):
 app.include_router(auth.router)
 app.include_router(expenses.router)
 app.include_router(invoices.router)
+app.include_router(sync.router)
 app.include_router(webhook.router)
 
 
 # Health check
 @app.get("/health", tags=["System"])
-async def health_check():
-    """Check system health."""
+def health_check(db: Session = Depends(get_db)):
+    """Check system health, including when each background job last ran."""
     gemini_status = "configured" if settings.GEMINI_API_KEY else "missing_api_key"
     return {
         "status": "healthy",
         "version": settings.APP_VERSION,
         "gemini": gemini_status,
+        "scheduler": {
+            "enabled": settings.SCHEDULER_ENABLED,
+            "jobs": scheduler.job_status(db),
+        },
+    }
+
+
+def require_stats_token(x_stats_token: str = Header(default="")):
+    """Internal endpoints answer only to STATS_TOKEN; without one configured they do not exist."""
+    if not settings.STATS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not secrets.compare_digest(x_stats_token.encode(), settings.STATS_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid stats token")
+
+
+# Cache, pool and rate-limit counters: live login pressure and throttling state,
+# so kept off the public /health
+@app.get("/internal/stats", tags=["System"], include_in_schema=False, dependencies=[Depends(require_stats_token)])
+def internal_stats():
+    return {
+        "summary_cache": cache.summaries.stats(),
+        "llm_cache": llm_cache.responses.stats(),
+        "gemini_limiter": llm_limiter.stats(),
+        "password_pool": passwords.pool.stats(),
+        "auth_rate_limits": ratelimit.stats(),
     }
 
 
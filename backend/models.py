@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -40,6 +40,13 @@ class Expense(Base):
 
     owner = relationship("User", back_populates="expenses")
 
+    # Every ledger query is owner-scoped and filtered/sorted by date
+    __table_args__ = (
+        Index("ix_expenses_owner_date", "owner_id", "date"),
+        Index("ix_expenses_owner_category_date", "owner_id", "category", "date"),
+        Index("ix_expenses_owner_updated_at", "owner_id", "updated_at"),  # delta sync
+    )
+
 
 class Invoice(Base):
     __tablename__ = "invoices"
@@ -65,3 +72,71 @@ class Invoice(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     owner = relationship("User", back_populates="invoices")
+
+    __table_args__ = (
+        Index("ix_invoices_owner_date", "owner_id", "date"),
+        Index("ix_invoices_owner_status_date", "owner_id", "status", "date"),
+        Index("ix_invoices_owner_due_date", "owner_id", "due_date"),
+        Index("ix_invoices_status_due_date", "status", "due_date"),  # overdue sweep
+        Index("ix_invoices_owner_updated_at", "owner_id", "updated_at"),  # delta sync
+    )
+
+
+class ExpenseDailyRollup(Base):
+    """Per-day expense totals, maintained by crud writes (see rollups.py)."""
+    __tablename__ = "expense_daily_rollups"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    vendor = Column(String, primary_key=True, default="")  # "" when no vendor
+    total_amount = Column(Float, nullable=False, default=0.0)
+    gst_total = Column(Float, nullable=False, default=0.0)
+    expense_count = Column(Integer, nullable=False, default=0)
+
+
+class InvoiceDailyRollup(Base):
+    """Per-day invoice totals by status, maintained by crud writes (see rollups.py)."""
+    __tablename__ = "invoice_daily_rollups"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    invoice_count = Column(Integer, nullable=False, default=0)
+
+
+class TenantVersion(Base):
+    """Per-user change counter, bumped by every ledger write; the basis of ETags."""
+    __tablename__ = "tenant_versions"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class SyncTombstone(Base):
+    """Record of a hard-deleted expense/invoice, so delta sync can report it."""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    entity = Column(String, nullable=False)  # table name: "expenses" | "invoices"
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_owner_deleted_at", "owner_id", "deleted_at"),
+    )
+
+
+class SchedulerLease(Base):
+    """One row per background job: which worker holds it, and how its last run went."""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
+    last_duration_ms = Column(Float, nullable=True)
+    last_result = Column(Integer, nullable=True)
+    last_error = Column(String, nullable=True)
@@ -0,0 +1,100 @@
+"""
+Password hashing off the request threadpool.
+
+bcrypt is slow on purpose, and run inline it ties up the threadpool FastAPI
+shares with every sync route: a burst of logins would stall ledger reads too.
+Sign-up and login instead await a small dedicated pool (bcrypt releases the GIL,
+so threads are enough). When PASSWORD_HASH_MAX_PENDING calls are already
+running or queued, new ones fail fast with PoolSaturated and the routes answer
+503 instead of queueing without bound.
+
+Hashes carry their bcrypt cost; a successful login with a hash whose cost
+differs from BCRYPT_ROUNDS stores a fresh hash at the configured cost.
+"""
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import async_crud, auth
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """Raised when the hashing pool already has its maximum of pending calls."""
+
+
+class HashPool:
+    """Bounded executor with admission control on the number of pending calls."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated()
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self.pending, "max_pending": self.max_pending,
+                "rejected": self.rejected}
+
+
+# bcrypt is CPU-bound: more threads than cores only adds queueing inside the pool
+pool = HashPool(settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+def hash_cost(hashed_password: str) -> int:
+    """The bcrypt cost recorded in a hash ("$2b$12$..." -> 12)."""
+    return int(hashed_password.split("$")[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return hash_cost(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+async def hash_password(password: str) -> str:
+    return await pool.run(auth.get_password_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await pool.run(auth.verify_password, password, hashed_password)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    """Async counterpart of auth.authenticate_user that also upgrades stale hashes.
+
+    Raises PoolSaturated when the hashing pool is full.
+    """
+    user = await async_crud.get_user_by_email(db, email)
+    # Hand the connection back to the pool while bcrypt runs (expire_on_commit=False)
+    await db.commit()
+    if not user or not await verify_password(password, user.hashed_password):
+        return None
+    if needs_rehash(user.hashed_password):
+        try:
+            hashed: Optional[str] = await hash_password(password)
+        except PoolSaturated:
+            hashed = None  # the login still succeeds; upgrade on a later one
+        if hashed:
+            await async_crud.update_password_hash(db, user.id, hashed)
+            logger.info(f"Rehashed password for user {user.id} at cost {settings.BCRYPT_ROUNDS}")
+    return user
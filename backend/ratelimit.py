@@ -0,0 +1,91 @@
+"""
+Token-bucket throttling for the password endpoints.
+
+Every sign-in or sign-up attempt takes a token from the caller's IP bucket and
+from the bucket of the email it names, before any user lookup or bcrypt work.
+Buckets refill continuously at the configured rate up to their burst size; an
+empty bucket means 429 with Retry-After. State is per process, so with several
+workers the effective limit is per worker.
+
+The IP is the connection's peer address; behind a reverse proxy run uvicorn
+with --proxy-headers so it reflects X-Forwarded-For.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from .config import settings
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets, at most `max_keys` of them (least recently used go first)."""
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, max_keys: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, at)
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: str) -> float:
+        """Take a token for `key`; returns 0 if allowed, else seconds until one is available."""
+        now = self._clock()
+        with self._lock:
+            tokens, at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - at) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate if self.rate > 0 else math.inf
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self.allowed = self.rejected = 0
+
+    def stats(self) -> dict:
+        return {"allowed": self.allowed, "rejected": self.rejected, "tracked_keys": len(self._buckets)}
+
+
+by_ip = TokenBucketLimiter("ip", settings.AUTH_RATE_PER_IP_PER_MINUTE, settings.AUTH_BURST_PER_IP)
+by_email = TokenBucketLimiter("email", settings.AUTH_RATE_PER_EMAIL_PER_MINUTE, settings.AUTH_BURST_PER_EMAIL)
+
+
+def check_auth_attempt(request: Request, email: str):
+    """Raise 429 if this IP or this email has run out of sign-in/sign-up attempts."""
+    if not settings.AUTH_RATE_LIMIT_ENABLED:
+        return
+    ip = request.client.host if request.client else "unknown"
+    for limiter, key in ((by_ip, ip), (by_email, email.strip().lower())):
+        wait = limiter.acquire(key)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please wait before trying again",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+
+def stats() -> dict:
+    return {"enabled": settings.AUTH_RATE_LIMIT_ENABLED, "ip": by_ip.stats(), "email": by_email.stats()}
+
+
+def reset():
+    by_ip.reset()
+    by_email.reset()
@@ -0,0 +1,274 @@
+"""
+Daily rollup tables for expenses and invoices.
+
+crud.py keeps these in step with the ledger inside the same transaction as every
+write, so summaries read a few pre-aggregated rows per day instead of scanning
+the raw tables. Run as a module to rebuild or verify them:
+
+    python -m backend.rollups rebuild [--owner ID]
+    python -m backend.rollups check [--owner ID]
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import cache, models, versions
+
+# A contribution is (primary key, (summed values...)) for one ledger row.
+Contribution = Tuple[tuple, tuple]
+
+# Ledger columns each contribution reads; writes touching none of them leave rollups alone
+EXPENSE_FIELDS = frozenset({"owner_id", "date", "category", "vendor", "amount", "gst_amount"})
+INVOICE_FIELDS = frozenset({"owner_id", "date", "status", "total_amount"})
+
+_EXPENSE_VALUES = ("total_amount", "gst_total", "expense_count")
+_INVOICE_VALUES = ("total_amount", "invoice_count")
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+# ── Contributions ─────────────────────────────────────────────────────────────
+
+def expense_contribution(expense) -> Contribution:
+    """What a single expense adds to its rollup row."""
+    key = (expense.owner_id, expense.date, expense.category or "misc", expense.vendor or "")
+    return key, (expense.amount, expense.gst_amount or 0.0, 1)
+
+
+def invoice_contribution(invoice) -> Contribution:
+    """What a single invoice adds to its rollup row.
+
+    A missing status is kept as "" rather than folded into "draft": summaries
+    count it as a draft but, as the ledger scan did, not as pending.
+    """
+    key = (invoice.owner_id, invoice.date, invoice.status or "")
+    return key, (invoice.total_amount, 1)
+
+
+def _apply(db: Session, model, kind: str, value_names, removed, added):
+    deltas = defaultdict(lambda: [0] * len(value_names))
+    for sign, contributions in ((-1, removed), (1, added)):
+        for key, values in contributions:
+            for i, value in enumerate(values):
+                deltas[key][i] += sign * value
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    cache.touch(db, kind, {key[:2] for key in deltas})
+
+    key_names = [c.name for c in model.__table__.primary_key]
+    dialect = db.get_bind().dialect.name
+    if dialect in _UPSERT_INSERTS:
+        # One executemany upsert for every touched rollup row
+        stmt = _UPSERT_INSERTS[dialect](model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_names,
+            set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in value_names},
+        )
+        db.execute(stmt, [
+            {**dict(zip(key_names, key)), **dict(zip(value_names, delta))}
+            for key, delta in deltas.items()
+        ])
+        if any(delta[-1] < 0 for delta in deltas.values()):
+            owners = {key[0] for key, delta in deltas.items() if delta[-1] < 0}
+            count = getattr(model, value_names[-1])
+            db.execute(delete(model).where(model.owner_id.in_(owners), count <= 0))
+        return
+
+    for key, delta in deltas.items():
+        row = db.get(model, key)
+        if row is None:
+            if delta[-1] <= 0:
+                continue  # nothing to take away from
+            row = model(**dict(zip(key_names, key)))
+            for name in value_names:
+                setattr(row, name, 0)
+            db.add(row)
+        for name, value in zip(value_names, delta):
+            setattr(row, name, getattr(row, name) + value)
+        if getattr(row, value_names[-1]) <= 0:
+            db.delete(row)
+        db.flush()
+
+
+def apply_expense_changes(
+    db: Session,
+    removed: Iterable[Contribution] = (),
+    added: Iterable[Contribution] = (),
+):
+    """Move expense contributions in or out of the rollups (no commit)."""
+    _apply(db, models.ExpenseDailyRollup, "expense", _EXPENSE_VALUES, removed, added)
+
+
+def apply_invoice_changes(
+    db: Session,
+    removed: Iterable[Contribution] = (),
+    added: Iterable[Contribution] = (),
+):
+    """Move invoice contributions in or out of the rollups (no commit)."""
+    _apply(db, models.InvoiceDailyRollup, "invoice", _INVOICE_VALUES, removed, added)
+
+
+# ── Summaries ─────────────────────────────────────────────────────────────────
+
+def expense_summary(db: Session, user_id: int, start_date: date, end_date: date, period_label: str = "") -> dict:
+    """Build an ExpenseSummary dict from the daily rollups."""
+    r = models.ExpenseDailyRollup
+    in_range = (r.owner_id == user_id, r.day >= start_date, r.day <= end_date)
+
+    category_rows = (
+        db.query(r.category, func.sum(r.total_amount), func.sum(r.gst_total), func.sum(r.expense_count))
+        .filter(*in_range)
+        .group_by(r.category)
+        .all()
+    )
+
+    vendor_total = func.sum(r.total_amount)
+    top_vendors = (
+        db.query(r.vendor)
+        .filter(*in_range, r.vendor != "")
+        .group_by(r.vendor)
+        .order_by(vendor_total.desc(), r.vendor)
+        .limit(5)
+        .all()
+    )
+
+    return {
+        "total_amount": round(sum(row[1] for row in category_rows), 2),
+        "expense_count": sum(row[3] for row in category_rows),
+        "by_category": {row[0]: round(row[1], 2) for row in category_rows},
+        "top_vendors": [row[0] for row in top_vendors],
+        "gst_total": round(sum(row[2] for row in category_rows), 2),
+        "period": period_label,
+    }
+
+
+def invoice_summary(db: Session, user_id: int, start_date: date, end_date: date, period_label: str = "") -> dict:
+    """Build an InvoiceSummary dict from the daily rollups."""
+    r = models.InvoiceDailyRollup
+    status_rows = (
+        db.query(r.status, func.sum(r.total_amount), func.sum(r.invoice_count))
+        .filter(r.owner_id == user_id, r.day >= start_date, r.day <= end_date)
+        .group_by(r.status)
+        .all()
+    )
+
+    amounts = {st: amount for st, amount, _ in status_rows}
+    by_status = {}
+    for st, _, count in status_rows:
+        by_status[st or "draft"] = by_status.get(st or "draft", 0) + count
+
+    return {
+        "total_amount": round(sum(amounts.values()), 2),
+        "invoice_count": sum(by_status.values()),
+        "paid_amount": round(amounts.get("paid", 0), 2),
+        "pending_amount": round(amounts.get("draft", 0) + amounts.get("sent", 0), 2),
+        "overdue_count": by_status.get("overdue", 0),
+        "by_status": by_status,
+        "period": period_label,
+    }
+
+
+# ── Rebuild / consistency check ───────────────────────────────────────────────
+
+def _expense_ledger_select(owner_id: Optional[int]):
+    e = models.Expense
+    category = func.coalesce(func.nullif(e.category, ""), "misc")
+    vendor = func.coalesce(e.vendor, "")
+    stmt = select(
+        e.owner_id, e.date, category, vendor,
+        func.sum(e.amount), func.coalesce(func.sum(e.gst_amount), 0.0), func.count(e.id),
+    ).group_by(e.owner_id, e.date, category, vendor)
+    if owner_id is not None:
+        stmt = stmt.where(e.owner_id == owner_id)
+    return stmt
+
+
+def _invoice_ledger_select(owner_id: Optional[int]):
+    i = models.Invoice
+    status = func.coalesce(i.status, "")
+    stmt = select(
+        i.owner_id, i.date, status, func.sum(i.total_amount), func.count(i.id),
+    ).group_by(i.owner_id, i.date, status)
+    if owner_id is not None:
+        stmt = stmt.where(i.owner_id == owner_id)
+    return stmt
+
+
+def rebuild(db: Session, owner_id: Optional[int] = None):
+    """Recompute rollups from the ledger with INSERT ... SELECT and commit."""
+    for model, ledger_select, columns in (
+        (models.ExpenseDailyRollup, _expense_ledger_select,
+         ["owner_id", "day", "category", "vendor", *_EXPENSE_VALUES]),
+        (models.InvoiceDailyRollup, _invoice_ledger_select,
+         ["owner_id", "day", "status", *_INVOICE_VALUES]),
+    ):
+        stmt = delete(model)
+        if owner_id is not None:
+            stmt = stmt.where(model.owner_id == owner_id)
+        db.execute(stmt)
+        db.execute(insert(model).from_select(columns, ledger_select(owner_id)))
+    # Summaries may have changed, so cached copies (ETags, cache.py) must go
+    for kind in cache.KINDS:
+        cache.touch(db, kind, [(owner_id, None)])
+    if owner_id is None:
+        versions.bump_all(db)
+    else:
+        versions.bump(db, [owner_id])
+    db.commit()
+
+
+def check(db: Session, owner_id: Optional[int] = None, tolerance: float = 0.01) -> List[dict]:
+    """Compare rollups against the ledger; returns one entry per mismatched row."""
+    mismatches = []
+    for table, model, ledger_select, width in (
+        ("expenses", models.ExpenseDailyRollup, _expense_ledger_select, 4),
+        ("invoices", models.InvoiceDailyRollup, _invoice_ledger_select, 3),
+    ):
+        expected = {tuple(row[:width]): tuple(row[width:]) for row in db.execute(ledger_select(owner_id))}
+        key_columns = list(model.__table__.primary_key)
+        value_names = _EXPENSE_VALUES if model is models.ExpenseDailyRollup else _INVOICE_VALUES
+        stmt = select(*key_columns, *(getattr(model, name) for name in value_names))
+        if owner_id is not None:
+            stmt = stmt.where(model.owner_id == owner_id)
+        actual = {tuple(row[:width]): tuple(row[width:]) for row in db.execute(stmt)}
+
+        for key in expected.keys() | actual.keys():
+            want, got = expected.get(key), actual.get(key)
+            if want is None or got is None or any(abs(a - b) > tolerance for a, b in zip(want, got)):
+                mismatches.append({"table": table, "key": key, "expected": want, "actual": got})
+    return mismatches
+
+
+def main(argv=None) -> int:
+    from .database import SessionLocal
+
+    parser = argparse.ArgumentParser(prog="python -m backend.rollups", description="Maintain daily rollup tables.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--owner", type=int, default=None, help="Limit to a single user id")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rebuild(db, owner_id=args.owner)
+            print("Rollups rebuilt.")
+            return 0
+        mismatches = check(db, owner_id=args.owner)
+        for m in mismatches:
+            print(f"{m['table']} {m['key']}: ledger={m['expected']} rollup={m['actual']}")
+        print(f"{len(mismatches)} mismatched rollup row(s).")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,54 @@
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas, auth
+from .. import async_crud, crud, schemas, auth, passwords, ratelimit
 from ..config import settings
-from ..database import get_db
+from ..database import get_async_db, get_db
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+# Async routes: bcrypt runs on the password pool (passwords.py), never on the
+# threadpool the sync routes share.
+
 @router.post("/register", response_model=schemas.User, status_code=201)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(request: Request, user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user account."""
-    db_user = crud.get_user_by_email(db, email=user.email)
+    ratelimit.check_auth_attempt(request, user.email)
+    db_user = await async_crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await passwords.hash_password(user.password)
+    except passwords.PoolSaturated:
+        raise _hashing_busy()
+    return await async_crud.create_user(db, user, hashed_password)
 
 
 @router.post("/token", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
     """Login and receive JWT access token."""
-    user = auth.authenticate_user(db, form_data.username, form_data.password)
+    ratelimit.check_auth_attempt(request, form_data.username)
+    try:
+        user = await passwords.authenticate_user(db, form_data.username, form_data.password)
+    except passwords.PoolSaturated:
+        raise _hashing_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,7 +56,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token = auth.create_access_token(
-        data={"sub": user.email},
+        data=auth.token_claims(user),
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -2,16 +2,17 @@ from datetime import date, timedelta
 from typing import Optional, List
 from calendar import monthrange
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas, auth
+from .. import crud, schemas, auth, etags, ledger_io
 from ..database import get_db
 
 router = APIRouter(prefix="/api/expenses", tags=["Expenses"])
 
 
-@router.get("/", response_model=List[schemas.Expense])
+@router.get("/", response_model=List[schemas.Expense], dependencies=[Depends(etags.conditional_get)])
 def list_expenses(
     skip: int = 0,
     limit: int = Query(default=50, le=200),
@@ -31,7 +32,69 @@ def list_expenses(
     )
 
 
-@router.get("/summary/daily", response_model=schemas.ExpenseSummary)
+@router.get("/page", response_model=schemas.ExpensePage, dependencies=[Depends(etags.conditional_get)])
+def list_expenses_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    vendor: Optional[str] = None,
+    search: Optional[str] = None,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Cursor-paginated expenses, newest first. Pass next_cursor back to get the next page."""
+    try:
+        items, next_cursor = crud.get_expenses_page(
+            db, user_id=current_user.id, limit=limit, cursor=cursor,
+            start_date=start_date, end_date=end_date,
+            category=category, vendor=vendor, search=search,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/export")
+def export_expenses(
+    format: str = Query(default="csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    vendor: Optional[str] = None,
+    search: Optional[str] = None,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream the full (filtered) expense ledger as CSV or NDJSON, optionally gzipped."""
+    columns = ledger_io.EXPENSE_EXPORT_COLUMNS
+    rows = crud.iter_expense_rows(
+        db, current_user.id, columns, batch_size=ledger_io.EXPORT_BATCH_SIZE,
+        start_date=start_date, end_date=end_date,
+        category=category, vendor=vendor, search=search,
+    )
+    filename = ledger_io.export_filename("expenses", format, gzip)
+    return StreamingResponse(
+        ledger_io.stream_export(rows, columns, format, compress=gzip, on_close=db.close),
+        media_type="application/gzip" if gzip else ledger_io.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/search", response_model=List[schemas.Expense], dependencies=[Depends(etags.conditional_get)])
+def search_expenses(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Full-text search over description, vendor and notes, best match first."""
+    return crud.search_expenses(db, current_user.id, q, limit=limit)
+
+
+@router.get("/summary/daily", response_model=schemas.ExpenseSummary, dependencies=[Depends(etags.conditional_get)])
 def daily_summary(
     target_date: Optional[date] = None,
     current_user=Depends(auth.get_current_user),
@@ -42,7 +105,7 @@ def daily_summary(
     return crud.get_expense_summary(db, current_user.id, d, d, period_label=d.isoformat())
 
 
-@router.get("/summary/monthly", response_model=schemas.ExpenseSummary)
+@router.get("/summary/monthly", response_model=schemas.ExpenseSummary, dependencies=[Depends(etags.conditional_get)])
 def monthly_summary(
     year: int = Query(default=None),
     month: int = Query(default=None, ge=1, le=12),
@@ -58,7 +121,7 @@ def monthly_summary(
     return crud.get_expense_summary(db, current_user.id, start, end, period_label=f"{y}-{m:02d}")
 
 
-@router.get("/summary/yearly", response_model=schemas.ExpenseSummary)
+@router.get("/summary/yearly", response_model=schemas.ExpenseSummary, dependencies=[Depends(etags.conditional_get)])
 def yearly_summary(
     year: int = Query(default=None),
     current_user=Depends(auth.get_current_user),
@@ -71,7 +134,7 @@ def yearly_summary(
     return crud.get_expense_summary(db, current_user.id, start, end, period_label=str(y))
 
 
-@router.get("/{expense_id}", response_model=schemas.Expense)
+@router.get("/{expense_id}", response_model=schemas.Expense, dependencies=[Depends(etags.conditional_get)])
 def get_expense(
     expense_id: int,
     current_user=Depends(auth.get_current_user),
@@ -94,6 +157,37 @@ def create_expense(
     return crud.create_expense(db, expense, current_user.id)
 
 
+@router.post("/import", response_model=schemas.ImportResult)
+def import_expenses(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(default=None, pattern="^(csv|ndjson)$"),
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Bulk-import expenses from a CSV or NDJSON upload. Bad rows are reported, not fatal."""
+    fmt = format or ledger_io.detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unknown file format; pass ?format=csv or ?format=ndjson")
+    return ledger_io.import_expenses(db, file.file, fmt, current_user.id)
+
+
+@router.patch("/bulk", response_model=schemas.BulkResult)
+def bulk_update_expenses(
+    body: schemas.ExpenseBulkUpdate,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Apply one patch to many expenses (by ids or filter) in a single UPDATE."""
+    ids = body.ids
+    if ids is None:
+        ids = crud.find_expense_ids(
+            db, current_user.id, limit=schemas.BULK_MAX_ROWS + 1, **body.filter.model_dump(exclude_none=True)
+        )
+        if len(ids) > schemas.BULK_MAX_ROWS:
+            raise HTTPException(status_code=400, detail=f"Filter matches more than {schemas.BULK_MAX_ROWS} expenses; narrow it")
+    return crud.bulk_update_expenses(db, current_user.id, ids, body.patch)
+
+
 @router.put("/{expense_id}", response_model=schemas.Expense)
 def update_expense(
     expense_id: int,
@@ -3,15 +3,16 @@ from typing import Optional, List
 from calendar import monthrange
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas, auth
+from .. import crud, schemas, auth, etags, ledger_io
 from ..database import get_db
 
 router = APIRouter(prefix="/api/invoices", tags=["Invoices"])
 
 
-@router.get("/", response_model=List[schemas.Invoice])
+@router.get("/", response_model=List[schemas.Invoice], dependencies=[Depends(etags.conditional_get)])
 def list_invoices(
     skip: int = 0,
     limit: int = Query(default=50, le=200),
@@ -30,7 +31,66 @@ def list_invoices(
     )
 
 
-@router.get("/summary/monthly", response_model=schemas.InvoiceSummary)
+@router.get("/page", response_model=schemas.InvoicePage, dependencies=[Depends(etags.conditional_get)])
+def list_invoices_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Cursor-paginated invoices, newest first. Pass next_cursor back to get the next page."""
+    try:
+        items, next_cursor = crud.get_invoices_page(
+            db, user_id=current_user.id, limit=limit, cursor=cursor,
+            start_date=start_date, end_date=end_date,
+            status=status, search=search,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/export")
+def export_invoices(
+    format: str = Query(default="csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream the full (filtered) invoice ledger as CSV or NDJSON, optionally gzipped."""
+    columns = ledger_io.INVOICE_EXPORT_COLUMNS
+    rows = crud.iter_invoice_rows(
+        db, current_user.id, columns, batch_size=ledger_io.EXPORT_BATCH_SIZE,
+        start_date=start_date, end_date=end_date, status=status, search=search,
+    )
+    filename = ledger_io.export_filename("invoices", format, gzip)
+    return StreamingResponse(
+        ledger_io.stream_export(rows, columns, format, compress=gzip, on_close=db.close),
+        media_type="application/gzip" if gzip else ledger_io.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/search", response_model=List[schemas.Invoice], dependencies=[Depends(etags.conditional_get)])
+def search_invoices(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Full-text search over customer name and description, best match first."""
+    return crud.search_invoices(db, current_user.id, q, limit=limit)
+
+
+@router.get("/summary/monthly", response_model=schemas.InvoiceSummary, dependencies=[Depends(etags.conditional_get)])
 def monthly_summary(
     year: int = Query(default=None),
     month: int = Query(default=None, ge=1, le=12),
@@ -46,7 +106,7 @@ def monthly_summary(
     return crud.get_invoice_summary(db, current_user.id, start, end, period_label=f"{y}-{m:02d}")
 
 
-@router.get("/summary/yearly", response_model=schemas.InvoiceSummary)
+@router.get("/summary/yearly", response_model=schemas.InvoiceSummary, dependencies=[Depends(etags.conditional_get)])
 def yearly_summary(
     year: int = Query(default=None),
     current_user=Depends(auth.get_current_user),
@@ -59,7 +119,7 @@ def yearly_summary(
     return crud.get_invoice_summary(db, current_user.id, start, end, period_label=str(y))
 
 
-@router.get("/{invoice_id}", response_model=schemas.Invoice)
+@router.get("/{invoice_id}", response_model=schemas.Invoice, dependencies=[Depends(etags.conditional_get)])
 def get_invoice(
     invoice_id: int,
     current_user=Depends(auth.get_current_user),
@@ -82,6 +142,49 @@ def create_invoice(
     return crud.create_invoice(db, invoice, current_user.id)
 
 
+def _bulk_ids(db: Session, user_id: int, selection: schemas.InvoiceBulkSelection):
+    if selection.ids is not None:
+        return selection.ids
+    ids = crud.find_invoice_ids(
+        db, user_id, limit=schemas.BULK_MAX_ROWS + 1, **selection.filter.model_dump(exclude_none=True)
+    )
+    if len(ids) > schemas.BULK_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"Filter matches more than {schemas.BULK_MAX_ROWS} invoices; narrow it")
+    return ids
+
+
+@router.patch("/bulk", response_model=schemas.BulkResult)
+def bulk_update_invoices(
+    body: schemas.InvoiceBulkUpdate,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Apply one patch to many invoices (by ids or filter) in a single UPDATE."""
+    return crud.bulk_update_invoices(db, current_user.id, _bulk_ids(db, current_user.id, body), body.patch)
+
+
+@router.post("/bulk/mark-paid", response_model=schemas.BulkResult)
+def bulk_mark_paid(
+    selection: schemas.InvoiceBulkSelection,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Mark many invoices as paid."""
+    ids = _bulk_ids(db, current_user.id, selection)
+    return crud.bulk_update_invoices(db, current_user.id, ids, schemas.InvoiceUpdate(status="paid"))
+
+
+@router.post("/bulk/mark-sent", response_model=schemas.BulkResult)
+def bulk_mark_sent(
+    selection: schemas.InvoiceBulkSelection,
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Mark many invoices as sent."""
+    ids = _bulk_ids(db, current_user.id, selection)
+    return crud.bulk_update_invoices(db, current_user.id, ids, schemas.InvoiceUpdate(status="sent"))
+
+
 @router.put("/{invoice_id}", response_model=schemas.Invoice)
 def update_invoice(
     invoice_id: int,
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from .. import crud, schemas, auth
+from ..database import get_db
+
+router = APIRouter(prefix="/api/sync", tags=["Sync"])
+
+
+@router.get("", response_model=schemas.SyncChanges)
+def sync_changes(
+    since: Optional[str] = Query(default=None, description="next_token from the previous sync; omit for a full sync"),
+    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Expenses and invoices changed or deleted since the last sync."""
+    try:
+        return crud.get_changes(db, current_user.id, since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
@@ -2,10 +2,11 @@ import logging
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .. import crud, schemas, auth, llm_service
-from ..database import get_db
+from .. import async_crud, schemas, auth, intents, llm_limiter, llm_service
+from ..config import settings
+from ..database import get_async_db
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +17,26 @@ router = APIRouter(prefix="/api/webhook", tags=["Webhook"])
 async def webhook_text(
     message: schemas.TextMessage,
     current_user=Depends(auth.get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Process a text message: classify intent → extract data → save."""
     logger.info(f"Text from {current_user.email}: {message.text[:100]}")
-
-    intent = await llm_service.classify_intent(message.text)
+    llm_limiter.user.set(current_user.id)  # Gemini slots are shared fairly between users
+
+    # Obvious messages are labelled locally; otherwise one round trip for
+    # intent + payload, with the two-call path as the fallback
+    intent, extracted = intents.confident_intent(message.text), None
+    if intent is None and settings.LLM_COMBINED_EXTRACTION:
+        combined = await llm_service.classify_and_extract(message.text)
+        if combined:
+            intent, extracted = combined["intent"], combined["data"]
+    if intent is None:
+        intent = await llm_service.classify_intent(message.text)
     logger.info(f"Intent: {intent}")
 
     if intent == "expense_record":
         try:
-            data = await llm_service.extract_expense(message.text)
+            data = extracted or await llm_service.extract_expense(message.text)
             expense = schemas.ExpenseCreate(
                 date=data.get("date", date.today().isoformat()),
                 description=data.get("description", "Unknown"),
@@ -39,7 +49,7 @@ async def webhook_text(
                 notes=data.get("notes"),
                 source="text",
             )
-            result = crud.create_expense(db, expense, current_user.id)
+            result = await async_crud.create_expense(db, expense, current_user.id)
             return schemas.WebhookResponse(
                 status="ok",
                 message=f"✅ Expense recorded: {result.description} — ₹{result.amount:.2f}",
@@ -54,7 +64,7 @@ async def webhook_text(
 
     elif intent == "invoice_create":
         try:
-            data = await llm_service.extract_invoice(message.text)
+            data = extracted or await llm_service.extract_invoice(message.text)
             invoice = schemas.InvoiceCreate(
                 date=data.get("date", date.today().isoformat()),
                 customer_name=data.get("customer_name", "Unknown"),
@@ -68,7 +78,7 @@ async def webhook_text(
                 due_date=data.get("due_date"),
                 notes=data.get("notes"),
             )
-            result = crud.create_invoice(db, invoice, current_user.id)
+            result = await async_crud.create_invoice(db, invoice, current_user.id)
             return schemas.WebhookResponse(
                 status="ok",
                 message=f"✅ Invoice #{result.invoice_number} created for {result.customer_name} — ₹{result.total_amount:.2f}",
@@ -89,7 +99,7 @@ async def webhook_text(
         # Return this month's expense summary
         today = date.today()
         start = date(today.year, today.month, 1)
-        summary = crud.get_expense_summary(db, current_user.id, start, today, period_label=f"{today.year}-{today.month:02d}")
+        summary = await async_crud.get_expense_summary(db, current_user.id, start, today, period_label=f"{today.year}-{today.month:02d}")
         msg = (
             f"📊 Summary for {summary['period']}:\n"
             f"Total: ₹{summary['total_amount']:,.2f}\n"
@@ -107,10 +117,11 @@ async def webhook_text(
 async def webhook_image(
     image: UploadFile = File(...),
     current_user=Depends(auth.get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Process an uploaded receipt/bill image using Gemini Vision."""
     logger.info(f"Image from {current_user.email}: {image.filename}")
+    llm_limiter.user.set(current_user.id)
 
     try:
         image_bytes = await image.read()
@@ -149,10 +160,10 @@ async def webhook_image(
 async def confirm_image_expense(
     expense: schemas.ExpenseCreate,
     current_user=Depends(auth.get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Confirm and save an expense extracted from a receipt image."""
-    result = crud.create_expense(db, expense, current_user.id)
+    result = await async_crud.create_expense(db, expense, current_user.id)
     return schemas.WebhookResponse(
         status="ok",
         message=f"✅ Expense saved: {result.description} — ₹{result.amount:.2f}",
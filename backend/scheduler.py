@@ -0,0 +1,162 @@
+"""
+In-process background jobs, started from the app's lifespan hook.
+
+Every uvicorn worker runs a Scheduler, but a job only runs where its lease in
+`scheduler_leases` is held: the holder renews the lease on each tick and the
+other workers skip the job until it lapses (e.g. the holder died). The same row
+records the last run, so /health reports it from any worker.
+
+Jobs: the overdue-invoice sweep, and pruning of delta-sync tombstones older
+than SYNC_MAX_AGE_DAYS (see crud.get_changes).
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import crud, models
+
+logger = logging.getLogger(__name__)
+
+OVERDUE_JOB = "overdue_invoices"
+TOMBSTONE_JOB = "sync_tombstones"
+
+# Identifies this process in the lease table
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def acquire_lease(db: Session, name: str, holder: str, ttl_seconds: float, now: Optional[datetime] = None) -> bool:
+    """Take or renew the lease on a job; False while another live holder has it."""
+    now = now or _utcnow()
+    lease = models.SchedulerLease
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    taken = db.execute(
+        update(lease)
+        .where(lease.name == name, or_(lease.holder == holder, lease.holder.is_(None), lease.expires_at < now))
+        .values(holder=holder, expires_at=expires_at)
+    ).rowcount
+    if not taken:
+        if db.get(lease, name) is not None:
+            db.rollback()
+            return False
+        db.add(lease(name=name, holder=holder, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # another worker created the row first
+        return False
+    return True
+
+
+def _record_run(db: Session, name: str, started_at: datetime, duration_ms: float,
+                result: Optional[int], error: Optional[str]):
+    db.execute(
+        update(models.SchedulerLease)
+        .where(models.SchedulerLease.name == name)
+        .values(last_run_at=started_at, last_duration_ms=duration_ms, last_result=result, last_error=error)
+    )
+    db.commit()
+
+
+def _run_job(db: Session, name: str, job: Callable[[], int], holder: str, ttl_seconds: float) -> Optional[int]:
+    """Run `job` if this worker holds the lease on `name` and record the run.
+
+    Returns the job's result, or None when another worker holds the lease or
+    the run failed.
+    """
+    if not acquire_lease(db, name, holder, ttl_seconds):
+        return None
+    started_at, t0 = _utcnow(), time.perf_counter()
+    result, error = None, None
+    try:
+        result = job()
+    except Exception as e:
+        db.rollback()
+        error = f"{type(e).__name__}: {e}"
+        logger.error(f"Job {name} failed: {error}")
+    duration_ms = (time.perf_counter() - t0) * 1000
+    _record_run(db, name, started_at, duration_ms, result, error)
+    return result
+
+
+def run_overdue_job(db: Session, holder: str = HOLDER_ID, ttl_seconds: float = 7200,
+                    today: Optional[date] = None) -> Optional[int]:
+    """Mark past-due invoices overdue; returns how many flipped (None: skipped or failed)."""
+    t0 = time.perf_counter()
+    result = _run_job(db, OVERDUE_JOB, lambda: crud.mark_overdue_invoices(db, today or date.today()),
+                      holder, ttl_seconds)
+    if result:
+        logger.info(f"Marked {result} invoice(s) overdue in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    return result
+
+
+def run_tombstone_job(db: Session, holder: str = HOLDER_ID, ttl_seconds: float = 7200) -> Optional[int]:
+    """Prune sync tombstones past SYNC_MAX_AGE_DAYS; returns how many went (None: skipped or failed)."""
+    result = _run_job(db, TOMBSTONE_JOB, lambda: crud.prune_sync_tombstones(db), holder, ttl_seconds)
+    if result:
+        logger.info(f"Pruned {result} sync tombstone(s)")
+    return result
+
+
+def job_status(db: Session) -> dict:
+    """Last run of every job, as recorded in the lease table."""
+    return {
+        row.name: {
+            "holder": row.holder,
+            "last_run_at": row.last_run_at.isoformat() if row.last_run_at else None,
+            "last_duration_ms": round(row.last_duration_ms, 2) if row.last_duration_ms is not None else None,
+            "last_result": row.last_result,
+            "last_error": row.last_error,
+        }
+        for row in db.query(models.SchedulerLease).order_by(models.SchedulerLease.name)
+    }
+
+
+class Scheduler:
+    """Runs the jobs now and then every `interval_seconds`, off the event loop."""
+
+    def __init__(self, session_factory, interval_seconds: float):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _tick(self):
+        db = self.session_factory()
+        try:
+            # Outlive one missed tick so a slow run does not hand the job to another worker
+            run_overdue_job(db, ttl_seconds=self.interval_seconds * 2)
+            run_tombstone_job(db, ttl_seconds=self.interval_seconds * 2)
+        finally:
+            db.close()
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self._tick)
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {type(e).__name__}: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
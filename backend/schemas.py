@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
+import datetime as dt
 from datetime import date, datetime
 from typing import Optional, List
 
@@ -65,7 +66,7 @@ class ExpenseCreate(ExpenseBase):
 
 
 class ExpenseUpdate(BaseModel):
-    date: Optional[date] = None
+    date: Optional[dt.date] = None
     description: Optional[str] = None
     amount: Optional[float] = Field(default=None, gt=0)
     category: Optional[str] = None
@@ -87,6 +88,22 @@ class Expense(ExpenseBase):
     model_config = {"from_attributes": True}
 
 
+class ExpensePage(BaseModel):
+    items: List[Expense]
+    next_cursor: Optional[str] = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = []
+
+
 # ── Invoice ───────────────────────────────────────────────────────────────────
 
 class InvoiceBase(BaseModel):
@@ -111,7 +128,7 @@ class InvoiceCreate(InvoiceBase):
 
 
 class InvoiceUpdate(BaseModel):
-    date: Optional[date] = None
+    date: Optional[dt.date] = None
     customer_name: Optional[str] = None
     customer_email: Optional[str] = None
     customer_phone: Optional[str] = None
@@ -121,7 +138,7 @@ class InvoiceUpdate(BaseModel):
     gst_amount: Optional[float] = None
     total_amount: Optional[float] = Field(default=None, gt=0)
     status: Optional[str] = None
-    due_date: Optional[date] = None
+    due_date: Optional[dt.date] = None
     tags: Optional[str] = None
     notes: Optional[str] = None
 
@@ -136,6 +153,11 @@ class Invoice(InvoiceBase):
     model_config = {"from_attributes": True}
 
 
+class InvoicePage(BaseModel):
+    items: List[Invoice]
+    next_cursor: Optional[str] = None
+
+
 # ── Summaries ─────────────────────────────────────────────────────────────────
 
 class ExpenseSummary(BaseModel):
@@ -157,6 +179,84 @@ class InvoiceSummary(BaseModel):
     period: str = ""
 
 
+# ── Delta sync ────────────────────────────────────────────────────────────────
+
+class SyncChanges(BaseModel):
+    expenses: List[Expense] = []
+    invoices: List[Invoice] = []
+    deleted_expenses: List[int] = []
+    deleted_invoices: List[int] = []
+    next_token: str
+    full_resync: bool = False  # replace local data: no token, or one past SYNC_MAX_AGE_DAYS
+
+
+# ── Bulk edits ────────────────────────────────────────────────────────────────
+
+BULK_MAX_ROWS = 1000
+
+
+class ExpenseBulkFilter(BaseModel):
+    start_date: Optional[dt.date] = None
+    end_date: Optional[dt.date] = None
+    category: Optional[str] = None
+    vendor: Optional[str] = None
+    search: Optional[str] = None
+
+
+class InvoiceBulkFilter(BaseModel):
+    start_date: Optional[dt.date] = None
+    end_date: Optional[dt.date] = None
+    status: Optional[str] = None
+    search: Optional[str] = None
+
+
+class _BulkSelection(BaseModel):
+    """Rows to act on: an explicit id list or a filter, never both."""
+    ids: Optional[List[int]] = Field(default=None, min_length=1, max_length=BULK_MAX_ROWS)
+
+    @model_validator(mode="after")
+    def _one_selector(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Give either 'ids' or 'filter'")
+        return self
+
+
+class ExpenseBulkUpdate(_BulkSelection):
+    filter: Optional[ExpenseBulkFilter] = None
+    patch: ExpenseUpdate
+
+    @model_validator(mode="after")
+    def _non_empty_patch(self):
+        if not self.patch.model_fields_set:
+            raise ValueError("'patch' must set at least one field")
+        return self
+
+
+class InvoiceBulkSelection(_BulkSelection):
+    filter: Optional[InvoiceBulkFilter] = None
+
+
+class InvoiceBulkUpdate(InvoiceBulkSelection):
+    patch: InvoiceUpdate
+
+    @model_validator(mode="after")
+    def _non_empty_patch(self):
+        if not self.patch.model_fields_set:
+            raise ValueError("'patch' must set at least one field")
+        return self
+
+
+class BulkOutcome(BaseModel):
+    id: int
+    status: str  # "updated" | "not_found"
+
+
+class BulkResult(BaseModel):
+    updated: int
+    not_found: int
+    results: List[BulkOutcome] = []
+
+
 # ── Webhook ───────────────────────────────────────────────────────────────────
 
 class TextMessage(BaseModel):
@@ -0,0 +1,178 @@
+"""
+Full-text search for the expense/invoice `search` filter.
+
+Backends, picked per database:
+- sqlite:     FTS5 external-content tables with the trigram tokenizer, kept in
+              sync by triggers, ranked with bm25().
+- postgresql: pg_trgm GIN indexes, which serve ILIKE directly; ranked with
+              word_similarity().
+- anything else (or SQLite without trigram support): plain ILIKE.
+
+Trigrams keep the old substring semantics ("petr" finds "Petrol Pump") and
+cope with Hinglish, where the same word shows up in several spellings and
+scripts. Every search term must match somewhere; terms shorter than three
+characters are too short for a trigram index and fall back to ILIKE.
+"""
+import sqlite3
+import unicodedata
+from typing import Dict, List, Tuple
+
+from sqlalchemy import DDL, Float, Integer, event, func, or_, select, text
+
+from . import models
+
+_MIN_TRIGRAM = 3
+
+# (table, indexed columns)
+SEARCH_TABLES = {
+    "expenses": ("description", "vendor", "notes"),
+    "invoices": ("customer_name", "description"),
+}
+
+_backends: Dict[str, str] = {}
+
+
+def is_search_table(name: str) -> bool:
+    """True for FTS virtual/shadow tables, which live outside the ORM metadata."""
+    return any(name == f"{t}_fts" or name.startswith(f"{t}_fts_") for t in SEARCH_TABLES)
+
+
+def sqlite_supports_trigram() -> bool:
+    return sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def sqlite_ddl(table: str) -> List[str]:
+    """FTS5 table + sync triggers for one ledger table."""
+    cols = SEARCH_TABLES[table]
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"new.{c}" for c in cols)
+    old_vals = ", ".join(f"old.{c}" for c in cols)
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{col_list}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {col_list} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+def postgresql_ddl(table: str) -> List[str]:
+    """pg_trgm GIN indexes for one ledger table."""
+    return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_{col}_trgm ON {table} USING gin ({col} gin_trgm_ops)"
+        for col in SEARCH_TABLES[table]
+    ]
+
+
+# create_all() (tests, scripts) gets the same search structures as the migrations
+for _table in (models.Expense.__table__, models.Invoice.__table__):
+    if sqlite_supports_trigram():
+        for _stmt in sqlite_ddl(_table.name):
+            event.listen(_table, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+        event.listen(
+            _table, "before_drop",
+            DDL(f"DROP TABLE IF EXISTS {_table.name}_fts").execute_if(dialect="sqlite"),
+        )
+    for _stmt in postgresql_ddl(_table.name):
+        event.listen(_table, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+
+
+# ── Query side ────────────────────────────────────────────────────────────────
+
+def tokenize(term: str) -> List[str]:
+    """Normalize a search string into lower-case word tokens (any script).
+
+    Letters, digits *and* combining marks count as word characters, so
+    Devanagari matras and viramas stay inside their word ("पेट्रोल").
+    """
+    term = unicodedata.normalize("NFKC", term).casefold()
+    cleaned = "".join(ch if unicodedata.category(ch)[0] in "LMN" else " " for ch in term)
+    return cleaned.split()
+
+
+def _backend(db) -> str:
+    bind = db.get_bind()
+    key = str(bind.engine.url)
+    if key not in _backends:
+        dialect = bind.dialect.name
+        if dialect == "postgresql":
+            _backends[key] = "trgm"
+        elif dialect == "sqlite":
+            row = db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'expenses_fts'")
+            ).first()
+            _backends[key] = "fts5" if row else "like"
+        else:
+            _backends[key] = "like"
+    return _backends[key]
+
+
+def _fts_query(tokens: List[str]) -> str:
+    return " AND ".join('"' + t.replace('"', '""') + '"' for t in tokens)
+
+
+def _like(model, columns, token):
+    return or_(*(getattr(model, c).ilike(f"%{token}%") for c in columns))
+
+
+def _split(tokens: List[str]) -> Tuple[List[str], List[str]]:
+    long_tokens = [t for t in tokens if len(t) >= _MIN_TRIGRAM]
+    short_tokens = [t for t in tokens if len(t) < _MIN_TRIGRAM]
+    return long_tokens, short_tokens
+
+
+def _fts_matches(table: str, tokens: List[str]):
+    fts = f"{table}_fts"
+    return (
+        text(f"SELECT rowid, bm25({fts}) AS rank FROM {fts} WHERE {fts} MATCH :fts_query")
+        .bindparams(fts_query=_fts_query(tokens))
+        .columns(rowid=Integer, rank=Float)
+        .subquery()
+    )
+
+
+def apply_filter(db, query, model, term: str):
+    """Restrict `query` to rows matching every token of `term`."""
+    table = model.__tablename__
+    columns = SEARCH_TABLES[table]
+    tokens = tokenize(term)
+    long_tokens, short_tokens = _split(tokens)
+    if long_tokens and _backend(db) == "fts5":
+        matches = _fts_matches(table, long_tokens)
+        query = query.filter(model.id.in_(select(matches.c.rowid)))
+    else:
+        short_tokens = tokens
+    for token in short_tokens:
+        query = query.filter(_like(model, columns, token))
+    return query
+
+
+def ranked(db, query, model, term: str):
+    """Filter `query` by `term` and order it best match first."""
+    table = model.__tablename__
+    columns = SEARCH_TABLES[table]
+    tokens = tokenize(term)
+    if not tokens:
+        return query.order_by(model.date.desc(), model.id.desc())
+    long_tokens, short_tokens = _split(tokens)
+    backend = _backend(db)
+
+    if long_tokens and backend == "fts5":
+        matches = _fts_matches(table, long_tokens)
+        query = query.join(matches, model.id == matches.c.rowid)
+        order = [matches.c.rank.asc()]  # bm25: lower is better
+    else:
+        short_tokens = tokens
+        if backend == "trgm":
+            phrase = " ".join(tokens)
+            order = [func.greatest(*(func.word_similarity(phrase, getattr(model, c)) for c in columns)).desc()]
+        else:
+            order = []
+    for token in short_tokens:
+        query = query.filter(_like(model, columns, token))
+    return query.order_by(*order, model.date.desc(), model.id.desc())
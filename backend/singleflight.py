@@ -0,0 +1,86 @@
+"""
+Coalesce identical concurrent calls into one.
+
+While a call for a key is in flight, later callers with the same key wait for
+it and share its result (or its exception) instead of running their own.
+Nothing is remembered once the call finishes — that is cache.py's job.
+
+`Group` is for threads (sync routes run in the threadpool); `AsyncGroup` is for
+coroutines on one event loop. Never call `Group.do` from an event-loop thread:
+a follower blocks the thread until the leader finishes.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    """Thread-level single flight."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.shared = 0  # calls answered by another caller's flight
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncGroup:
+    """Coroutine-level single flight.
+
+    The call runs as its own task so a cancelled caller (e.g. a dropped
+    request) neither cancels it for the others nor leaves them waiting. For
+    the same reason `fn` must not use resources owned by the caller, such as
+    its request's database session.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.shared += 1
+        else:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+
+            def forget(finished: asyncio.Task):
+                if self._tasks.get(key) is finished:
+                    del self._tasks[key]
+
+            task.add_done_callback(forget)
+        return await asyncio.shield(task)
@@ -0,0 +1,48 @@
+"""
+Per-tenant change versions.
+
+crud.py bumps a user's version in the same transaction as every ledger write,
+so "has anything of this user's changed?" is a single primary-key lookup.
+etags.py turns it into ETags for conditional GETs.
+"""
+from typing import Iterable
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def bump(db: Session, owner_ids: Iterable[int]):
+    """Advance the change version of each owner (no commit)."""
+    owner_ids = sorted(set(owner_ids))
+    if not owner_ids:
+        return
+    tv = models.TenantVersion
+    dialect = db.get_bind().dialect.name
+    if dialect in _UPSERT_INSERTS:
+        stmt = _UPSERT_INSERTS[dialect](tv)
+        stmt = stmt.on_conflict_do_update(index_elements=["owner_id"], set_={"version": tv.version + 1})
+        db.execute(stmt, [{"owner_id": owner_id, "version": 1} for owner_id in owner_ids])
+        return
+    for owner_id in owner_ids:
+        row = db.get(tv, owner_id)
+        if row is None:
+            db.add(tv(owner_id=owner_id, version=1))
+        else:
+            row.version += 1
+    db.flush()
+
+
+def bump_all(db: Session):
+    """Advance every tenant's version, e.g. after a global rollup rebuild (no commit)."""
+    db.execute(update(models.TenantVersion).values(version=models.TenantVersion.version + 1))
+
+
+def current(db: Session, owner_id: int) -> int:
+    version = db.scalar(select(models.TenantVersion.version).where(models.TenantVersion.owner_id == owner_id))
+    return version or 0
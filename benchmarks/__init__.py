@@ -0,0 +1 @@
+# Vyapar Benchmarks
@@ -0,0 +1,97 @@
+"""
+Benchmark: GET /api/expenses/ throughput with and without the resolved-user cache.
+
+Drives the app in-process with TestClient against a throwaway SQLite database
+and reports requests per second with the user looked up on every request, with
+the (sub, jti) cache, and with stateless tokens.
+
+Usage:
+    python -m benchmarks.bench_auth [--requests 2000] [--rows 50]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import auth, crud, schemas
+from backend.config import settings
+from backend.database import Base, get_db
+from backend.main import app
+
+
+def login(client) -> dict:
+    token = client.post("/api/auth/token", data={
+        "username": "bench@vyapar.ai", "password": "bench-pass",
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def requests_per_second(client, headers, n: int) -> float:
+    for _ in range(50):  # warm up
+        client.get("/api/expenses/", headers=headers)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        assert client.get("/api/expenses/", headers=headers).status_code == 200
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # per-request access logs would dominate the timings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        db = Session()
+        user = crud.create_user(db, schemas.UserCreate(email="bench@vyapar.ai", password="bench-pass", name="Bench"))
+        crud.bulk_create_expenses(db, [
+            schemas.ExpenseCreate(date=date(2026, 4, 1 + n % 28), description=f"Item {n}", amount=100).model_dump()
+            for n in range(args.rows)
+        ], user.id)
+        db.close()
+
+        def override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        cached = auth.user_cache
+        try:
+            with TestClient(app) as client:
+                headers = login(client)
+                auth.user_cache = auth.UserCache(max_entries=0, ttl_seconds=0)
+                uncached_rps = requests_per_second(client, headers, args.requests)
+                auth.user_cache = cached
+                cached_rps = requests_per_second(client, headers, args.requests)
+                settings.AUTH_STATELESS = True
+                stateless_rps = requests_per_second(client, login(client), args.requests)
+        finally:
+            settings.AUTH_STATELESS = False
+            auth.user_cache = cached
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+    print(f"GET /api/expenses/ ({args.rows} rows), {args.requests} requests")
+    print(f"  lookup per request {uncached_rps:8.0f} req/s")
+    print(f"  user cache         {cached_rps:8.0f} req/s   {cached_rps / uncached_rps:4.2f}x")
+    print(f"  stateless tokens   {stateless_rps:8.0f} req/s   {stateless_rps / uncached_rps:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
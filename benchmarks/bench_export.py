@@ -0,0 +1,64 @@
+"""
+Benchmark: streaming export memory vs. materializing ORM objects + Pydantic models.
+
+Usage:
+    python -m benchmarks.bench_export [--rows 100000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, ledger_io, schemas
+from backend.database import Base
+from benchmarks.bench_summaries import seed
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            user_id = seed(db, args.rows)
+
+        def streamed():
+            with Session() as db:
+                columns = ledger_io.EXPENSE_EXPORT_COLUMNS
+                rows = crud.iter_expense_rows(db, user_id, columns)
+                return sum(len(chunk) for chunk in ledger_io.stream_export(rows, columns, "csv", compress=True))
+
+        def materialized():
+            with Session() as db:
+                items = crud.get_expenses(db, user_id, limit=args.rows)
+                return sum(len(schemas.Expense.model_validate(e).model_dump_json()) for e in items)
+
+        print(f"{args.rows} expenses")
+        for name, fn in (("streamed csv.gz", streamed), ("ORM + Pydantic", materialized)):
+            elapsed, peak_mb, size = measure(fn)
+            print(f"  {name:16s} {elapsed:6.2f} s   peak {peak_mb:7.1f} MiB   {size / 2**20:6.1f} MiB out")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: rule-based expense extraction on the fixture corpus.
+
+Parses every message in benchmarks/data/expense_corpus.jsonl with
+backend.extraction and reports coverage (messages parsed without Gemini),
+precision (parsed messages whose amount, date, category and payment method
+all match the labels), per-field accuracy and parse latency. Dates are
+labelled relative to a fixed "today" of 2026-04-10.
+
+Usage:
+    python -m benchmarks.bench_extraction [--repeat 200] [--show-misses]
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from datetime import date
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from backend import extraction
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "expense_corpus.jsonl")
+TODAY = date(2026, 4, 10)
+FIELDS = ["amount", "date", "category", "payment_method", "vendor"]
+REQUIRED = ["amount", "date", "category", "payment_method"]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="parses per message for the latency figures")
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    parsed = correct = 0
+    field_hits = Counter()
+    latencies_us = []
+    for case in corpus:
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            result = extraction.parse_expense(case["text"], today=TODAY)
+        latencies_us.append((time.perf_counter() - t0) * 1e6 / args.repeat)
+        if result is None:
+            if args.show_misses:
+                print(f"  -> LLM     {case['text']}")
+            continue
+        parsed += 1
+        matches = {field: result[field] == case[field] for field in FIELDS}
+        field_hits.update(field for field, ok in matches.items() if ok)
+        if all(matches[field] for field in REQUIRED):
+            correct += 1
+        elif args.show_misses:
+            wrong = {field: result[field] for field in REQUIRED if not matches[field]}
+            print(f"  wrong     {case['text']}  {wrong}")
+
+    n = len(corpus)
+    print(f"{n} labelled expense messages")
+    print(f"  parsed locally        {parsed / n:6.1%}  ({parsed}/{n}; the rest go to Gemini)")
+    print(f"  precision             {correct / max(parsed, 1):6.1%}  (amount, date, category and payment method all right)")
+    for field in FIELDS:
+        print(f"    {field:15s}     {field_hits[field] / max(parsed, 1):6.1%}")
+    print(f"  parse latency         p50 {percentile(latencies_us, 0.5):6.1f} us   p99 {percentile(latencies_us, 0.99):6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
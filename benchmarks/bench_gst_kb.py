@@ -0,0 +1,78 @@
+"""
+Benchmark: offline GST knowledge index vs. asking Gemini.
+
+Runs every question in benchmarks/data/gst_questions.tsv through gst_kb.match
+and reports recall (answerable questions answered locally), precision (local
+answers that picked the labelled entry), how often long-tail questions were
+wrongly answered instead of going to the LLM, and lookup latency next to a
+stand-in Gemini round trip.
+
+Usage:
+    python -m benchmarks.bench_gst_kb [--min-score 0.8] [--repeat 200] [--llm-latency-ms 900] [--show-misses]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from backend import gst_kb
+from backend.config import settings
+
+QUESTIONS = os.path.join(os.path.dirname(__file__), "data", "gst_questions.tsv")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-score", type=float, default=settings.GST_KB_MIN_SCORE)
+    parser.add_argument("--repeat", type=int, default=200, help="lookups per question for the latency figures")
+    parser.add_argument("--llm-latency-ms", type=float, default=900, help="typical Gemini answer time to compare with")
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+    settings.GST_KB_MIN_SCORE = args.min_score
+
+    with open(QUESTIONS, encoding="utf-8") as f:
+        cases = [line.rstrip("\n").split("\t") for line in f if line.strip() and not line.startswith("#")]
+
+    t0 = time.perf_counter()
+    index = gst_kb._get_index()
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    answered = correct = long_tail = false_answers = 0
+    latencies_us = []
+    for question, expected in cases:
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            hit = gst_kb.match(question)
+        latencies_us.append((time.perf_counter() - t0) * 1e6 / args.repeat)
+        got = hit[0] if hit else "-"
+        if expected == "-":
+            long_tail += 1
+            false_answers += got != "-"
+        elif got != "-":
+            answered += 1
+            correct += got == expected
+        if args.show_misses and got != expected:
+            print(f"  {got:22s} expected {expected:22s} {question}")
+
+    answerable = len(cases) - long_tail
+    local_share = (answered + false_answers) / len(cases)
+    p50_ms = percentile(latencies_us, 0.5) / 1000
+    print(f"{len(cases)} GST questions ({answerable} answerable, {long_tail} long-tail), "
+          f"{len(index.entries)} entries / {len(index.docs)} phrasings, built in {build_ms:.1f} ms, "
+          f"min score {args.min_score:g}")
+    print(f"  recall                {correct / answerable:6.1%}  ({correct}/{answerable} answered with the right entry)")
+    print(f"  precision             {correct / max(answered, 1):6.1%}  ({correct}/{answered} local answers right)")
+    print(f"  long-tail answered    {false_answers / max(long_tail, 1):6.1%}  ({false_answers}/{long_tail}; should go to the LLM)")
+    print(f"  lookup latency        p50 {percentile(latencies_us, 0.5):6.1f} us   p99 {percentile(latencies_us, 0.99):6.1f} us")
+    print(f"  mean answer time      {local_share * p50_ms + (1 - local_share) * args.llm_latency_ms:6.0f} ms"
+          f"  vs {args.llm_latency_ms:g} ms with every question sent to the LLM")
+
+
+if __name__ == "__main__":
+    main()
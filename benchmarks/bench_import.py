@@ -0,0 +1,70 @@
+"""
+Benchmark: streaming bulk import vs. one crud.create_expense() call per row.
+
+Usage:
+    python -m benchmarks.bench_import [--rows 100000] [--per-row-sample 2000]
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, ledger_io, models, rollups, schemas
+from backend.database import Base
+
+CATEGORIES = ["fuel", "raw_material", "utility", "salary", "travel", "food", "misc"]
+
+
+def make_csv(rows: int) -> bytes:
+    rng = random.Random(7)
+    start = date(2023, 4, 1)
+    lines = ["date,description,amount,category,vendor,payment_method"]
+    for n in range(rows):
+        day = start + timedelta(days=rng.randrange(3 * 365))
+        lines.append(f"{day},Item {n},{rng.uniform(10, 5000):.2f},{rng.choice(CATEGORIES)},Vendor {n % 300},upi")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--per-row-sample", type=int, default=2_000)
+    args = parser.parse_args()
+
+    payload = make_csv(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        user = models.User(email="bench@vyapar.ai", hashed_password="x")
+        db.add(user)
+        db.commit()
+
+        t0 = time.perf_counter()
+        result = ledger_io.import_expenses(db, io.BytesIO(payload), "csv", user.id)
+        bulk_s = time.perf_counter() - t0
+        assert result["failed"] == 0 and rollups.check(db, owner_id=user.id) == []
+
+        records = list(ledger_io.iter_records(io.BytesIO(payload), "csv"))[: args.per_row_sample]
+        t0 = time.perf_counter()
+        for _, record, _ in records:
+            crud.create_expense(db, schemas.ExpenseCreate.model_validate(record), user.id)
+        per_row_s = (time.perf_counter() - t0) / len(records) * args.rows
+
+        print(f"{args.rows} CSV rows")
+        print(f"  bulk import: {bulk_s:8.2f} s  ({args.rows / bulk_s:,.0f} rows/s)")
+        print(f"  per-row API: {per_row_s:8.2f} s  (extrapolated from {len(records)} rows)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
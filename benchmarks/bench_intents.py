@@ -0,0 +1,83 @@
+"""
+Benchmark: local intent classifier on the labelled evaluation set.
+
+Scores every message in benchmarks/data/intent_eval.tsv (held out from the
+training file) and reports accuracy, how many messages clear
+LOCAL_INTENT_THRESHOLD and how often those local answers are right, the
+Gemini calls that saves, and intent latency per message against an LLM-only
+baseline with a fixed model latency (no API key or network needed).
+
+Usage:
+    python -m benchmarks.bench_intents [--threshold 0.9] [--llm-latency-ms 700]
+"""
+import argparse
+import os
+import statistics
+import time
+from collections import Counter
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from backend import intents
+from backend.config import settings
+
+EVAL_FILE = os.path.join(os.path.dirname(__file__), "data", "intent_eval.tsv")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threshold", type=float, default=settings.LOCAL_INTENT_THRESHOLD)
+    parser.add_argument("--llm-latency-ms", type=float, default=700)
+    args = parser.parse_args()
+
+    examples = intents.load_examples(EVAL_FILE)
+    t0 = time.perf_counter()
+    intents.classify("warm up")  # trains the model
+    train_ms = (time.perf_counter() - t0) * 1000
+
+    correct = covered = covered_correct = 0
+    per_intent, per_intent_covered = Counter(), Counter()
+    local_ms, llm_only_ms, local_first_ms = [], [], []
+    calls_two_step = calls_combined = 0
+    for text, label in examples:
+        t0 = time.perf_counter()
+        intent, confidence = intents.classify(text)
+        elapsed = (time.perf_counter() - t0) * 1000
+        local_ms.append(elapsed)
+        llm_only_ms.append(args.llm_latency_ms)
+        correct += intent == label
+        per_intent[label] += 1
+        if confidence >= args.threshold:
+            covered += 1
+            covered_correct += intent == label
+            per_intent_covered[label] += 1
+            local_first_ms.append(elapsed)
+            calls_two_step += 1  # no classify_intent call
+            # With the combined call on, expenses and invoices still need their extraction call
+            calls_combined += intent not in ("expense_record", "invoice_create")
+        else:
+            local_first_ms.append(elapsed + args.llm_latency_ms)
+
+    n = len(examples)
+    print(f"{n} labelled messages, threshold {args.threshold:g}, model trained in {train_ms:.1f} ms")
+    print(f"  accuracy (top-1, all)   {correct / n:6.1%}")
+    print(f"  answered locally        {covered / n:6.1%}  ({covered}/{n})")
+    print(f"  local answers correct   {covered_correct / max(covered, 1):6.1%}")
+    for label in intents.INTENTS:
+        print(f"    {label:16s} {per_intent_covered[label]:3d}/{per_intent[label]:<3d} local")
+    print(f"  Gemini calls avoided    {calls_two_step} with two-step extraction, {calls_combined} with the combined call")
+    print(f"  local classify          p50 {percentile(local_ms, 0.5):6.3f} ms   p99 {percentile(local_ms, 0.99):6.3f} ms")
+    for label, values in (("LLM only", llm_only_ms), ("local first", local_first_ms)):
+        print(f"  intent latency {label:11s} p50 {percentile(values, 0.5):7.1f} ms   p99 {percentile(values, 0.99):7.1f} ms"
+              f"   mean {statistics.mean(values):6.1f} ms")
+    saved = [a - b for a, b in zip(llm_only_ms, local_first_ms)]
+    print(f"  saved per message       p50 {percentile(saved, 0.5):7.1f} ms   mean {statistics.mean(saved):6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: Gemini calls and latency with the response cache off, in memory and in SQLite.
+
+Replays a skewed stream of GST questions and greetings (a few popular ones
+asked over and over, with casing and punctuation varied) through
+llm_service.answer_gst_query / chat_response, with Gemini replaced by a
+stand-in that answers after a fixed delay (no API key or network needed).
+The offline GST index is switched off so every question reaches the cache.
+
+Usage:
+    python -m benchmarks.bench_llm_cache [--messages 300] [--latency-ms 100]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from backend import llm_cache, llm_service
+from backend.config import settings
+
+QUESTIONS = [
+    "GST on restaurant?", "gst rate for cement", "what is input tax credit", "gstr 3b due date",
+    "gst on mobile phones", "hsn code for steel", "gst on rent", "composition scheme limit",
+    "e way bill limit", "gst on gold", "gst on laptops", "reverse charge kya hai",
+    "gst registration limit", "gst on school fees", "gst on furniture", "gst on tractor",
+    "igst or cgst for interstate", "gst on software services", "late fee gstr 1", "gst on sweets",
+]
+GREETINGS = ["hi", "hello", "namaste", "thanks", "good morning", "ok"]
+
+
+def variant(text: str, rng: random.Random) -> str:
+    """The same message as different people type it."""
+    text = rng.choice([text, text.lower(), text.upper(), text.capitalize()])
+    return text + rng.choice(["", "?", "!", " ", "??"])
+
+
+class StandInModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text="Stand-in answer.")
+
+
+async def replay(stream, latency: float):
+    model = llm_service._model = StandInModel(latency)
+    latencies = []
+    for kind, text in stream:
+        t0 = time.perf_counter()
+        if kind == "gst":
+            await llm_service.answer_gst_query(text)
+        else:
+            await llm_service.chat_response(text)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return model.calls, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    settings.GST_KB_ENABLED = False  # these questions would otherwise never reach the model
+    settings.GEMINI_RATE_LIMIT_ENABLED = False  # the stand-in has no quota to protect
+
+    rng = random.Random(args.seed)
+    pool = [("gst", q) for q in QUESTIONS] + [("chat", g) for g in GREETINGS]
+    weights = [1 / (rank + 1) for rank in range(len(pool))]  # Zipf-like popularity
+    rng.shuffle(pool)
+    stream = [(kind, variant(text, rng)) for kind, text in rng.choices(pool, weights, k=args.messages)]
+
+    tmp = tempfile.TemporaryDirectory()
+    print(f"{args.messages} messages ({len(pool)} distinct), stand-in model latency {args.latency_ms:g} ms")
+    try:
+        for label, url in (("none", "none"), ("memory", "memory://"), ("sqlite", f"sqlite:///{tmp.name}/llm.db")):
+            llm_cache.responses = llm_cache.ResponseCache(llm_cache.make_backend(url, 10000, 86400))
+            calls, latencies = asyncio.run(replay(stream, args.latency_ms / 1000))
+            ordered = sorted(latencies)
+            stats = llm_cache.responses.stats()
+            print(f"  {label:7s} {calls:4d} model calls   hit ratio {stats['hit_ratio'] or 0:5.1%}"
+                  f"   p50 {statistics.median(latencies):7.2f} ms   p99 {ordered[int(0.99 * (len(ordered) - 1))]:7.2f} ms"
+                  f"   mean {statistics.mean(latencies):7.2f} ms")
+    finally:
+        llm_service._model = None
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
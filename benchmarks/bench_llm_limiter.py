@@ -0,0 +1,138 @@
+"""
+Benchmark: 429s and per-class waits for bursts of Gemini calls, limiter off vs. on.
+
+Sends mixed calls (webhook text, receipts, GST questions, chit-chat) from a
+few users, one much chattier than the rest, through llm_service: all at once,
+then arriving at random over --minutes minutes (about the quota on average).
+Gemini is replaced by a stand-in that enforces a per-minute quota the way the
+API does (a sliding one-minute window; calls over it get 429
+ResourceExhausted) and answers after a fixed delay. Time is scaled: the quota
+is --rpm calls per --window-s seconds so the run takes seconds, not minutes.
+
+Usage:
+    python -m benchmarks.bench_llm_limiter [--calls 60] [--minutes 5] [--rpm 15] [--window-s 3]
+"""
+import argparse
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import statistics
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from google.api_core.exceptions import ResourceExhausted
+
+from backend import llm_cache, llm_limiter, llm_service
+from backend.config import settings
+
+# (function, priority class, share of the burst)
+MIX = [
+    ("classify_intent", "interactive", 0.5),
+    ("extract_from_receipt_image", "receipt", 0.1),
+    ("answer_gst_query", "gst", 0.2),
+    ("chat_response", "chat", 0.2),
+]
+USERS = {"busy shop": 0.55, "user 2": 0.15, "user 3": 0.15, "user 4": 0.15}
+
+
+class QuotaModel:
+    """Stand-in Gemini with a sliding-window request quota."""
+
+    def __init__(self, rpm: int, window: float, latency: float):
+        self.rpm, self.window, self.latency = rpm, window, latency
+        self.sent = deque()
+        self.rejected = 0
+        self.answered = Counter()  # (function, user)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        now = time.monotonic()
+        while self.sent and self.sent[0] <= now - self.window:
+            self.sent.popleft()
+        if len(self.sent) >= self.rpm:
+            self.rejected += 1
+            raise ResourceExhausted("Quota exceeded")
+        self.sent.append(now)
+        await asyncio.sleep(self.latency)
+        receipt = isinstance(prompt, list)
+        self.answered["extract_from_receipt_image" if receipt else _function.get(), llm_limiter.user.get()] += 1
+        return SimpleNamespace(text='{"description": "Receipt", "amount": 100}' if receipt else "fallback")
+
+
+_function = contextvars.ContextVar("function")
+
+
+async def one_call(function: str, user: str, text: str, delay: float) -> float:
+    await asyncio.sleep(delay)
+    llm_limiter.user.set(user)
+    _function.set(function)
+    t0 = time.perf_counter()
+    try:
+        if function == "extract_from_receipt_image":
+            await llm_service.extract_from_receipt_image(b"jpeg")
+        else:
+            await getattr(llm_service, function)(text)
+    except ValueError:
+        pass  # receipt OCR raises where the others fall back
+    return time.perf_counter() - t0
+
+
+async def burst(calls, model):
+    llm_service._model = model
+    return await asyncio.gather(*(one_call(*call) for call in calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--minutes", type=float, default=5, help="arrival spread of the second run")
+    parser.add_argument("--rpm", type=int, default=15, help="quota per window, as GEMINI_RPM")
+    parser.add_argument("--window-s", type=float, default=3, help="seconds standing in for one minute")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # every 429 logs a failed call
+
+    rng = random.Random(args.seed)
+    functions = rng.choices([m[0] for m in MIX], [m[2] for m in MIX], k=args.calls)
+    users = rng.choices(list(USERS), list(USERS.values()), k=args.calls)
+    arrivals = sorted(rng.uniform(0, args.minutes * args.window_s) for _ in range(args.calls))
+    priority = {m[0]: m[1] for m in MIX}
+
+    settings.GST_KB_ENABLED = settings.LOCAL_EXTRACTION_ENABLED = False
+    scale = 60 / args.window_s
+    deadlines = {p: d / scale for p, d in llm_limiter.DEADLINES.items()}
+    print(f"{args.calls} calls from {len(USERS)} users, quota {args.rpm} per {args.window_s:g} s window;"
+          f" times scaled back to real seconds")
+    try:
+        for label, enabled, spread in (("burst, limiter off", False, False), ("burst, limiter on", True, False),
+                                       ("spread, limiter off", False, True), ("spread, limiter on", True, True)):
+            # Distinct texts: no cache hits
+            calls = [(f, u, f"message {i}", arrivals[i] if spread else 0.0)
+                     for i, (f, u) in enumerate(zip(functions, users))]
+            settings.GEMINI_RATE_LIMIT_ENABLED = enabled
+            llm_cache.responses.clear()
+            llm_limiter.gemini = llm_limiter.PriorityLimiter((args.rpm - settings.GEMINI_BURST) * scale, settings.GEMINI_BURST,
+                                                            settings.GEMINI_QUEUE_MAX, deadlines)
+            model = QuotaModel(args.rpm, args.window_s, args.latency_ms / 1000)
+            seconds = asyncio.run(burst(calls, model))
+            print(f"  {label}: {sum(model.answered.values())} answered, {model.rejected} got 429")
+            for function, p, _ in MIX:
+                mine = [s * scale for (f, _, _, _), s in zip(calls, seconds) if f == function]
+                answered = sum(n for (f, _), n in model.answered.items() if f == function)
+                print(f"    {p:11s} {answered:3d}/{len(mine):3d} answered"
+                      f"   p50 {statistics.median(mine):5.1f} s   max {max(mine):5.1f} s")
+            for user in USERS:
+                sent = sum(1 for f, u, _, _ in calls if u == user and priority[f] == "interactive")
+                answered = model.answered["classify_intent", user]
+                print(f"    {user:11s} {answered:3d}/{sent:3d} interactive calls answered")
+    finally:
+        llm_service._model = None
+
+
+if __name__ == "__main__":
+    main()
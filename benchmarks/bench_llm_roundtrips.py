@@ -0,0 +1,121 @@
+"""
+Benchmark: Gemini calls and latency per text message, combined call vs. two calls.
+
+Posts a mix of chat messages to /api/webhook/text against a throwaway SQLite
+database, with Gemini replaced by a stand-in that answers each prompt type
+after a fixed delay (no API key or network needed), and reports model calls
+and wall time per message with LLM_COMBINED_EXTRACTION on and off, then with
+the local intent classifier, rule-based expense parser and offline GST index
+in front.
+
+Usage:
+    python -m benchmarks.bench_llm_roundtrips [--latency-ms 700] [--rpm 15]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+
+from fastapi.testclient import TestClient
+
+from backend import llm_cache, llm_service
+from backend.config import settings
+from backend.main import app
+
+MESSAGES = [
+    ("Paid 2200 for petrol at HP pump via UPI", "expense_record"),
+    ("Sharma store ko 450 diye groceries ke liye", "expense_record"),
+    ("Electricity bill 3100 paid by bank", "expense_record"),
+    ("Bought cement bags for 8000 from Ambuja dealer", "expense_record"),
+    ("Create invoice for Rahul Sharma, 25000 for web design", "invoice_create"),
+    ("Invoice Mehta Traders 12000 for packaging, due in 15 days", "invoice_create"),
+    ("Bill banao Gupta ji ke liye 5000 repair ka", "invoice_create"),
+    ("What is the GST rate on cement?", "gst_query"),
+    ("Is mahine ka hisaab dikhao", "summary_request"),
+    ("Hello!", "fallback"),
+]
+EXPENSE = {"description": "Petrol", "amount": 2200.0, "category": "fuel", "vendor": "HP Pump"}
+INVOICE = {"customer_name": "Rahul Sharma", "description": "Web design", "amount": 25000.0, "gst_rate": 18.0}
+
+
+class StandInModel:
+    """Answers each llm_service prompt type after `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = Counter()
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self.latency)
+        intent = next((label for text, label in MESSAGES if text in prompt), "fallback")
+        if "intent classifier and data extractor" in prompt:
+            self.calls["combined"] += 1
+            reply = json.dumps({
+                "intent": intent,
+                "expense": EXPENSE if intent == "expense_record" else None,
+                "invoice": INVOICE if intent == "invoice_create" else None,
+            })
+        elif "intent classifier" in prompt:
+            self.calls["classify"] += 1
+            reply = intent
+        elif "expense extraction" in prompt:
+            self.calls["extract"] += 1
+            reply = json.dumps(EXPENSE)
+        elif "invoice extraction" in prompt:
+            self.calls["extract"] += 1
+            reply = json.dumps(INVOICE)
+        else:
+            self.calls["answer"] += 1
+            reply = "OK"
+        return SimpleNamespace(text=reply)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=700)
+    parser.add_argument("--rpm", type=int, default=15, help="model requests-per-minute quota")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # per-request access logs
+
+    settings.AUTH_RATE_LIMIT_ENABLED = False
+    settings.GEMINI_RATE_LIMIT_ENABLED = False  # count calls, not queueing (see bench_llm_limiter)
+    try:
+        with TestClient(app) as client:
+            client.post("/api/auth/register", json={"email": "bench@vyapar.ai", "password": "bench-pass"})
+            token = client.post("/api/auth/token", data={
+                "username": "bench@vyapar.ai", "password": "bench-pass",
+            }).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            print(f"{len(MESSAGES)} messages, stand-in model latency {args.latency_ms:g} ms per call")
+            for label, combined, local in (("two calls", False, False), ("combined", True, False),
+                                           ("local first", True, True)):
+                settings.LLM_COMBINED_EXTRACTION = combined
+                settings.LOCAL_INTENT_ENABLED = settings.LOCAL_EXTRACTION_ENABLED = settings.GST_KB_ENABLED = local
+                llm_cache.responses.clear()  # each row pays for its own calls
+                model = llm_service._model = StandInModel(args.latency_ms / 1000)
+                t0 = time.perf_counter()
+                for text, _ in MESSAGES:
+                    assert client.post("/api/webhook/text", json={"text": text}, headers=headers).status_code == 200
+                per_message_ms = (time.perf_counter() - t0) * 1000 / len(MESSAGES)
+                calls = sum(model.calls.values())
+                per_message = calls / len(MESSAGES)
+                print(f"  {label:11s} {per_message_ms:7.0f} ms/message   {calls:3d} calls ({dict(model.calls)})"
+                      f"   ~{args.rpm / per_message:4.1f} messages/min at {args.rpm} RPM")
+    finally:
+        llm_service._model = None
+        _tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
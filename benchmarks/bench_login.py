@@ -0,0 +1,132 @@
+"""
+Benchmark: login burst vs. ledger reads, inline bcrypt vs. the password pool.
+
+Serves the app with uvicorn on a throwaway SQLite database, then hammers a
+login endpoint from many client threads while one more thread times
+GET /api/expenses/. The "inline" case is the old sync login route, which runs
+bcrypt on the threadpool shared with every sync route; the "pool" case is
+/api/auth/token on the bounded password pool with 503 admission control.
+
+Usage:
+    python -m benchmarks.bench_login [--clients 64] [--seconds 5] [--rounds 12]
+"""
+import argparse
+import logging
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+
+import httpx
+import uvicorn
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
+
+from backend import auth, crud, schemas
+from backend.config import settings
+from backend.database import SessionLocal, get_db
+from backend.main import app
+
+EMAIL, PASSWORD = "bench@vyapar.ai", "bench-pass"
+
+
+@app.post("/bench/inline-token")
+def inline_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    """The previous login route: sync, bcrypt on the shared threadpool."""
+    user = auth.authenticate_user(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(status_code=401)
+    return {"access_token": auth.create_access_token(auth.token_claims(user)), "token_type": "bearer"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_case(base_url: str, login_path: str, headers: dict, clients: int, seconds: float) -> dict:
+    stop = threading.Event()
+    outcomes, latencies = {"ok": 0, "busy": 0}, []
+    lock = threading.Lock()
+
+    def hammer():
+        with httpx.Client(base_url=base_url, timeout=60) as http:
+            while not stop.is_set():
+                r = http.post(login_path, data={"username": EMAIL, "password": PASSWORD})
+                if stop.is_set():
+                    break  # only count what finished inside the window
+                with lock:
+                    outcomes["ok" if r.status_code == 200 else "busy"] += 1
+                if r.status_code == 503:
+                    time.sleep(float(r.headers.get("Retry-After", 1)))
+
+    def probe():
+        with httpx.Client(base_url=base_url, timeout=60) as http:
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                http.get("/api/expenses/", headers=headers)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=hammer) for _ in range(clients)] + [threading.Thread(target=probe)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {
+        "logins_per_s": outcomes["ok"] / seconds,
+        "rejected": outcomes["busy"],
+        "reads": len(latencies),
+        "read_p50": statistics.median(latencies),
+        "read_max": max(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # per-request access logs would dominate the timings
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.AUTH_RATE_LIMIT_ENABLED = False  # every client is one IP and one email here
+
+    db = SessionLocal()
+    crud.create_user(db, schemas.UserCreate(email=EMAIL, password=PASSWORD))
+    db.close()
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+
+    token = httpx.post(f"{base_url}/api/auth/token", data={"username": EMAIL, "password": PASSWORD}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    print(f"{args.clients} login clients for {args.seconds:g}s, bcrypt cost {args.rounds}")
+    for label, path in (("inline", "/bench/inline-token"), ("pool", "/api/auth/token")):
+        r = run_case(base_url, path, headers, args.clients, args.seconds)
+        print(f"  {label:6s} logins {r['logins_per_s']:6.1f}/s  rejected {r['rejected']:5d}"
+              f"   GET /api/expenses/ x{r['reads']:<4d} p50 {r['read_p50']:7.1f} ms  max {r['read_max']:7.1f} ms")
+
+    server.should_exit = True
+    time.sleep(0.2)
+    _tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: rollup-backed SQL summaries vs. the old load-every-row Python path.
+
+Seeds a throwaway SQLite database with one heavy tenant, backfills the daily
+rollups and times the yearly expense and invoice summaries both ways, plus a
+warm summary-cache hit.
+
+Usage:
+    python -m benchmarks.bench_summaries [--rows 50000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import cache, crud, models, rollups
+from backend.database import Base
+
+CATEGORIES = ["fuel", "raw_material", "utility", "salary", "travel", "food", "misc"]
+STATUSES = ["draft", "sent", "paid", "overdue", "cancelled"]
+VENDORS = [f"Vendor {i}" for i in range(200)]
+
+
+def legacy_expense_summary(db, user_id, start_date, end_date, period_label=""):
+    """The pre-aggregation implementation: materialize every row in Python."""
+    expenses = db.query(models.Expense).filter(
+        models.Expense.owner_id == user_id,
+        models.Expense.date >= start_date,
+        models.Expense.date <= end_date,
+    ).all()
+    by_category, vendor_totals = {}, {}
+    for e in expenses:
+        cat = e.category or "misc"
+        by_category[cat] = by_category.get(cat, 0) + e.amount
+        if e.vendor:
+            vendor_totals[e.vendor] = vendor_totals.get(e.vendor, 0) + e.amount
+    return {
+        "total_amount": round(sum(e.amount for e in expenses), 2),
+        "expense_count": len(expenses),
+        "by_category": {k: round(v, 2) for k, v in by_category.items()},
+        "top_vendors": sorted(vendor_totals, key=vendor_totals.get, reverse=True)[:5],
+        "gst_total": round(sum(e.gst_amount for e in expenses), 2),
+        "period": period_label,
+    }
+
+
+def legacy_invoice_summary(db, user_id, start_date, end_date, period_label=""):
+    invoices = db.query(models.Invoice).filter(
+        models.Invoice.owner_id == user_id,
+        models.Invoice.date >= start_date,
+        models.Invoice.date <= end_date,
+    ).all()
+    by_status = {}
+    for i in invoices:
+        by_status[i.status or "draft"] = by_status.get(i.status or "draft", 0) + 1
+    return {
+        "total_amount": round(sum(i.total_amount for i in invoices), 2),
+        "invoice_count": len(invoices),
+        "paid_amount": round(sum(i.total_amount for i in invoices if i.status == "paid"), 2),
+        "pending_amount": round(sum(i.total_amount for i in invoices if i.status in ("draft", "sent")), 2),
+        "overdue_count": sum(1 for i in invoices if i.status == "overdue"),
+        "by_status": by_status,
+        "period": period_label,
+    }
+
+
+def seed(db, rows: int) -> int:
+    rng = random.Random(42)
+    user = models.User(email="bench@vyapar.ai", hashed_password="x")
+    db.add(user)
+    db.flush()
+    start = date(2026, 1, 1)
+    db.bulk_insert_mappings(models.Expense, [
+        {
+            "date": start + timedelta(days=rng.randrange(365)),
+            "description": "Bench expense",
+            "amount": round(rng.uniform(10, 50000), 2),
+            "category": rng.choice(CATEGORIES),
+            "vendor": rng.choice(VENDORS),
+            "gst_amount": round(rng.uniform(0, 500), 2),
+            "owner_id": user.id,
+        }
+        for _ in range(rows)
+    ])
+    db.bulk_insert_mappings(models.Invoice, [
+        {
+            "invoice_number": f"BENCH-{n}",
+            "date": start + timedelta(days=rng.randrange(365)),
+            "customer_name": rng.choice(VENDORS),
+            "amount": 1000.0,
+            "total_amount": 1180.0,
+            "status": rng.choice(STATUSES),
+            "owner_id": user.id,
+        }
+        for n in range(rows // 5)
+    ])
+    db.commit()
+    return user.id
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        user_id = seed(db, args.rows)
+        rollups.rebuild(db)
+        start, end = date(2026, 1, 1), date(2026, 12, 31)
+
+        cases = [
+            ("expense summary", legacy_expense_summary, crud.get_expense_summary),
+            ("invoice summary", legacy_invoice_summary, crud.get_invoice_summary),
+        ]
+        print(f"{args.rows} expenses / {args.rows // 5} invoices, best of {args.repeat}")
+        for name, legacy, current in cases:
+            expected = legacy(db, user_id, start, end)["total_amount"]
+            assert abs(expected - current(db, user_id, start, end)["total_amount"]) < 0.05
+            old_ms = timed(lambda: (db.expunge_all(), legacy(db, user_id, start, end)), args.repeat)
+            new_ms = timed(lambda: (cache.summaries.clear(), current(db, user_id, start, end)), args.repeat)
+            cached_ms = timed(lambda: current(db, user_id, start, end), args.repeat)
+            print(f"  {name:16s} python: {old_ms:8.1f} ms   rollups: {new_ms:8.1f} ms   {old_ms / new_ms:5.1f}x"
+                  f"   cached: {cached_ms:6.3f} ms")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: concurrent webhook traffic on a blocking Session vs. an AsyncSession.
+
+Each simulated request awaits an LLM call (asyncio.sleep) and then saves an
+expense and reads the monthly summary, like the webhook's hot path. The old
+handlers did the database work on a sync Session inside the event loop; the
+new ones go through async_crud. A ticker task records the worst event-loop
+stall, which is what every other in-flight request feels.
+
+Usage:
+    python -m benchmarks.bench_webhook_concurrency [--requests 400] [--concurrency 50] [--llm-ms 100]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import async_crud, crud, models, schemas
+from backend.database import Base
+
+
+def _expense(n: int) -> schemas.ExpenseCreate:
+    return schemas.ExpenseCreate(date=date(2026, 4, 1 + n % 28), description=f"Chai {n}", amount=20, category="food")
+
+
+async def legacy_request(session_factory, user_id, n, llm_s):
+    await asyncio.sleep(llm_s)
+    db = session_factory()
+    try:
+        crud.create_expense(db, _expense(n), user_id)
+        crud.get_expense_summary(db, user_id, date(2026, 4, 1), date(2026, 4, 30))
+    finally:
+        db.close()
+
+
+async def async_request(session_factory, user_id, n, llm_s):
+    await asyncio.sleep(llm_s)
+    async with session_factory() as db:
+        await async_crud.create_expense(db, _expense(n), user_id)
+        await async_crud.get_expense_summary(db, user_id, date(2026, 4, 1), date(2026, 4, 30))
+
+
+async def run(handler, session_factory, user_id, requests, concurrency, llm_s):
+    gate = asyncio.Semaphore(concurrency)
+    worst_stall = 0.0
+    stop = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst_stall
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst_stall = max(worst_stall, time.perf_counter() - t0 - 0.001)
+
+    async def one(n):
+        async with gate:
+            await handler(session_factory, user_id, n, llm_s)
+
+    tick = asyncio.create_task(ticker())
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(requests)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await tick
+    return elapsed, worst_stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-ms", type=int, default=100)
+    args = parser.parse_args()
+    llm_s = args.llm_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        sync_sessions = sessionmaker(bind=engine, autoflush=False)
+        db = sync_sessions()
+        user = models.User(email="bench@vyapar.ai", hashed_password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def both():
+            results = {
+                "sync Session (old)": await run(legacy_request, sync_sessions, user_id, args.requests, args.concurrency, llm_s),
+                "AsyncSession": await run(async_request, async_sessions, user_id, args.requests, args.concurrency, llm_s),
+            }
+            await async_engine.dispose()
+            return results
+
+        results = asyncio.run(both())
+        engine.dispose()
+
+    print(f"{args.requests} webhook requests, {args.concurrency} in flight, {args.llm_ms} ms simulated LLM latency")
+    for label, (elapsed, stall) in results.items():
+        print(f"  {label:20s} {elapsed:6.2f} s  {args.requests / elapsed:7.1f} req/s  worst loop stall {stall * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: single-statement UPDATE/DELETE ... RETURNING vs. load / mutate / refresh.
+
+Times the per-call latency of crud's update and delete paths against the old
+three-round-trip implementation on a throwaway SQLite database. Both sides do
+the same bookkeeping (rollups, tenant version bump, delete tombstone), so only
+the statement shape differs.
+
+Usage:
+    python -m benchmarks.bench_writes [--rows 2000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, rollups, schemas, versions
+from backend.database import Base
+
+
+def legacy_update_expense(db, expense_id, expense, user_id):
+    """The pre-RETURNING implementation: SELECT, mutate, commit, refresh (with today's bookkeeping)."""
+    db_expense = db.query(models.Expense).filter(
+        models.Expense.id == expense_id, models.Expense.owner_id == user_id
+    ).first()
+    if db_expense:
+        old = rollups.expense_contribution(db_expense)
+        for key, value in expense.model_dump(exclude_unset=True).items():
+            setattr(db_expense, key, value)
+        rollups.apply_expense_changes(db, removed=[old], added=[rollups.expense_contribution(db_expense)])
+        versions.bump(db, [user_id])
+        db.commit()
+        db.refresh(db_expense)
+    return db_expense
+
+
+def legacy_delete_expense(db, expense_id, user_id):
+    db_expense = db.query(models.Expense).filter(
+        models.Expense.id == expense_id, models.Expense.owner_id == user_id
+    ).first()
+    if db_expense:
+        rollups.apply_expense_changes(db, removed=[rollups.expense_contribution(db_expense)])
+        db.add(models.SyncTombstone(owner_id=user_id, entity=models.Expense.__tablename__, entity_id=db_expense.id))
+        versions.bump(db, [user_id])
+        db.delete(db_expense)
+        db.commit()
+    return db_expense
+
+
+def seed(db, user_id, rows):
+    ids = []
+    for n in range(rows):
+        expense = crud.create_expense(db, schemas.ExpenseCreate(
+            date=date(2026, 4, 1 + n % 28), description=f"Item {n}", amount=100, category="fuel",
+        ), user_id)
+        ids.append(expense.id)
+    db.expunge_all()
+    return ids
+
+
+def timed(fn, ids):
+    samples = []
+    for row_id in ids:
+        t0 = time.perf_counter()
+        fn(row_id)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), statistics.quantiles(samples, n=20)[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        user = models.User(email="bench@vyapar.ai", hashed_password="x")
+        db.add(user)
+        db.commit()
+        uid = user.id
+
+        notes = schemas.ExpenseUpdate(notes="checked")
+        amount = schemas.ExpenseUpdate(amount=250)
+        cases = [
+            ("update notes", lambda i: legacy_update_expense(db, i, notes, uid), lambda i: crud.update_expense(db, i, notes, uid)),
+            ("update amount", lambda i: legacy_update_expense(db, i, amount, uid), lambda i: crud.update_expense(db, i, amount, uid)),
+            ("delete", lambda i: legacy_delete_expense(db, i, uid), lambda i: crud.delete_expense(db, i, uid)),
+        ]
+
+        print(f"{args.rows} writes per case, median / p95 ms")
+        for label, legacy, current in cases:
+            before = timed(legacy, seed(db, uid, args.rows))
+            after = timed(current, seed(db, uid, args.rows))
+            print(f"  {label:14s} before {before[0]:6.3f} / {before[1]:6.3f}   after {after[0]:6.3f} / {after[1]:6.3f}")
+        assert rollups.check(db) == []
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Daily rollup tables for expense and invoice summaries, backfilled from the ledger
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    # Databases bootstrapped with create_all() may already have these tables
+    if "expense_daily_rollups" not in existing:
+        op.create_table(
+            "expense_daily_rollups",
+            sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("category", sa.String(), primary_key=True),
+            sa.Column("vendor", sa.String(), primary_key=True),
+            sa.Column("total_amount", sa.Float(), nullable=False),
+            sa.Column("gst_total", sa.Float(), nullable=False),
+            sa.Column("expense_count", sa.Integer(), nullable=False),
+        )
+    if "invoice_daily_rollups" not in existing:
+        op.create_table(
+            "invoice_daily_rollups",
+            sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("status", sa.String(), primary_key=True),
+            sa.Column("total_amount", sa.Float(), nullable=False),
+            sa.Column("invoice_count", sa.Integer(), nullable=False),
+        )
+
+    op.execute("DELETE FROM expense_daily_rollups")
+    op.execute(
+        """
+        INSERT INTO expense_daily_rollups
+            (owner_id, day, category, vendor, total_amount, gst_total, expense_count)
+        SELECT owner_id, date, COALESCE(NULLIF(category, ''), 'misc'), COALESCE(vendor, ''),
+               SUM(amount), COALESCE(SUM(gst_amount), 0.0), COUNT(id)
+        FROM expenses
+        GROUP BY owner_id, date, COALESCE(NULLIF(category, ''), 'misc'), COALESCE(vendor, '')
+        """
+    )
+    op.execute("DELETE FROM invoice_daily_rollups")
+    # Same key as rollups.invoice_contribution: a blank or NULL status stays "", not pending
+    op.execute(
+        """
+        INSERT INTO invoice_daily_rollups (owner_id, day, status, total_amount, invoice_count)
+        SELECT owner_id, date, COALESCE(status, ''), SUM(total_amount), COUNT(id)
+        FROM invoices
+        GROUP BY owner_id, date, COALESCE(status, '')
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("invoice_daily_rollups")
+    op.drop_table("expense_daily_rollups")
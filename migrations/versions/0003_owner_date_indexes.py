@@ -0,0 +1,29 @@
+"""Composite indexes for the owner/date access pattern
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_expenses_owner_date", "expenses", ["owner_id", "date"])
+    op.create_index("ix_expenses_owner_category_date", "expenses", ["owner_id", "category", "date"])
+    op.create_index("ix_invoices_owner_date", "invoices", ["owner_id", "date"])
+    op.create_index("ix_invoices_owner_status_date", "invoices", ["owner_id", "status", "date"])
+    op.create_index("ix_invoices_owner_due_date", "invoices", ["owner_id", "due_date"])
+
+
+def downgrade():
+    op.drop_index("ix_invoices_owner_due_date", table_name="invoices")
+    op.drop_index("ix_invoices_owner_status_date", table_name="invoices")
+    op.drop_index("ix_invoices_owner_date", table_name="invoices")
+    op.drop_index("ix_expenses_owner_category_date", table_name="expenses")
+    op.drop_index("ix_expenses_owner_date", table_name="expenses")
@@ -0,0 +1,33 @@
+"""Overdue invoice sweep: (status, due_date) index and scheduler lease table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_invoices_status_due_date", "invoices", ["status", "due_date"])
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("holder", sa.String(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.Column("last_run_at", sa.DateTime(), nullable=True),
+        sa.Column("last_duration_ms", sa.Float(), nullable=True),
+        sa.Column("last_result", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("scheduler_leases")
+    op.drop_index("ix_invoices_status_due_date", table_name="invoices")
@@ -0,0 +1,35 @@
+"""Delta sync: (owner_id, updated_at) indexes and the tombstone table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_expenses_owner_updated_at", "expenses", ["owner_id", "updated_at"])
+    op.create_index("ix_invoices_owner_updated_at", "invoices", ["owner_id", "updated_at"])
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_sync_tombstones_owner_deleted_at", "sync_tombstones", ["owner_id", "deleted_at"])
+
+
+def downgrade():
+    op.drop_index("ix_sync_tombstones_owner_deleted_at", table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
+    op.drop_index("ix_invoices_owner_updated_at", table_name="invoices")
+    op.drop_index("ix_expenses_owner_updated_at", table_name="expenses")
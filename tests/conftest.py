@@ -1,25 +1,41 @@
 """
 Test fixtures and configuration.
-Uses an independent in-memory SQLite database per test session — 
-complete isolation from production data (zero leakage risk).
+Uses an independent SQLite database file per test session, emptied after every
+test — complete isolation from production data (zero leakage risk).
 """
+import os
+
+# Background jobs would sweep the app database, not the test one
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+# Minimum bcrypt cost: fixtures hash a password for every test user
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from backend.database import Base, get_db
+from backend.config import settings
+from backend.database import Base, get_async_db, get_db
 from backend.main import app
 from backend.auth import get_password_hash
-from backend import models
+from backend import auth, cache, llm_cache, llm_limiter, models, ratelimit
 
-# ── Isolated test database (in-memory, destroyed after tests) ─────────────────
+# ── Isolated test database (destroyed after tests) ───────────────────────────
 
 TEST_DATABASE_URL = "sqlite:///./test_vyapar.db"
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test_vyapar.db"
 
 test_engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Every TestClient runs its own event loop, so async connections are never pooled
+test_async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestAsyncSessionLocal = async_sessionmaker(test_async_engine, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_db():
@@ -36,24 +52,53 @@ def setup_test_db():
         pass  # Windows file lock — cleaned up on next run
 
 
+@pytest.fixture(autouse=True)
+def fresh_llm_cache():
+    """Tests swap in their own fake Gemini replies; never serve one test's reply to another
+    (nor spend another test's Gemini rate-limit tokens)."""
+    yield
+    llm_cache.responses.clear()
+    llm_limiter.reset()
+
+
 @pytest.fixture
 def db():
-    """Provide a clean database session per test with rollback."""
-    connection = test_engine.connect()
-    transaction = connection.begin()
-    session = TestSessionLocal(bind=connection)
+    """Provide a database session per test; every table is emptied afterwards.
+
+    Writes are really committed (not rolled back) so the async session used by
+    the webhook routes sees the same rows as the sync one. The summary cache is
+    process-wide, so it is emptied along with the tables.
+    """
+    session = TestSessionLocal()
     yield session
     session.close()
-    transaction.rollback()
-    connection.close()
+    with test_engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    cache.summaries.clear()
+    auth.user_cache.clear()
+    ratelimit.reset()
+
+
+@pytest_asyncio.fixture
+async def async_db(db):
+    """AsyncSession on the test database, for exercising async_crud directly."""
+    async with TestAsyncSessionLocal() as session:
+        yield session
 
 
 @pytest.fixture
 def client(db):
-    """FastAPI test client with overridden DB dependency."""
+    """FastAPI test client with overridden DB dependencies."""
     def override_get_db():
         yield db
+
+    async def override_get_async_db():
+        async with TestAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -101,6 +146,13 @@ def auth_headers(client, test_user):
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture
+def stats_headers(monkeypatch):
+    """Configure STATS_TOKEN and return the header /internal/stats expects."""
+    monkeypatch.setattr(settings, "STATS_TOKEN", "test-stats-token")
+    return {"X-Stats-Token": "test-stats-token"}
+
+
 @pytest.fixture
 def second_auth_headers(client, second_user):
     """Get auth headers for second_user (for isolation tests)."""
@@ -2,7 +2,14 @@
 Authentication tests — registration, login, token validation, profile management.
 Tests defensive scenarios: duplicate email, wrong password, expired/invalid tokens.
 """
+import asyncio
+import threading
 import pytest
+from jose import jwt
+from sqlalchemy import event
+
+from backend import auth, models, passwords
+from backend.config import settings
 
 
 class TestRegistration:
@@ -97,3 +104,122 @@ class TestProfile:
         }, headers=auth_headers)
         assert response.status_code == 200
         assert response.json()["business_name"] == "New Biz Only"
+
+
+def _user_lookups(db, fn):
+    """Run fn and return how many statements hit the users table."""
+    statements = []
+    engine = db.get_bind().engine
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return sum(1 for s in statements if "FROM users" in s)
+
+
+class TestUserCache:
+    def test_token_carries_jti_and_user_id(self, client, auth_headers, test_user):
+        token = auth_headers["Authorization"].split()[1]
+        claims = jwt.get_unverified_claims(token)
+        assert claims["sub"] == "test@vyapar.ai" and claims["uid"] == test_user.id
+        assert len(claims["jti"]) == 32
+
+    def test_repeat_requests_skip_the_user_lookup(self, client, auth_headers, db):
+        assert _user_lookups(db, lambda: client.get("/api/expenses/", headers=auth_headers)) == 1
+        assert _user_lookups(db, lambda: client.get("/api/expenses/", headers=auth_headers)) == 0
+
+    def test_profile_update_invalidates(self, client, auth_headers):
+        assert client.get("/api/auth/me", headers=auth_headers).json()["name"] == "Test User"
+        client.put("/api/auth/me", json={"name": "Renamed"}, headers=auth_headers)
+        assert client.get("/api/auth/me", headers=auth_headers).json()["name"] == "Renamed"
+
+    def test_entries_expire_and_stay_bounded(self):
+        now = [0.0]
+        cache = auth.UserCache(max_entries=2, ttl_seconds=60, clock=lambda: now[0])
+        users = [auth.schemas.User(id=i, email=f"u{i}@vyapar.ai") for i in range(3)]
+        for user in users:
+            cache.set((user.email, "jti"), user)
+        assert len(cache) == 2 and cache.get(("u0@vyapar.ai", "jti")) is None
+        now[0] = 61
+        assert cache.get(("u2@vyapar.ai", "jti")) is None
+
+    def test_disabled_cache_always_looks_up(self, client, auth_headers, db, monkeypatch):
+        monkeypatch.setattr(auth, "user_cache", auth.UserCache(max_entries=0, ttl_seconds=60))
+        client.get("/api/expenses/", headers=auth_headers)
+        assert _user_lookups(db, lambda: client.get("/api/expenses/", headers=auth_headers)) == 1
+
+
+class TestStatelessTokens:
+    def test_profile_comes_from_the_token(self, client, test_user, db, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+        token = client.post("/api/auth/token", data={
+            "username": "test@vyapar.ai", "password": "testpass123",
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        assert _user_lookups(db, lambda: client.get("/api/expenses/", headers=headers)) == 0
+        me = client.get("/api/auth/me", headers=headers).json()
+        assert me["id"] == test_user.id and me["business_name"] == "Test Business"
+
+    def test_plain_tokens_still_work_in_stateless_mode(self, client, auth_headers, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+
+class TestPasswordPool:
+    def _login(self, client):
+        return client.post("/api/auth/token", data={"username": "test@vyapar.ai", "password": "testpass123"})
+
+    def test_hashing_runs_on_the_dedicated_pool(self, client, test_user, monkeypatch):
+        threads = []
+        verify = auth.verify_password
+        monkeypatch.setattr(auth, "verify_password", lambda *args: threads.append(threading.current_thread().name) or verify(*args))
+        assert self._login(client).status_code == 200
+        assert threads and threads[0].startswith("bcrypt")
+
+    def test_saturated_pool_answers_503(self, client, test_user, monkeypatch):
+        monkeypatch.setattr(passwords, "pool", passwords.HashPool(workers=1, max_pending=0))
+        response = self._login(client)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert client.post("/api/auth/register", json={"email": "n@vyapar.ai", "password": "x"}).status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_admission_control_rejects_beyond_max_pending(self):
+        pool, release = passwords.HashPool(workers=1, max_pending=2), threading.Event()
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(passwords.PoolSaturated):
+            await pool.run(lambda: None)
+        release.set()
+        await asyncio.gather(*running)
+        assert pool.rejected == 1 and pool.pending == 0
+
+    def test_login_upgrades_hash_to_configured_cost(self, client, test_user, db, monkeypatch):
+        assert passwords.hash_cost(test_user.hashed_password) == settings.BCRYPT_ROUNDS
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", settings.BCRYPT_ROUNDS + 1)
+        assert self._login(client).status_code == 200
+
+        db.expire_all()
+        stored = db.get(models.User, test_user.id).hashed_password
+        assert passwords.hash_cost(stored) == settings.BCRYPT_ROUNDS
+        assert self._login(client).status_code == 200
+
+
+class TestInternalStats:
+    def test_health_carries_no_internal_stats(self, client):
+        body = client.get("/health").json()
+        assert set(body) == {"status", "version", "gemini", "scheduler"}
+
+    def test_hidden_without_a_configured_token(self, client):
+        assert client.get("/internal/stats", headers={"X-Stats-Token": ""}).status_code == 404
+
+    @pytest.mark.parametrize("headers", [{}, {"X-Stats-Token": "wrong"}])
+    def test_wrong_token_rejected(self, client, stats_headers, headers):
+        assert client.get("/internal/stats", headers=headers).status_code == 403
+
+    def test_token_grants_the_stats(self, client, stats_headers):
+        body = client.get("/internal/stats", headers=stats_headers).json()
+        assert set(body) == {"summary_cache", "llm_cache", "gemini_limiter", "password_pool", "auth_rate_limits"}
@@ -0,0 +1,196 @@
+"""
+Summary cache tests — hits, per-period invalidation on commit, LRU/TTL and backends.
+"""
+import threading
+import pytest
+from datetime import date
+
+from backend import cache, crud, rollups
+
+APRIL = "/api/expenses/summary/monthly?year=2026&month=4"
+MAY = "/api/expenses/summary/monthly?year=2026&month=5"
+YEAR = "/api/expenses/summary/yearly?year=2026"
+
+
+def _expense(client, headers, day, amount=100):
+    return client.post("/api/expenses/", json={
+        "date": day, "description": "Diesel", "amount": amount, "category": "fuel",
+    }, headers=headers).json()["id"]
+
+
+def _total(client, headers, path):
+    return client.get(path, headers=headers).json()["total_amount"]
+
+
+class TestSummaryCache:
+    def test_repeat_reads_are_hits(self, client, auth_headers):
+        _expense(client, auth_headers, "2026-04-05")
+        assert _total(client, auth_headers, APRIL) == 100
+        assert _total(client, auth_headers, APRIL) == 100
+        stats = cache.summaries.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_write_only_invalidates_periods_containing_its_date(self, client, auth_headers):
+        _expense(client, auth_headers, "2026-04-05")
+        for path in (APRIL, MAY, YEAR):
+            _total(client, auth_headers, path)
+
+        _expense(client, auth_headers, "2026-05-03", amount=50)
+        misses = cache.summaries.misses
+        assert _total(client, auth_headers, APRIL) == 100  # still cached
+        assert cache.summaries.misses == misses
+        assert _total(client, auth_headers, MAY) == 50
+        assert _total(client, auth_headers, YEAR) == 150
+        assert cache.summaries.misses == misses + 2
+
+    def test_update_moving_a_row_invalidates_both_periods(self, client, auth_headers):
+        expense_id = _expense(client, auth_headers, "2026-04-05")
+        _total(client, auth_headers, APRIL), _total(client, auth_headers, MAY)
+        client.put(f"/api/expenses/{expense_id}", json={"date": "2026-05-05"}, headers=auth_headers)
+        assert _total(client, auth_headers, APRIL) == 0
+        assert _total(client, auth_headers, MAY) == 100
+
+    def test_delete_and_invoice_status_changes_invalidate(self, client, auth_headers):
+        expense_id = _expense(client, auth_headers, "2026-04-05")
+        _total(client, auth_headers, APRIL)
+        client.delete(f"/api/expenses/{expense_id}", headers=auth_headers)
+        assert _total(client, auth_headers, APRIL) == 0
+
+        invoice_id = client.post("/api/invoices/", json={
+            "date": "2026-04-01", "customer_name": "Rahul", "amount": 1000, "total_amount": 1180,
+        }, headers=auth_headers).json()["id"]
+        path = "/api/invoices/summary/monthly?year=2026&month=4"
+        assert client.get(path, headers=auth_headers).json()["paid_amount"] == 0
+        client.post(f"/api/invoices/{invoice_id}/mark-paid", headers=auth_headers)
+        assert client.get(path, headers=auth_headers).json()["paid_amount"] == 1180
+
+    def test_notes_only_update_keeps_the_entry(self, client, auth_headers):
+        expense_id = _expense(client, auth_headers, "2026-04-05")
+        _total(client, auth_headers, APRIL)
+        client.put(f"/api/expenses/{expense_id}", json={"notes": "receipt filed"}, headers=auth_headers)
+        hits = cache.summaries.hits
+        _total(client, auth_headers, APRIL)
+        assert cache.summaries.hits == hits + 1
+
+    def test_other_tenants_writes_keep_my_entries(self, client, auth_headers, second_auth_headers):
+        _expense(client, auth_headers, "2026-04-05")
+        _total(client, auth_headers, APRIL)
+        _expense(client, second_auth_headers, "2026-04-05", amount=999)
+        hits = cache.summaries.hits
+        assert _total(client, auth_headers, APRIL) == 100
+        assert cache.summaries.hits == hits + 1
+
+    def test_rolled_back_write_invalidates_nothing(self, db, test_user):
+        user_id = test_user.id
+        crud.get_expense_summary(db, user_id, date(2026, 4, 1), date(2026, 4, 30))
+        rollups.apply_expense_changes(db, added=[((user_id, date(2026, 4, 2), "fuel", ""), (10.0, 0.0, 1))])
+        db.rollback()
+        assert cache.summaries.invalidations == 0
+
+    def test_rebuild_drops_everything(self, db, test_user):
+        user_id = test_user.id
+        crud.get_expense_summary(db, user_id, date(2026, 4, 1), date(2026, 4, 30))
+        rollups.rebuild(db)
+        assert cache.summaries.stats()["entries"] == 0
+
+    def test_stats_report_counters(self, client, auth_headers, stats_headers):
+        _total(client, auth_headers, APRIL)
+        stats = client.get("/internal/stats", headers=stats_headers).json()["summary_cache"]
+        assert stats["backend"] == "memory"
+        assert stats["misses"] == 1 and stats["entries"] == 1
+
+
+class TestMemoryBackend:
+    PERIOD = (date(2026, 4, 1), date(2026, 4, 30), "2026-04")
+
+    def _backend(self, **kw):
+        now = [0.0]
+        backend = cache.MemoryBackend(kw.get("max_entries", 10), kw.get("ttl", 60), clock=lambda: now[0])
+        return backend, now
+
+    def test_ttl_expiry(self):
+        backend, now = self._backend(ttl=60)
+        backend.set(1, "expense", self.PERIOD, {"total_amount": 1}, backend.generation(1, "expense"))
+        now[0] = 59
+        assert backend.get(1, "expense", self.PERIOD) == {"total_amount": 1}
+        now[0] = 61
+        assert backend.get(1, "expense", self.PERIOD) is None
+        assert len(backend) == 0
+
+    def test_lru_eviction(self):
+        backend, _ = self._backend(max_entries=2)
+        periods = [(date(2026, m, 1), date(2026, m, 28), f"2026-{m:02d}") for m in (1, 2, 3)]
+        backend.set(1, "expense", periods[0], {"m": 1}, 0)
+        backend.set(1, "expense", periods[1], {"m": 2}, 0)
+        backend.get(1, "expense", periods[0])  # January is now most recently used
+        backend.set(1, "expense", periods[2], {"m": 3}, 0)
+        assert backend.get(1, "expense", periods[1]) is None
+        assert backend.get(1, "expense", periods[0]) == {"m": 1}
+
+    def test_generations_are_bounded(self):
+        backend, _ = self._backend(max_entries=3)
+        for owner_id in range(100):
+            backend.invalidate(owner_id, "expense", [date(2026, 4, 1)])
+        assert len(backend._generations) == 3
+
+    def test_evicted_generation_still_refuses_a_stale_value(self):
+        backend, _ = self._backend(max_entries=1)
+        before = backend.generation(1, "expense")
+        backend.invalidate(1, "expense", [date(2026, 4, 1)])  # a write lands mid-compute
+        backend.invalidate(2, "expense", [date(2026, 4, 1)])  # pushes owner 1's generation out
+        backend.set(1, "expense", self.PERIOD, {"total_amount": 1}, before)
+        assert backend.get(1, "expense", self.PERIOD) is None
+        backend.set(1, "expense", self.PERIOD, {"total_amount": 2}, backend.generation(1, "expense"))
+        assert backend.get(1, "expense", self.PERIOD) == {"total_amount": 2}
+
+    def test_value_computed_across_an_invalidation_is_not_stored(self):
+        backend, _ = self._backend()
+        summaries = cache.SummaryCache(backend)
+
+        def compute():
+            # A write commits while the summary is being computed
+            summaries.invalidate([(1, "expense", date(2026, 4, 10))])
+            return {"total_amount": "stale"}
+
+        summaries.get_or_compute(1, "expense", self.PERIOD, compute)
+        assert backend.get(1, "expense", self.PERIOD) is None
+
+    def test_concurrent_readers(self):
+        backend, _ = self._backend(max_entries=50)
+        errors = []
+
+        def reader(n):
+            try:
+                for m in range(200):
+                    period = (date(2026, 1, 1), date(2026, 1, 1 + m % 28), str(m))
+                    backend.set(n, "expense", period, {"m": m}, backend.generation(n, "expense"))
+                    backend.get(n, "expense", period)
+                    backend.invalidate(n, "expense", [date(2026, 1, 5)])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=reader, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == [] and len(backend) <= 50
+
+
+class TestBackends:
+    def test_make_backend(self):
+        assert cache.make_backend("none", 10, 60) is None
+        assert isinstance(cache.make_backend("memory://", 10, 60), cache.MemoryBackend)
+        with pytest.raises(ValueError):
+            cache.make_backend("memcached://localhost", 10, 60)
+
+    def test_redis_backend_round_trip(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = cache.RedisBackend(fakeredis.FakeRedis(), ttl_seconds=60)
+        period = (date(2026, 4, 1), date(2026, 4, 30), "2026-04")
+        backend.set(1, "expense", period, {"total_amount": 5.5}, backend.generation(1, "expense"))
+        assert backend.get(1, "expense", period) == {"total_amount": 5.5}
+        backend.invalidate(1, "expense", [date(2026, 5, 1)])
+        assert backend.get(1, "expense", period) is not None
+        backend.invalidate(1, "expense", [date(2026, 4, 30)])
+        assert backend.get(1, "expense", period) is None
@@ -0,0 +1,118 @@
+"""
+Engine profile tests — pool/PRAGMA configuration and SQLite write concurrency.
+"""
+import threading
+import pytest
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, rollups, schemas
+from backend.database import Base, engine_options, make_engine
+
+
+class TestEngineOptions:
+    def test_production_profile_tunes_server_pools(self):
+        options = engine_options("postgresql://vyapar:secret@db/vyapar", profile="production")
+        assert options["pool_pre_ping"] is True
+        assert options["pool_recycle"] > 0
+        assert options["pool_size"] > 0 and options["max_overflow"] >= 0
+
+    def test_default_profile_leaves_sqlalchemy_defaults(self):
+        assert engine_options("postgresql://vyapar:secret@db/vyapar", profile="default") == {}
+
+    def test_in_memory_sqlite_gets_no_pool_sizing(self):
+        assert "pool_size" not in engine_options("sqlite://", profile="production")
+
+    def test_unknown_profile_is_rejected(self):
+        with pytest.raises(ValueError):
+            engine_options("sqlite:///x.db", profile="turbo")
+
+    def test_production_profile_sets_sqlite_pragmas(self, tmp_path):
+        engine = make_engine(f"sqlite:///{tmp_path / 'tuned.db'}", profile="production")
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+        engine.dispose()
+
+
+def _legacy_engine(path):
+    """The engine as database.py used to build it, with a short lock wait."""
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 0.1})
+
+
+class TestWriteConcurrency:
+    """Writers hammer the ledger while an export holds a long read open."""
+
+    WRITERS = 4
+    WRITES_EACH = 10
+
+    def _stress(self, engine):
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        setup = Session()
+        user = models.User(email="stress@vyapar.ai", hashed_password="x")
+        setup.add(user)
+        setup.commit()
+        for i in range(50):
+            crud.create_expense(setup, schemas.ExpenseCreate(date=date(2026, 4, 1), description=f"Seed {i}", amount=1), user.id)
+        user_id = user.id
+        setup.close()
+
+        export_open = threading.Event()
+        writers_done = threading.Event()
+        errors = []
+
+        def exporter():
+            db = Session()
+            rows = iter(crud.iter_expense_rows(db, user_id, ["id", "amount"], batch_size=10))
+            next(rows)  # cursor open: the read transaction is now live
+            export_open.set()
+            writers_done.wait(timeout=30)
+            sum(1 for _ in rows)
+            db.close()
+
+        def writer(n):
+            db = Session()
+            for i in range(self.WRITES_EACH):
+                try:
+                    crud.create_expense(db, schemas.ExpenseCreate(
+                        date=date(2026, 4, 2), description=f"W{n}-{i}", amount=10, vendor="HP",
+                    ), user_id)
+                except OperationalError as e:
+                    db.rollback()
+                    errors.append(str(e.orig))
+            db.close()
+
+        reader = threading.Thread(target=exporter)
+        reader.start()
+        assert export_open.wait(timeout=10)
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(self.WRITERS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writers_done.set()
+        reader.join()
+
+        check_db = Session()
+        written = check_db.query(models.Expense).filter(models.Expense.description.like("W%")).count()
+        consistent = rollups.check(check_db) == []
+        check_db.close()
+        engine.dispose()
+        return errors, written, consistent
+
+    def test_legacy_engine_locks_out_writers(self, tmp_path):
+        errors, written, consistent = self._stress(_legacy_engine(tmp_path / "legacy.db"))
+        assert errors and all("locked" in e for e in errors)
+        assert written < self.WRITERS * self.WRITES_EACH
+        assert consistent  # failed writes rolled back their rollup deltas too
+
+    def test_production_profile_writes_alongside_readers(self, tmp_path):
+        errors, written, consistent = self._stress(make_engine(f"sqlite:///{tmp_path / 'tuned.db'}", profile="production"))
+        assert errors == []
+        assert written == self.WRITERS * self.WRITES_EACH
+        assert consistent
@@ -0,0 +1,95 @@
+"""
+Conditional GET tests — ETags from the per-tenant change version and 304 responses.
+"""
+import pytest
+from sqlalchemy import event
+
+from backend import rollups, versions
+
+
+def _new_expense(client, headers, description="Tea", amount=20):
+    return client.post("/api/expenses/", json={
+        "date": "2026-04-01", "description": description, "amount": amount,
+    }, headers=headers).json()["id"]
+
+
+class TestConditionalGet:
+    @pytest.mark.parametrize("path", [
+        "/api/expenses/",
+        "/api/expenses/page",
+        "/api/expenses/summary/monthly?year=2026&month=4",
+        "/api/expenses/summary/daily",
+        "/api/invoices/",
+        "/api/invoices/summary/yearly?year=2026",
+    ])
+    def test_unchanged_resource_is_304(self, client, auth_headers, path):
+        _new_expense(client, auth_headers)
+        first = client.get(path, headers=auth_headers)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and first.headers["Cache-Control"] == "private, no-cache"
+
+        again = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["ETag"] == etag
+
+    def test_single_record(self, client, auth_headers):
+        expense_id = _new_expense(client, auth_headers)
+        etag = client.get(f"/api/expenses/{expense_id}", headers=auth_headers).headers["ETag"]
+        assert client.get(f"/api/expenses/{expense_id}", headers={**auth_headers, "If-None-Match": f"W/{etag}"}).status_code == 304
+
+    def test_any_write_changes_the_etag(self, client, auth_headers):
+        expense_id = _new_expense(client, auth_headers)
+        etag = client.get("/api/expenses/", headers=auth_headers).headers["ETag"]
+
+        for write in (
+            lambda: client.put(f"/api/expenses/{expense_id}", json={"notes": "x"}, headers=auth_headers),
+            lambda: client.patch("/api/expenses/bulk", json={"ids": [expense_id], "patch": {"notes": "y"}}, headers=auth_headers),
+            lambda: client.delete(f"/api/expenses/{expense_id}", headers=auth_headers),
+        ):
+            write()
+            response = client.get("/api/expenses/", headers={**auth_headers, "If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etag
+            etag = response.headers["ETag"]
+
+    def test_etag_differs_per_url(self, client, auth_headers):
+        a = client.get("/api/expenses/summary/monthly?year=2026&month=4", headers=auth_headers).headers["ETag"]
+        b = client.get("/api/expenses/summary/monthly?year=2026&month=5", headers=auth_headers).headers["ETag"]
+        assert a != b
+
+    def test_other_tenants_writes_do_not_invalidate(self, client, auth_headers, second_auth_headers):
+        etag = client.get("/api/expenses/", headers=auth_headers).headers["ETag"]
+        _new_expense(client, second_auth_headers)
+        assert client.get("/api/expenses/", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    def test_304_skips_the_ledger_query(self, client, auth_headers, db):
+        _new_expense(client, auth_headers)
+        etag = client.get("/api/expenses/", headers=auth_headers).headers["ETag"]
+        statements = []
+        engine = db.get_bind().engine
+        capture = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            assert client.get("/api/expenses/", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert not any("FROM expenses" in s for s in statements), statements
+
+
+class TestVersions:
+    def test_overdue_sweep_and_rollup_rebuild_bump_versions(self, client, auth_headers, db, test_user):
+        from datetime import date
+        from backend.crud import mark_overdue_invoices
+
+        client.post("/api/invoices/", json={
+            "date": "2026-04-01", "customer_name": "A", "amount": 100, "total_amount": 118,
+            "status": "sent", "due_date": "2026-04-10",
+        }, headers=auth_headers)
+        before = versions.current(db, test_user.id)
+        mark_overdue_invoices(db, date(2026, 5, 1))
+        assert versions.current(db, test_user.id) == before + 1
+
+        rollups.rebuild(db)
+        assert versions.current(db, test_user.id) == before + 2
@@ -3,8 +3,13 @@ Expense CRUD tests — creation, retrieval, filtering, summaries, updates, delet
 Critical: tests cross-user data isolation to ensure no data leakage between users.
 """
 import pytest
+from contextlib import contextmanager
 from datetime import date, timedelta
 
+from sqlalchemy import event
+
+from backend import crud, rollups, schemas
+
 
 class TestExpenseCreation:
     def test_create_expense(self, client, auth_headers):
@@ -107,6 +112,156 @@ class TestExpenseRetrieval:
         assert len(response.json()) == 1
 
 
+class TestExpenseCursorPagination:
+    def _create(self, client, auth_headers, n):
+        for i in range(n):
+            client.post("/api/expenses/", json={
+                "date": f"2026-04-{1 + i // 2:02d}", "description": f"Item {i}", "amount": 10 + i,
+            }, headers=auth_headers)
+
+    def test_walk_all_pages(self, client, auth_headers):
+        self._create(client, auth_headers, 7)
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/expenses/page", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            page = response.json()
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == 7
+        assert len({e["id"] for e in seen}) == 7
+        keys = [(e["date"], e["id"]) for e in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_pages_are_stable_under_concurrent_inserts(self, client, auth_headers):
+        self._create(client, auth_headers, 4)
+        first = client.get("/api/expenses/page?limit=2", headers=auth_headers).json()
+        # A newer expense arrives between page loads — offset paging would repeat a row
+        client.post("/api/expenses/", json={
+            "date": "2026-05-01", "description": "Newest", "amount": 1,
+        }, headers=auth_headers)
+        second = client.get(f"/api/expenses/page?limit=2&cursor={first['next_cursor']}", headers=auth_headers).json()
+        first_ids = {e["id"] for e in first["items"]}
+        assert not first_ids & {e["id"] for e in second["items"]}
+        assert second["next_cursor"] is None
+
+    def test_page_respects_filters_and_isolation(self, client, auth_headers, second_auth_headers):
+        self._create(client, auth_headers, 3)
+        response = client.get("/api/expenses/page?start_date=2026-04-02", headers=auth_headers)
+        assert [e["description"] for e in response.json()["items"]] == ["Item 2"]
+        response = client.get("/api/expenses/page", headers=second_auth_headers)
+        assert response.json() == {"items": [], "next_cursor": None}
+
+    def test_invalid_cursor_rejected(self, client, auth_headers):
+        response = client.get("/api/expenses/page?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 400
+
+
+class TestExpenseImport:
+    CSV = (
+        "date,description,amount,category,vendor,payment_method\n"
+        "2026-04-01,Diesel,2200,fuel,HP Pump,upi\n"
+        "2026-04-02,Chai,20,food,,\n"
+        "not-a-date,Broken,10,misc,,\n"
+        "2026-04-03,Negative,-5,misc,,\n"
+    )
+
+    def test_csv_import_reports_bad_rows(self, client, auth_headers):
+        response = client.post(
+            "/api/expenses/import",
+            files={"file": ("ledger.csv", self.CSV.encode(), "text/csv")},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        result = response.json()
+        assert result["imported"] == 2
+        assert result["failed"] == 2
+        assert [e["row"] for e in result["errors"]] == [3, 4]
+
+        expenses = client.get("/api/expenses/", headers=auth_headers).json()
+        chai = next(e for e in expenses if e["description"] == "Chai")
+        assert chai["vendor"] is None
+        assert chai["payment_method"] == "cash"  # empty cell -> schema default
+        assert chai["source"] == "import"
+
+        summary = client.get("/api/expenses/summary/monthly?year=2026&month=4", headers=auth_headers).json()
+        assert summary["total_amount"] == 2220.0
+
+    def test_ndjson_import(self, client, auth_headers):
+        body = (
+            '{"date": "2026-04-01", "description": "Rent", "amount": 15000, "category": "utility"}\n'
+            "\n"
+            "{broken json\n"
+            '{"date": "2026-04-05", "description": "Salary", "amount": 12000, "source": "manual"}\n'
+        )
+        response = client.post(
+            "/api/expenses/import?format=ndjson",
+            files={"file": ("ledger.txt", body.encode(), "application/octet-stream")},
+            headers=auth_headers,
+        )
+        result = response.json()
+        assert result["imported"] == 2
+        assert result["errors"][0]["row"] == 3
+
+    def test_unknown_format_rejected(self, client, auth_headers):
+        response = client.post(
+            "/api/expenses/import",
+            files={"file": ("ledger.xlsx", b"xx", "application/octet-stream")},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
+    def test_chunked_insert(self, db, test_user):
+        import io
+        from backend import ledger_io, rollups
+        rows = "".join(f"2026-04-{d:02d},Item {d},{d},misc\n" for d in range(1, 8))
+        result = ledger_io.import_expenses(
+            db, io.BytesIO(("date,description,amount,category\n" + rows).encode()), "csv",
+            test_user.id, chunk_size=3,
+        )
+        assert result == {"imported": 7, "failed": 0, "errors": []}
+        assert rollups.check(db) == []
+
+
+class TestExpenseExport:
+    def _seed(self, client, auth_headers):
+        for exp in [
+            {"date": "2026-04-02", "description": "Lunch, with client", "amount": 500, "category": "food"},
+            {"date": "2026-04-01", "description": "Fuel", "amount": 2000, "category": "fuel", "vendor": "HP"},
+            {"date": "2026-03-15", "description": "Salary", "amount": 25000, "category": "salary"},
+        ]:
+            client.post("/api/expenses/", json=exp, headers=auth_headers)
+
+    def test_csv_export_with_filters(self, client, auth_headers):
+        import csv, io
+        self._seed(client, auth_headers)
+        response = client.get("/api/expenses/export?start_date=2026-04-01", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["description"] for r in rows] == ["Fuel", "Lunch, with client"]  # oldest first
+        assert rows[0]["vendor"] == "HP"
+
+    def test_ndjson_gzip_export(self, client, auth_headers):
+        import gzip, json
+        self._seed(client, auth_headers)
+        response = client.get("/api/expenses/export?format=ndjson&gzip=true&category=salary", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        lines = gzip.decompress(response.content).decode().splitlines()
+        assert [json.loads(line)["description"] for line in lines] == ["Salary"]
+        assert json.loads(lines[0])["date"] == "2026-03-15"
+
+    def test_export_is_owner_scoped(self, client, auth_headers, second_auth_headers):
+        self._seed(client, auth_headers)
+        response = client.get("/api/expenses/export?format=ndjson", headers=second_auth_headers)
+        assert response.text == "", "DATA LEAKAGE via export!"
+
+
 class TestExpenseDataIsolation:
     """CRITICAL: Ensure users can NEVER see each other's data."""
 
@@ -179,6 +334,14 @@ class TestExpenseSummaries:
         data = response.json()
         assert data["expense_count"] == 3
 
+    def test_summary_gst_and_top_vendors(self, client, auth_headers):
+        self._seed_expenses(client, auth_headers)
+        response = client.get("/api/expenses/summary/monthly?year=2026&month=4", headers=auth_headers)
+        data = response.json()
+        assert data["gst_total"] == 360.0
+        assert data["by_category"] == {"fuel": 3500.0, "food": 500.0}
+        assert data["top_vendors"] == ["HP", "Zomato"]  # ordered by spend
+
     def test_summary_isolation(self, client, auth_headers, second_auth_headers):
         """User 2's summary should NOT include User 1's expenses."""
         self._seed_expenses(client, auth_headers)
@@ -220,3 +383,102 @@ class TestExpenseUpdateDelete:
     def test_delete_nonexistent_expense(self, client, auth_headers):
         response = client.delete("/api/expenses/99999", headers=auth_headers)
         assert response.status_code == 404
+
+
+class TestExpenseBulkEdits:
+    def test_bulk_recategorize_keeps_summaries_consistent(self, client, auth_headers, db):
+        ids = []
+        for i in range(4):
+            r = client.post("/api/expenses/", json={
+                "date": "2026-04-01", "description": f"Cab {i}", "amount": 100, "category": "misc", "vendor": "Ola",
+            }, headers=auth_headers)
+            ids.append(r.json()["id"])
+
+        response = client.patch("/api/expenses/bulk", json={
+            "ids": ids[:3], "patch": {"category": "travel"},
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["updated"] == 3
+
+        summary = client.get("/api/expenses/summary/monthly?year=2026&month=4", headers=auth_headers).json()
+        assert summary["by_category"] == {"travel": 300.0, "misc": 100.0}
+        assert rollups.check(db) == []
+
+    def test_bulk_edit_by_filter_is_owner_scoped(self, client, auth_headers, second_auth_headers):
+        for headers in (auth_headers, second_auth_headers):
+            client.post("/api/expenses/", json={
+                "date": "2026-04-01", "description": "Petrol", "amount": 500, "vendor": "HP Pump",
+            }, headers=headers)
+
+        response = client.patch("/api/expenses/bulk", json={
+            "filter": {"vendor": "HP"}, "patch": {"category": "fuel", "amount": 550},
+        }, headers=auth_headers)
+        assert response.json()["updated"] == 1
+        theirs = client.get("/api/expenses/", headers=second_auth_headers).json()
+        assert theirs[0]["category"] == "misc" and theirs[0]["amount"] == 500
+
+
+@contextmanager
+def _statements(db):
+    """Collect the SQL verbs the session's engine executes."""
+    seen = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement.lstrip().split()[0].upper())
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield seen
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+class TestSingleStatementWrites:
+    def _expense(self, db, user_id):
+        """Create an expense; returns (expense id, owner id) loaded up front."""
+        expense = crud.create_expense(db, schemas.ExpenseCreate(
+            date=date(2026, 4, 1), description="Diesel", amount=1500, category="fuel", vendor="IOCL",
+        ), user_id)
+        return expense.id, user_id
+
+    def test_non_rollup_update_is_one_update_returning(self, db, test_user):
+        expense_id, user_id = self._expense(db, test_user.id)
+        with _statements(db) as seen:
+            updated = crud.update_expense(db, expense_id, schemas.ExpenseUpdate(notes="for the truck"), user_id)
+        assert seen == ["UPDATE", "INSERT"]  # the row, then the tenant version upsert
+        assert updated.notes == "for the truck" and updated.description == "Diesel"
+
+    def test_rollup_update_reads_only_old_totals(self, db, test_user):
+        expense_id, user_id = self._expense(db, test_user.id)
+        with _statements(db) as seen:
+            updated = crud.update_expense(db, expense_id, schemas.ExpenseUpdate(amount=900, category="travel"), user_id)
+        assert seen[:2] == ["SELECT", "UPDATE"] and "SELECT" not in seen[2:]
+        assert updated.amount == 900 and updated.category == "travel"
+        assert rollups.check(db) == []
+
+    def test_delete_is_one_delete_returning(self, db, test_user):
+        expense_id, user_id = self._expense(db, test_user.id)
+        with _statements(db) as seen:
+            deleted = crud.delete_expense(db, expense_id, user_id)
+        assert seen[0] == "DELETE" and "SELECT" not in seen
+        assert deleted.description == "Diesel"
+        assert rollups.check(db) == []
+
+    def test_other_users_row_is_untouched(self, db, test_user, second_user):
+        expense_id, _ = self._expense(db, test_user.id)
+        assert crud.update_expense(db, expense_id, schemas.ExpenseUpdate(amount=1), second_user.id) is None
+        assert crud.delete_expense(db, expense_id, second_user.id) is None
+        assert crud.get_expense(db, expense_id).amount == 1500
+
+    def test_dialects_without_returning_fall_back(self, db, test_user, monkeypatch):
+        dialect = db.get_bind().dialect
+        monkeypatch.setattr(dialect, "update_returning", False)
+        monkeypatch.setattr(dialect, "delete_returning", False)
+        expense_id, user_id = self._expense(db, test_user.id)
+
+        updated = crud.update_expense(db, expense_id, schemas.ExpenseUpdate(amount=900), user_id)
+        assert updated.amount == 900
+        assert rollups.check(db) == []
+        assert crud.delete_expense(db, expense_id, user_id).id == expense_id
+        assert rollups.check(db) == []
@@ -0,0 +1,126 @@
+"""
+Rule-based expense extraction tests — amounts, dates, payees and the LLM fallback.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from backend import extraction, llm_service
+from backend.config import settings
+
+TODAY = date(2026, 4, 10)
+
+
+def parse(text):
+    return extraction.parse_expense(text, today=TODAY)
+
+
+class TestAmounts:
+    @pytest.mark.parametrize("text, amount", [
+        ("₹500 petrol cash", 500),
+        ("petrol Rs. 2,200.50", 2200.5),
+        ("rent 1,20,000 rupaye", 120000),
+        ("raw material 1.5 lakh", 150000),
+        ("machine 2 crore", 20_000_000),
+        ("diwali sweets 5k", 5000),
+        ("पेट्रोल ५०० रुपये दिए", 500),
+    ])
+    def test_formats(self, text, amount):
+        assert parse(text)["amount"] == amount
+
+    def test_quantities_are_not_amounts(self):
+        assert parse("bought 10 bags of cement for 4200")["amount"] == 4200
+
+    def test_currency_marker_wins_over_bare_numbers(self):
+        assert parse("2 chai ₹40")["amount"] == 40
+
+    @pytest.mark.parametrize("text", [
+        "paid 500 and 300", "petrol", "2 chai 40", "call 9876543210", "3 tyres at 2400 each", "Rs 450 + 18% gst",
+    ])
+    def test_missing_or_ambiguous_amount_needs_the_llm(self, text):
+        assert parse(text) is None
+
+
+class TestDates:
+    @pytest.mark.parametrize("text, expected", [
+        ("aaj 2200 ka diesel", date(2026, 4, 10)),
+        ("kal 650 ka khana", date(2026, 4, 9)),
+        ("spent 300 on tea yesterday", date(2026, 4, 9)),
+        ("parso 800 auto", date(2026, 4, 8)),
+        ("कल 900 बिजली", date(2026, 4, 9)),
+        ("rent 15000 on 5/4", date(2026, 4, 5)),
+        ("3 april ko 4000 ka steel liya", date(2026, 4, 3)),
+        ("25 dec 1200 hotel", date(2025, 12, 25)),
+        ("1500 petrol", date(2026, 4, 10)),
+    ])
+    def test_dates(self, text, expected):
+        assert parse(text)["date"] == expected.isoformat()
+
+
+class TestFields:
+    def test_full_message(self):
+        assert parse("Paid 2200 for petrol at HP pump via UPI") == {
+            "date": "2026-04-10", "description": "Petrol", "amount": 2200.0, "category": "fuel",
+            "vendor": "HP Pump", "payment_method": "upi", "gst_applicable": False, "notes": None,
+        }
+
+    @pytest.mark.parametrize("text, vendor, description", [
+        ("Sharma store ko 450 diye groceries ke liye", "Sharma Store", "Groceries"),
+        ("paid 12000 to Mehta Traders for steel", "Mehta Traders", "Steel"),
+        ("swiggy 560 dinner for staff", "Swiggy", "Dinner for staff"),
+        ("paid 2500 to plumber", None, "Plumber"),
+    ])
+    def test_vendor_and_description(self, text, vendor, description):
+        data = parse(text)
+        assert (data["vendor"], data["description"]) == (vendor, description)
+
+    @pytest.mark.parametrize("text, method", [
+        ("petrol 800 upi se", "upi"),
+        ("electricity bill 3100 paid by bank", "bank"),
+        ("salary 45000 transferred", "bank"),
+        ("cheque de diya 20000 supplier", "cheque"),
+        ("chai 40", "cash"),
+    ])
+    def test_payment_method(self, text, method):
+        assert parse(text)["payment_method"] == method
+
+    @pytest.mark.parametrize("text, category", [
+        ("bijli ka bill 1900 bhara", "utility"),
+        ("Ramesh ko 9000 salary di", "salary"),
+        ("ola 260", "travel"),
+        ("courier 240", "misc"),
+    ])
+    def test_category(self, text, category):
+        assert parse(text)["category"] == category
+
+
+class TestExtractExpense:
+    @pytest.fixture
+    def model_calls(self, monkeypatch):
+        calls = []
+
+        async def generate(prompt, **kwargs):
+            calls.append(prompt)
+            return SimpleNamespace(text='{"description": "Tea", "amount": 80}')
+
+        monkeypatch.setattr(llm_service, "_model", SimpleNamespace(generate_content_async=generate))
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_simple_message_skips_gemini(self, model_calls):
+        data = await llm_service.extract_expense("₹500 petrol cash")
+        assert data["amount"] == 500.0
+        assert model_calls == []
+
+    @pytest.mark.asyncio
+    async def test_unparseable_message_asks_gemini(self, model_calls):
+        data = await llm_service.extract_expense("2 chai 40")
+        assert data["amount"] == 80
+        assert len(model_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_can_be_disabled(self, model_calls, monkeypatch):
+        monkeypatch.setattr(settings, "LOCAL_EXTRACTION_ENABLED", False)
+        await llm_service.extract_expense("₹500 petrol cash")
+        assert len(model_calls) == 1
@@ -0,0 +1,86 @@
+"""
+Offline GST knowledge index tests — rates, FAQ, thresholds and the LLM fallback.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from backend import gst_kb, llm_service
+from backend.config import settings
+
+
+def matched(question):
+    hit = gst_kb.match(question)
+    return hit[0] if hit else None
+
+
+class TestTokens:
+    def test_phrases_fold_to_one_token(self):
+        assert gst_kb.tokens("Input Tax Credit on E-Way Bills") == ["itc", "ewaybill"]
+        assert gst_kb.tokens("GSTR 3B due date") == ["gstr3b", "due"]
+
+    def test_stopwords_plurals_and_numbers_dropped(self):
+        assert gst_kb.tokens("What is the GST on 50 mobile phones?") == ["mobile", "phone"]
+
+
+class TestMatch:
+    @pytest.mark.parametrize("question, entry", [
+        ("What is the GST rate on cement?", "rate:cement"),
+        ("cement pe kitna gst lagta hai", "rate:cement"),
+        ("gst on gold jewellery", "rate:gold"),
+        ("what is input tax credit", "itc"),
+        ("gstr 3b due date", "gstr3b_due"),
+        ("e way bill limit", "eway_bill"),
+        ("reverse charge kya hai", "reverse_charge"),
+    ])
+    def test_common_questions(self, question, entry):
+        assert matched(question) == entry
+
+    @pytest.mark.parametrize("question", [
+        "Can I get a refund for a cancelled export order?",
+        "GST on cement mixer machine",
+        "how do I file an appeal against a GST demand notice",
+    ])
+    def test_long_tail_goes_to_the_llm(self, question):
+        assert gst_kb.answer(question) is None
+
+    def test_tie_between_entries_goes_to_the_llm(self):
+        assert gst_kb.answer("gst on cement or steel") is None
+
+    def test_min_score_setting(self, monkeypatch):
+        monkeypatch.setattr(settings, "GST_KB_MIN_SCORE", 1.01)
+        assert gst_kb.answer("What is the GST rate on cement?") is None
+
+    def test_rate_answer_carries_rate_and_footer(self):
+        answer = gst_kb.answer("gst rate for cement")
+        assert "18%" in answer
+        assert "cbic-gst.gov.in" in answer
+
+
+class TestAnswerGstQuery:
+    @pytest.fixture
+    def model_calls(self, monkeypatch):
+        calls = []
+
+        async def generate(prompt, **kwargs):
+            calls.append(prompt)
+            return SimpleNamespace(text="Ask your CA.")
+
+        monkeypatch.setattr(llm_service, "_model", SimpleNamespace(generate_content_async=generate))
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_known_question_skips_gemini(self, model_calls):
+        assert "GST" in await llm_service.answer_gst_query("GST on restaurant?")
+        assert model_calls == []
+
+    @pytest.mark.asyncio
+    async def test_long_tail_question_asks_gemini(self, model_calls):
+        assert await llm_service.answer_gst_query("Can I get a refund for a cancelled export order?") == "Ask your CA."
+        assert len(model_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_can_be_disabled(self, model_calls, monkeypatch):
+        monkeypatch.setattr(settings, "GST_KB_ENABLED", False)
+        await llm_service.answer_gst_query("GST on restaurant?")
+        assert len(model_calls) == 1
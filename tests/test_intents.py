@@ -0,0 +1,66 @@
+"""
+Local intent classifier tests — n-gram naive Bayes, rules, and the confidence gate.
+"""
+import pytest
+
+from backend import intents
+from backend.config import settings
+
+
+class TestFeatures:
+    def test_amounts_are_normalised(self):
+        assert intents.normalize("Paid ₹2,200.50 for Petrol") == intents.normalize("paid 500 for petrol")
+
+    def test_devanagari_gets_ngrams(self):
+        assert " पे" in intents.features("पेट्रोल 500")
+
+
+class TestRules:
+    @pytest.mark.parametrize("text, intent", [
+        ("sharma ji ko 2000 de diye cash", "expense_record"),
+        ("Rahul ka bill bana do 7000 ka", "invoice_create"),
+        ("paid electricity bill 3100", "expense_record"),
+        ("cement pe kitna gst lagta hai", "gst_query"),
+        ("show pending invoices", "summary_request"),
+        ("Thank you!", "fallback"),
+        ("kya haal hai", None),
+    ])
+    def test_rule_votes(self, text, intent):
+        assert intents.rule_intent(text) == intent
+
+
+class TestClassify:
+    @pytest.mark.parametrize("text, intent", [
+        ("diesel 1800 bhara", "expense_record"),
+        ("invoice Ankit 3000 for photoshoot", "invoice_create"),
+        ("what is gst on mobile accessories", "gst_query"),
+        ("kitna kharcha hua is hafte", "summary_request"),
+        ("namaste ji", "fallback"),
+    ])
+    def test_obvious_messages_are_confident(self, text, intent):
+        label, confidence = intents.classify(text)
+        assert label == intent
+        assert confidence >= settings.LOCAL_INTENT_THRESHOLD
+
+    def test_scores_are_probabilities(self):
+        scores = intents.scores("paid 500 petrol")
+        assert set(scores) == set(intents.INTENTS)
+        assert sum(scores.values()) == pytest.approx(1.0)
+
+    def test_rule_disagreement_stays_below_threshold(self):
+        # The GST rule fires on an expense; the model disagrees, so neither wins outright
+        _, confidence = intents.classify("paid gst 4500 on purchase")
+        assert confidence < settings.LOCAL_INTENT_THRESHOLD
+
+    def test_gate_respects_settings(self, monkeypatch):
+        assert intents.confident_intent("hisaab batao") == "summary_request"
+        monkeypatch.setattr(settings, "LOCAL_INTENT_THRESHOLD", 1.01)
+        assert intents.confident_intent("hisaab batao") is None
+        monkeypatch.setattr(settings, "LOCAL_INTENT_THRESHOLD", 0.5)
+        monkeypatch.setattr(settings, "LOCAL_INTENT_ENABLED", False)
+        assert intents.confident_intent("hisaab batao") is None
+
+
+def test_training_file_covers_every_intent():
+    labels = {label for _, label in intents.load_examples()}
+    assert labels == set(intents.INTENTS)
@@ -3,6 +3,8 @@ Invoice CRUD tests — creation with auto-number, status management, summaries,
 """
 import pytest
 
+from backend import rollups
+
 
 class TestInvoiceCreation:
     def test_create_invoice(self, client, auth_headers):
@@ -56,6 +58,33 @@ class TestInvoiceStatusManagement:
         assert response.json()["status"] == "paid"
 
 
+class TestInvoiceCursorPagination:
+    def test_walk_pages(self, client, auth_headers):
+        for day in (1, 2, 3):
+            client.post("/api/invoices/", json={
+                "date": f"2026-04-{day:02d}", "customer_name": f"C{day}", "amount": 100, "total_amount": 118,
+            }, headers=auth_headers)
+        first = client.get("/api/invoices/page?limit=2", headers=auth_headers).json()
+        assert [i["customer_name"] for i in first["items"]] == ["C3", "C2"]
+        second = client.get(f"/api/invoices/page?limit=2&cursor={first['next_cursor']}", headers=auth_headers).json()
+        assert [i["customer_name"] for i in second["items"]] == ["C1"]
+        assert second["next_cursor"] is None
+
+
+class TestInvoiceExport:
+    def test_csv_export_by_status(self, client, auth_headers):
+        import csv, io
+        for status in ("paid", "sent"):
+            client.post("/api/invoices/", json={
+                "date": "2026-04-01", "customer_name": f"Customer {status}", "amount": 100,
+                "total_amount": 118, "status": status,
+            }, headers=auth_headers)
+        response = client.get("/api/invoices/export?status=paid", headers=auth_headers)
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["customer_name"] for r in rows] == ["Customer paid"]
+        assert rows[0]["invoice_number"].startswith("VYP-")
+
+
 class TestInvoiceDataIsolation:
     """CRITICAL: Users must never access each other's invoices."""
 
@@ -97,8 +126,73 @@ class TestInvoiceSummaries:
         assert data["invoice_count"] == 3
         assert data["total_amount"] == 41300.0
 
+    def test_monthly_invoice_summary_by_status(self, client, auth_headers):
+        self._seed(client, auth_headers)
+        response = client.get("/api/invoices/summary/monthly?year=2026&month=4", headers=auth_headers)
+        data = response.json()
+        assert data["by_status"] == {"paid": 1, "sent": 1, "draft": 1}
+        assert data["paid_amount"] == 11800.0
+        assert data["pending_amount"] == 29500.0
+        assert data["overdue_count"] == 0
+
     def test_summary_isolation(self, client, auth_headers, second_auth_headers):
         self._seed(client, auth_headers)
         response = client.get("/api/invoices/summary/monthly?year=2026&month=4", headers=second_auth_headers)
         data = response.json()
         assert data["invoice_count"] == 0, "DATA LEAKAGE in invoice summaries!"
+
+
+class TestInvoiceBulkEdits:
+    def _create(self, client, headers, n, **fields):
+        ids = []
+        for i in range(n):
+            r = client.post("/api/invoices/", json={
+                "date": "2026-04-01", "customer_name": f"Customer {i}", "amount": 1000, "total_amount": 1180, **fields,
+            }, headers=headers)
+            ids.append(r.json()["id"])
+        return ids
+
+    def test_bulk_mark_paid_reports_per_id_outcomes(self, client, auth_headers, second_auth_headers, db):
+        mine = self._create(client, auth_headers, 3)
+        theirs = self._create(client, second_auth_headers, 1)
+
+        response = client.post("/api/invoices/bulk/mark-paid", json={"ids": mine + theirs + [99999]}, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["updated"] == 3 and data["not_found"] == 2
+        assert {r["id"]: r["status"] for r in data["results"]} == {
+            **{i: "updated" for i in mine}, theirs[0]: "not_found", 99999: "not_found",
+        }
+
+        assert client.get(f"/api/invoices/{theirs[0]}", headers=second_auth_headers).json()["status"] == "draft"
+        summary = client.get("/api/invoices/summary/monthly?year=2026&month=4", headers=auth_headers).json()
+        assert summary["by_status"] == {"paid": 3}
+        assert rollups.check(db) == []
+
+    def test_bulk_mark_sent_by_filter(self, client, auth_headers):
+        self._create(client, auth_headers, 2)
+        self._create(client, auth_headers, 1, date="2026-05-10")
+
+        response = client.post("/api/invoices/bulk/mark-sent", json={
+            "filter": {"start_date": "2026-04-01", "end_date": "2026-04-30", "status": "draft"},
+        }, headers=auth_headers)
+        assert response.json()["updated"] == 2
+        statuses = sorted(i["status"] for i in client.get("/api/invoices/", headers=auth_headers).json())
+        assert statuses == ["draft", "sent", "sent"]
+
+    def test_bulk_patch_without_rollup_fields(self, client, auth_headers, db):
+        ids = self._create(client, auth_headers, 2)
+        response = client.patch("/api/invoices/bulk", json={"ids": ids, "patch": {"notes": "Q1 batch"}}, headers=auth_headers)
+        assert response.json()["updated"] == 2
+        assert all(client.get(f"/api/invoices/{i}", headers=auth_headers).json()["notes"] == "Q1 batch" for i in ids)
+        assert rollups.check(db) == []
+
+    @pytest.mark.parametrize("body", [
+        {"patch": {"status": "paid"}},
+        {"ids": [1], "filter": {"status": "draft"}, "patch": {"status": "paid"}},
+        {"ids": [1], "patch": {}},
+        {"ids": [], "patch": {"status": "paid"}},
+    ])
+    def test_bulk_request_validation(self, client, auth_headers, body):
+        response = client.patch("/api/invoices/bulk", json=body, headers=auth_headers)
+        assert response.status_code == 422
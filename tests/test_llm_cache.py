@@ -0,0 +1,153 @@
+"""
+Gemini response cache tests — keys, LRU/TTL backends, persistence and the llm_service wiring.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from backend import llm_cache, llm_service
+from backend.config import settings
+
+
+class TestKeys:
+    TEMPLATE = f"Question: {llm_cache.INPUT}"
+
+    def test_near_identical_inputs_share_a_key(self):
+        a = llm_cache.make_key("answer_gst_query", "m", self.TEMPLATE, "GST on restaurant?")
+        b = llm_cache.make_key("answer_gst_query", "m", self.TEMPLATE, "  gst on RESTAURANT")
+        assert a == b
+
+    @pytest.mark.parametrize("function, model, template", [
+        ("chat_response", "m", TEMPLATE),                     # another function
+        ("answer_gst_query", "m2", TEMPLATE),                 # another model
+        ("answer_gst_query", "m", f"Q (v2): {llm_cache.INPUT}"),  # edited prompt template
+    ])
+    def test_function_model_and_prompt_version_are_part_of_the_key(self, function, model, template):
+        base = llm_cache.make_key("answer_gst_query", "m", self.TEMPLATE, "hi")
+        assert llm_cache.make_key(function, model, template, "hi") != base
+
+    def test_dated_prompts_change_key_with_the_day(self):
+        today = llm_cache.make_key("extract_expense", "m", f'Text: "{llm_cache.INPUT}" (use 2026-04-10)', "petrol")
+        tomorrow = llm_cache.make_key("extract_expense", "m", f'Text: "{llm_cache.INPUT}" (use 2026-04-11)', "petrol")
+        assert today != tomorrow
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_factory(request, tmp_path):
+    def make(max_entries=10, ttl=60, clock=None):
+        now = clock or (lambda: 0.0)
+        if request.param == "memory":
+            return llm_cache.MemoryBackend(max_entries, ttl, clock=now)
+        return llm_cache.SQLiteBackend(str(tmp_path / "llm.db"), max_entries, ttl, clock=now)
+    return make
+
+
+class TestBackends:
+    def test_ttl(self, backend_factory):
+        now = [0.0]
+        backend = backend_factory(ttl=10, clock=lambda: now[0])
+        backend.set("k", "v")
+        assert backend.get("k") == "v"
+        now[0] = 10
+        assert backend.get("k") is None
+
+    def test_lru_eviction(self, backend_factory):
+        now = [0.0]
+        backend = backend_factory(max_entries=2, clock=lambda: now[0])
+        for key in ("a", "b"):
+            now[0] += 1
+            backend.set(key, key)
+        now[0] += 1
+        backend.get("a")  # b is now least recently used
+        now[0] += 1
+        backend.set("c", "c")
+        assert (backend.get("a"), backend.get("b"), backend.get("c")) == ("a", None, "c")
+        assert len(backend) == 2
+
+    def test_sqlite_entries_survive_a_restart(self, tmp_path):
+        path = str(tmp_path / "llm.db")
+        llm_cache.SQLiteBackend(path, 10, 60).set("k", "v")
+        assert llm_cache.SQLiteBackend(path, 10, 60).get("k") == "v"
+
+    def test_make_backend(self, tmp_path):
+        assert llm_cache.make_backend("none", 10, 60) is None
+        assert llm_cache.make_backend("memory://", 10, 60).name == "memory"
+        assert llm_cache.make_backend(f"sqlite:///{tmp_path}/llm.db", 10, 60).name == "sqlite"
+        with pytest.raises(ValueError):
+            llm_cache.make_backend("mongodb://x", 10, 60)
+
+
+class TestLlmService:
+    @pytest.fixture
+    def model(self, monkeypatch):
+        calls = []
+
+        def set_reply(text):
+            async def generate(prompt, **kwargs):
+                calls.append(prompt)
+                return SimpleNamespace(text=text)
+            monkeypatch.setattr(llm_service, "_model", SimpleNamespace(generate_content_async=generate))
+            return calls
+        return set_reply
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_is_answered_from_cache(self, model):
+        calls = model("Yes, file a refund claim on the GST portal.")
+        question = "Can I get a refund for a cancelled export order?"
+        assert await llm_service.answer_gst_query(question) == "Yes, file a refund claim on the GST portal."
+        assert await llm_service.answer_gst_query(question.lower()) == "Yes, file a refund claim on the GST portal."
+        assert len(calls) == 1
+        stats = llm_cache.responses.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["by_function"]["answer_gst_query"] == {"hits": 1, "misses": 1}
+
+    @pytest.mark.asyncio
+    async def test_unparseable_replies_are_not_cached(self, model):
+        calls = model("no idea")
+        assert await llm_service.classify_intent("hmm") == "fallback"
+        assert await llm_service.classify_intent("hmm") == "fallback"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_extraction_uses_todays_date(self, model, monkeypatch):
+        calls = model('{"customer_name": "Rahul", "amount": 1000}')
+
+        class Tomorrow(date):
+            @classmethod
+            def today(cls):
+                return date(2099, 1, 2)
+
+        first = await llm_service.extract_invoice("Invoice Rahul 1000")
+        monkeypatch.setattr(llm_service, "date", Tomorrow)
+        second = await llm_service.extract_invoice("Invoice Rahul 1000")
+        assert len(calls) == 2
+        assert (first["date"], second["date"]) == (date.today().isoformat(), "2099-01-02")
+
+    @pytest.mark.asyncio
+    async def test_can_be_disabled(self, model, monkeypatch):
+        monkeypatch.setattr(llm_cache, "responses", llm_cache.ResponseCache(None))
+        calls = model("Namaste!")
+        await llm_service.chat_response("hi")
+        await llm_service.chat_response("hi")
+        assert len(calls) == 2
+
+    def test_stats_endpoint_reports_cache(self, client, stats_headers):
+        assert client.get("/internal/stats", headers=stats_headers).json()["llm_cache"]["backend"] == settings.LLM_CACHE_URL.split(":")[0]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("function, reply", [
+        ("classify_intent", "fallback"),
+        ("answer_gst_query", "GST is a tax on supplies."),
+        ("extract_expense", '{"description": "Misc", "amount": 10}'),
+    ])
+    @pytest.mark.parametrize("first, second", [("hi", "Hi"), ("gst", "GST"), ("in", "IN"), ("a", "A"), ("on", "On")])
+    async def test_short_inputs_share_an_entry_across_case(self, model, monkeypatch, function, reply, first, second):
+        # Short inputs also occur inside the prompt templates; the key must not depend on that
+        monkeypatch.setattr(settings, "GST_KB_ENABLED", False)
+        monkeypatch.setattr(settings, "LOCAL_EXTRACTION_ENABLED", False)
+        calls = model(reply)
+        await getattr(llm_service, function)(first)
+        await getattr(llm_service, function)(second)
+        assert len(calls) == 1
+        assert first in calls[0]
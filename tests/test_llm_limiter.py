@@ -0,0 +1,177 @@
+"""
+Gemini rate limiter tests — token bucket, priority order, per-user fairness, queue bounds and deadlines.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+from backend import llm_limiter, llm_service
+from backend.config import Settings, settings
+from backend.llm_limiter import LimiterBusy, PriorityLimiter
+
+# One token every 20 ms once the burst is spent
+RATE = 3000
+
+
+async def drain(limiter):
+    for _ in range(limiter.burst):
+        await limiter.acquire("interactive")
+
+
+async def served_order(limiter, calls):
+    """Queue (priority, user, label) calls on an empty bucket; labels in the order they got a slot."""
+    order = []
+
+    async def call(priority, key, label):
+        await limiter.acquire(priority, key)
+        order.append(label)
+
+    await drain(limiter)
+    tasks = []
+    for priority, key, label in calls:
+        tasks.append(asyncio.create_task(call(priority, key, label)))
+        await asyncio.sleep(0)  # enqueue in this order
+    await asyncio.gather(*tasks)
+    return order
+
+
+class TestPriorityLimiter:
+    @pytest.mark.asyncio
+    async def test_burst_is_served_immediately(self):
+        limiter = PriorityLimiter(RATE, burst=3, max_queue=10)
+        await drain(limiter)
+        stats = limiter.stats()["classes"]["interactive"]
+        assert (stats["granted"], stats["queued"], stats["wait_ms_p99"]) == (3, 0, 0.0)
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_is_served_first(self):
+        limiter = PriorityLimiter(RATE, burst=1, max_queue=10)
+        order = await served_order(limiter, [
+            ("chat", 1, "chat"), ("gst", 1, "gst"), ("receipt", 1, "receipt"), ("interactive", 1, "text"),
+        ])
+        assert order == ["text", "receipt", "gst", "chat"]
+
+    @pytest.mark.asyncio
+    async def test_users_take_turns_within_a_class(self):
+        limiter = PriorityLimiter(RATE, burst=1, max_queue=10)
+        order = await served_order(limiter, [
+            ("interactive", "a", "a1"), ("interactive", "a", "a2"), ("interactive", "a", "a3"),
+            ("interactive", "b", "b1"), ("interactive", "b", "b2"),
+        ])
+        assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_rejected(self):
+        limiter = PriorityLimiter(60, burst=1, max_queue=1)
+        await drain(limiter)
+        waiting = asyncio.create_task(limiter.acquire("chat"))
+        await asyncio.sleep(0)
+        with pytest.raises(LimiterBusy):
+            await limiter.acquire("chat")
+        stats = limiter.stats()["classes"]["chat"]
+        assert (stats["queued"], stats["queue_full"]) == (1, 1)
+        waiting.cancel()
+
+    @pytest.mark.asyncio
+    async def test_deadline(self):
+        limiter = PriorityLimiter(60, burst=1, max_queue=10, deadlines={**llm_limiter.DEADLINES, "chat": 0.02})
+        await drain(limiter)
+        with pytest.raises(LimiterBusy):
+            await limiter.acquire("chat")
+        stats = limiter.stats()["classes"]["chat"]
+        assert (stats["queued"], stats["timed_out"]) == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_penalize_empties_the_bucket(self):
+        limiter = PriorityLimiter(60, burst=5, max_queue=10, deadlines={**llm_limiter.DEADLINES, "gst": 0.02})
+        await limiter.acquire("gst")
+        limiter.penalize()
+        with pytest.raises(LimiterBusy):
+            await limiter.acquire("gst")
+
+    @pytest.mark.asyncio
+    async def test_unknown_priority(self):
+        with pytest.raises(ValueError):
+            await PriorityLimiter(RATE, burst=1, max_queue=1).acquire("urgent")
+
+    def test_refill_rate_must_be_positive(self):
+        with pytest.raises(ValueError):
+            PriorityLimiter(0, burst=3, max_queue=10)
+
+    @pytest.mark.parametrize("rpm, burst", [(3, 3), (2, 5)])
+    def test_settings_reject_a_burst_that_leaves_no_refill(self, rpm, burst):
+        with pytest.raises(ValueError, match="GEMINI_RPM"):
+            Settings(SECRET_KEY="x", GEMINI_RPM=rpm, GEMINI_BURST=burst)
+        Settings(SECRET_KEY="x", GEMINI_RPM=rpm, GEMINI_BURST=burst, GEMINI_RATE_LIMIT_ENABLED=False)
+
+    def test_disabled_limiter_imports_with_no_refill_rate(self):
+        env = {**os.environ, "SECRET_KEY": "x", "GEMINI_RATE_LIMIT_ENABLED": "false", "GEMINI_RPM": "0"}
+        script = ("import asyncio; from backend import llm_limiter; asyncio.run(llm_limiter.acquire('chat')); "
+                  "llm_limiter.reset(); print(llm_limiter.stats())")
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert "'enabled': False" in result.stdout
+
+
+class TestLlmService:
+    @pytest.fixture
+    def model(self, monkeypatch):
+        calls = []
+
+        def set_reply(reply):
+            async def generate(prompt, **kwargs):
+                calls.append(prompt)
+                if isinstance(reply, Exception):
+                    raise reply
+                return SimpleNamespace(text=reply)
+            monkeypatch.setattr(llm_service, "_model", SimpleNamespace(generate_content_async=generate))
+            return calls
+        return set_reply
+
+    @pytest.mark.asyncio
+    async def test_calls_take_a_slot_of_their_class(self, model):
+        model("Hello!")
+        await llm_service.chat_response("hey there")
+        classes = llm_limiter.stats()["classes"]
+        assert classes["chat"]["granted"] == 1
+        assert classes["interactive"]["granted"] == 0
+
+    @pytest.mark.asyncio
+    async def test_busy_limiter_falls_back_without_calling_gemini(self, model, monkeypatch):
+        calls = model("Hello!")
+        monkeypatch.setattr(llm_limiter, "gemini", PriorityLimiter(60, burst=0, max_queue=0))
+        reply = await llm_service.chat_response("hey there")
+        assert "Vyapar AI" in reply
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_429_empties_the_bucket(self, model):
+        model(ResourceExhausted("quota"))
+        assert await llm_service.classify_intent("something odd") == "fallback"
+        assert llm_limiter.stats()["tokens"] < 1
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key_fails_without_taking_a_slot(self, monkeypatch):
+        monkeypatch.setattr(llm_service, "_model", None)
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "")
+        assert await llm_service.classify_intent("something odd") == "fallback"
+        assert llm_limiter.stats()["classes"]["interactive"]["granted"] == 0
+
+    @pytest.mark.asyncio
+    async def test_can_be_disabled(self, model, monkeypatch):
+        calls = model("Hello!")
+        monkeypatch.setattr(settings, "GEMINI_RATE_LIMIT_ENABLED", False)
+        monkeypatch.setattr(llm_limiter, "gemini", PriorityLimiter(60, burst=0, max_queue=0))
+        await llm_service.chat_response("hey there")
+        assert len(calls) == 1
+
+
+def test_stats_report_limiter(client, stats_headers):
+    body = client.get("/internal/stats", headers=stats_headers).json()
+    assert body["gemini_limiter"]["enabled"] is True
+    assert set(body["gemini_limiter"]["classes"]) == set(llm_limiter.PRIORITIES)
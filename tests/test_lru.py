@@ -0,0 +1,37 @@
+"""
+LRU + TTL map tests — recency order, expiry, eviction callbacks.
+"""
+from backend.lru import LRUCache
+
+
+def make(max_entries=2, ttl=60):
+    now = [0.0]
+    evicted = []
+    cache = LRUCache(max_entries, ttl, clock=lambda: now[0], on_evict=lambda key, value: evicted.append(key))
+    return cache, now, evicted
+
+
+def test_least_recently_used_goes_first():
+    cache, _, evicted = make()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+    assert evicted == ["b"]
+    assert list(cache) == ["a", "c"]
+
+
+def test_expired_entries_are_dropped_on_read():
+    cache, now, evicted = make(ttl=10)
+    cache.set("a", 1)
+    now[0] = 10
+    assert cache.get("a") is None
+    assert evicted == ["a"] and len(cache) == 0
+
+
+def test_pop_skips_the_callback():
+    cache, _, evicted = make()
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    assert evicted == []
@@ -0,0 +1,136 @@
+"""
+Schema tests — Alembic migrations match the models, and the hot queries are index-backed.
+"""
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session
+
+from backend import crud, models, rollups
+from backend.database import Base, run_migrations
+from backend.search import is_search_table
+from datetime import date, datetime, timedelta
+
+
+@pytest.fixture
+def scratch_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _legacy_database(engine):
+    """The schema the old create_all() bootstrap left: ledger tables without the later indexes."""
+    legacy_tables = [Base.metadata.tables[name] for name in ("users", "expenses", "invoices")]
+    Base.metadata.create_all(engine, tables=legacy_tables)
+    for table in legacy_tables:
+        for index in list(table.indexes):
+            if index.name.startswith(("ix_expenses_owner", "ix_invoices_owner", "ix_invoices_status")):
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(f"DROP INDEX {index.name}")
+
+
+class TestMigrations:
+    def test_upgrade_head_matches_models(self, scratch_engine):
+        run_migrations(scratch_engine)
+        with scratch_engine.connect() as conn:
+            context = MigrationContext.configure(conn, opts={
+                "include_name": lambda name, type_, parents: not (type_ == "table" and is_search_table(name)),
+            })
+            diff = compare_metadata(context, Base.metadata)
+        assert diff == [], f"Models and migrations disagree: {diff}"
+
+    def test_legacy_create_all_database_is_stamped_and_upgraded(self, scratch_engine):
+        _legacy_database(scratch_engine)
+        run_migrations(scratch_engine)
+        inspector = inspect(scratch_engine)
+        assert "expense_daily_rollups" in inspector.get_table_names()
+        assert "ix_expenses_owner_date" in {ix["name"] for ix in inspector.get_indexes("expenses")}
+
+    def test_rollup_backfill_matches_runtime_keys(self, scratch_engine):
+        _legacy_database(scratch_engine)
+        with scratch_engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@b.c', 'x')")
+            for status, total in (("'draft'", 100), ("'sent'", 200), ("''", 400), ("NULL", 800)):
+                conn.exec_driver_sql(
+                    "INSERT INTO invoices (date, customer_name, amount, total_amount, status, owner_id) "
+                    f"VALUES ('2026-04-01', 'A', {total}, {total}, {status}, 1)"
+                )
+
+        run_migrations(scratch_engine)
+        with Session(scratch_engine) as db:
+            assert rollups.check(db) == []
+            summary = rollups.invoice_summary(db, 1, date(2026, 4, 1), date(2026, 4, 30))
+        assert summary["pending_amount"] == 300.0
+        assert summary["by_status"] == {"draft": 3, "sent": 1}
+
+    def test_search_index_rebuilds_from_ledger(self, scratch_engine):
+        run_migrations(scratch_engine)
+        with scratch_engine.begin() as conn:
+            conn.exec_driver_sql("DROP TRIGGER expenses_fts_ai")
+            conn.exec_driver_sql("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@b.c', 'x')")
+            conn.exec_driver_sql(
+                "INSERT INTO expenses (date, description, amount, owner_id) VALUES ('2026-04-01', 'Diesel', 10, 1)"
+            )
+            conn.exec_driver_sql("INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')")
+            rows = conn.exec_driver_sql("SELECT rowid FROM expenses_fts WHERE expenses_fts MATCH '\"iese\"'").fetchall()
+        assert rows == [(1,)]
+
+
+def _query_plans(db, action):
+    """Run action() and return the SQLite query plan of every SELECT it issued."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    for statement, parameters in statements:
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plans.append(" | ".join(row[-1] for row in rows))
+    return plans
+
+
+class TestQueryPlans:
+    @pytest.mark.parametrize("action, index", [
+        (lambda db, uid: crud.get_expenses(db, uid, start_date=date(2026, 1, 1), end_date=date(2026, 12, 31)),
+         "ix_expenses_owner_date"),
+        (lambda db, uid: crud.get_expenses(db, uid, category="fuel"), "ix_expenses_owner_category_date"),
+        (lambda db, uid: crud.get_expenses_page(db, uid, cursor=crud.encode_cursor(date(2026, 4, 1), 10)),
+         "ix_expenses_owner_date"),
+        (lambda db, uid: crud.get_invoices(db, uid, start_date=date(2026, 1, 1)), "ix_invoices_owner_date"),
+        (lambda db, uid: crud.get_invoices(db, uid, status="sent"), "ix_invoices_owner_status_date"),
+    ])
+    def test_list_queries_use_owner_indexes(self, db, test_user, action, index):
+        plans = _query_plans(db, lambda: action(db, test_user.id))
+        assert plans and all(index in plan for plan in plans), plans
+
+    def test_delta_sync_uses_updated_at_indexes(self, db, test_user):
+        token = crud.encode_sync_token(datetime.now() - timedelta(days=1))  # within SYNC_MAX_AGE_DAYS
+        plans = " || ".join(_query_plans(db, lambda: crud.get_changes(db, test_user.id, token)))
+        for index in ("ix_expenses_owner_updated_at", "ix_invoices_owner_updated_at", "ix_sync_tombstones_owner_deleted_at"):
+            assert index in plans, plans
+
+    def test_overdue_sweep_uses_status_due_date_index(self, db):
+        plan = db.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN UPDATE invoices SET status = 'overdue' WHERE status = 'sent' AND due_date < '2026-04-01'"
+        ).fetchall()
+        assert "ix_invoices_status_due_date" in " | ".join(row[-1] for row in plan)
+
+    def test_summary_queries_use_an_index(self, db, test_user):
+        plans = _query_plans(db, lambda: (
+            crud.get_expense_summary(db, test_user.id, date(2026, 1, 1), date(2026, 12, 31)),
+            crud.get_invoice_summary(db, test_user.id, date(2026, 1, 1), date(2026, 12, 31)),
+        ))
+        assert len(plans) == 3
+        for plan in plans:
+            assert "USING" in plan and "INDEX" in plan, plan
@@ -0,0 +1,81 @@
+"""
+Sign-in throttling tests — token buckets per IP and per email, 429 + Retry-After.
+"""
+import pytest
+
+from backend import auth, ratelimit
+from backend.config import settings
+
+
+def _login(client, email="test@vyapar.ai", password="wrong"):
+    return client.post("/api/auth/token", data={"username": email, "password": password})
+
+
+class TestTokenBucket:
+    def _limiter(self, **kw):
+        now = [0.0]
+        limiter = ratelimit.TokenBucketLimiter("t", kw.get("rate", 60), kw.get("burst", 3),
+                                               max_keys=kw.get("max_keys", 100), clock=lambda: now[0])
+        return limiter, now
+
+    def test_burst_then_refill(self):
+        limiter, now = self._limiter(rate=60, burst=3)  # one token per second
+        assert [limiter.acquire("k") for _ in range(3)] == [0, 0, 0]
+        assert limiter.acquire("k") == pytest.approx(1.0)
+        now[0] = 0.5
+        assert limiter.acquire("k") == pytest.approx(0.5)
+        now[0] = 1.0
+        assert limiter.acquire("k") == 0
+        assert (limiter.allowed, limiter.rejected) == (4, 2)
+
+    def test_keys_are_independent(self):
+        limiter, _ = self._limiter(burst=1)
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("b") == 0
+        assert limiter.acquire("a") > 0
+
+    def test_tracked_keys_are_bounded(self):
+        limiter, _ = self._limiter(max_keys=2)
+        for key in "abc":
+            limiter.acquire(key)
+        assert limiter.stats()["tracked_keys"] == 2
+
+
+class TestAuthThrottling:
+    def test_email_bucket_stops_guessing_before_bcrypt(self, client, test_user, monkeypatch):
+        checks = []
+        verify = auth.verify_password
+        monkeypatch.setattr(auth, "verify_password", lambda *args: checks.append(1) or verify(*args))
+
+        for _ in range(settings.AUTH_BURST_PER_EMAIL):
+            assert _login(client).status_code == 401
+        response = _login(client, password="testpass123")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert len(checks) == settings.AUTH_BURST_PER_EMAIL
+
+    def test_email_key_ignores_case(self, client, test_user):
+        for _ in range(settings.AUTH_BURST_PER_EMAIL):
+            _login(client)
+        assert _login(client, email="  TEST@vyapar.ai").status_code == 429
+
+    def test_ip_bucket_spans_emails_and_registration(self, client):
+        for n in range(settings.AUTH_BURST_PER_IP - 1):
+            _login(client, email=f"user{n}@vyapar.ai")
+        assert client.post("/api/auth/register", json={
+            "email": "fresh@vyapar.ai", "password": "secure123",
+        }).status_code == 201
+        response = client.post("/api/auth/register", json={"email": "again@vyapar.ai", "password": "secure123"})
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+    def test_rejections_show_in_stats(self, client, test_user, stats_headers):
+        for _ in range(settings.AUTH_BURST_PER_EMAIL + 2):
+            _login(client)
+        limits = client.get("/internal/stats", headers=stats_headers).json()["auth_rate_limits"]
+        assert limits["email"]["rejected"] == 2
+
+    def test_can_be_disabled(self, client, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_ENABLED", False)
+        for _ in range(settings.AUTH_BURST_PER_EMAIL + 1):
+            assert _login(client).status_code == 401
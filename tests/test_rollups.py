@@ -0,0 +1,88 @@
+"""
+Daily rollup tests — incremental maintenance on every write, rebuild and consistency check.
+"""
+from datetime import date
+
+from sqlalchemy import update
+
+from backend import models, rollups
+
+
+def _rollup_rows(db, model):
+    return db.query(model).count()
+
+
+class TestIncrementalRollups:
+    def test_create_update_delete_expense_keeps_rollups_consistent(self, client, auth_headers, db):
+        r = client.post("/api/expenses/", json={
+            "date": "2026-04-01", "description": "Fuel", "amount": 2000, "category": "fuel", "vendor": "HP",
+        }, headers=auth_headers)
+        expense_id = r.json()["id"]
+        client.post("/api/expenses/", json={
+            "date": "2026-04-01", "description": "More fuel", "amount": 500, "category": "fuel", "vendor": "HP",
+        }, headers=auth_headers)
+        assert rollups.check(db) == []
+        assert _rollup_rows(db, models.ExpenseDailyRollup) == 1  # same day/category/vendor
+
+        # Move the first expense to another day and category
+        client.put(f"/api/expenses/{expense_id}", json={"date": "2026-04-02", "category": "travel"}, headers=auth_headers)
+        assert rollups.check(db) == []
+        assert _rollup_rows(db, models.ExpenseDailyRollup) == 2
+
+        client.delete(f"/api/expenses/{expense_id}", headers=auth_headers)
+        assert rollups.check(db) == []
+        assert _rollup_rows(db, models.ExpenseDailyRollup) == 1
+
+    def test_invoice_status_change_moves_rollup_bucket(self, client, auth_headers, db):
+        r = client.post("/api/invoices/", json={
+            "date": "2026-04-01", "customer_name": "A", "amount": 1000, "total_amount": 1180,
+        }, headers=auth_headers)
+        client.post(f"/api/invoices/{r.json()['id']}/mark-paid", headers=auth_headers)
+        assert rollups.check(db) == []
+        rows = db.query(models.InvoiceDailyRollup).all()
+        assert [(row.status, row.invoice_count) for row in rows] == [("paid", 1)]
+
+        summary = client.get("/api/invoices/summary/monthly?year=2026&month=4", headers=auth_headers).json()
+        assert summary["paid_amount"] == 1180.0
+        assert summary["by_status"] == {"paid": 1}
+
+    def test_blank_and_unknown_statuses_are_not_pending(self, client, auth_headers, db, test_user):
+        for status, total in (("draft", 100), ("sent", 200), ("", 400), ("cancelled", 800)):
+            client.post("/api/invoices/", json={
+                "date": "2026-04-01", "customer_name": "A", "amount": total, "total_amount": total, "status": status,
+            }, headers=auth_headers)
+        db.add(models.Invoice(date=date(2026, 4, 2), customer_name="B", amount=1600.0, total_amount=1600.0,
+                              owner_id=test_user.id))
+        db.flush()
+        db.execute(update(models.Invoice).where(models.Invoice.customer_name == "B").values(status=None))
+        db.commit()
+        rollups.rebuild(db, owner_id=test_user.id)
+        assert rollups.check(db) == []
+
+        summary = client.get("/api/invoices/summary/monthly?year=2026&month=4", headers=auth_headers).json()
+        # As the ledger scan had it: a missing status is listed as draft but only real drafts and sent are pending
+        assert summary["pending_amount"] == 300.0
+        assert summary["total_amount"] == 3100.0
+        assert summary["by_status"] == {"draft": 3, "sent": 1, "cancelled": 1}
+
+
+class TestRebuildAndCheck:
+    def test_check_detects_drift_and_rebuild_repairs_it(self, client, auth_headers, db, test_user):
+        client.post("/api/expenses/", json={
+            "date": "2026-04-01", "description": "Tea", "amount": 20, "category": "food",
+        }, headers=auth_headers)
+        # Ledger row written behind crud's back — rollups never heard about it
+        db.add(models.Expense(date=date(2026, 4, 3), description="Backdated", amount=99.0,
+                              category="misc", owner_id=test_user.id))
+        db.commit()
+
+        mismatches = rollups.check(db)
+        assert len(mismatches) == 1
+        assert mismatches[0]["table"] == "expenses"
+        assert mismatches[0]["actual"] is None
+
+        rollups.rebuild(db, owner_id=test_user.id)
+        assert rollups.check(db) == []
+        summary = client.get("/api/expenses/summary/monthly?year=2026&month=4", headers=auth_headers).json()
+        assert summary["total_amount"] == 119.0
+        assert summary["expense_count"] == 2
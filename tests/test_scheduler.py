@@ -0,0 +1,100 @@
+"""
+Background scheduler tests — overdue sweep, tombstone pruning, rollup upkeep, worker lease and /health reporting.
+"""
+import asyncio
+import pytest
+from datetime import date, datetime, timedelta
+
+from backend import models, rollups, scheduler
+from backend.crud import mark_overdue_invoices
+
+
+def _invoice(client, headers, status, due_date, total=1180):
+    r = client.post("/api/invoices/", json={
+        "date": "2026-04-01", "customer_name": "Rahul", "amount": total / 1.18, "total_amount": total,
+        "status": status, "due_date": due_date,
+    }, headers=headers)
+    return r.json()["id"]
+
+
+class TestOverdueSweep:
+    def test_only_sent_and_past_due_invoices_flip(self, client, auth_headers, db):
+        late = _invoice(client, auth_headers, "sent", "2026-04-10")
+        not_due = _invoice(client, auth_headers, "sent", "2026-04-20")
+        draft = _invoice(client, auth_headers, "draft", "2026-04-10")
+        paid = _invoice(client, auth_headers, "paid", "2026-04-10")
+        no_due_date = _invoice(client, auth_headers, "sent", None)
+
+        assert mark_overdue_invoices(db, date(2026, 4, 15)) == 1
+
+        statuses = {i["id"]: i["status"] for i in client.get("/api/invoices/", headers=auth_headers).json()}
+        assert statuses == {late: "overdue", not_due: "sent", draft: "draft", paid: "paid", no_due_date: "sent"}
+        summary = client.get("/api/invoices/summary/monthly?year=2026&month=4", headers=auth_headers).json()
+        assert summary["overdue_count"] == 1
+        assert rollups.check(db) == []
+
+    def test_sweep_covers_every_tenant(self, client, auth_headers, second_auth_headers, db):
+        _invoice(client, auth_headers, "sent", "2026-04-10")
+        _invoice(client, second_auth_headers, "sent", "2026-04-10", total=2360)
+        assert mark_overdue_invoices(db, date(2026, 5, 1)) == 2
+        assert mark_overdue_invoices(db, date(2026, 5, 1)) == 0  # idempotent
+        assert rollups.check(db) == []
+
+
+class TestLease:
+    def test_one_holder_at_a_time(self, db):
+        now = datetime(2026, 4, 1, 12, 0)
+        assert scheduler.acquire_lease(db, "job", "worker-a", 60, now=now)
+        assert not scheduler.acquire_lease(db, "job", "worker-b", 60, now=now + timedelta(seconds=30))
+        assert scheduler.acquire_lease(db, "job", "worker-a", 60, now=now + timedelta(seconds=30))  # renewal
+
+    def test_expired_lease_is_taken_over(self, db):
+        now = datetime(2026, 4, 1, 12, 0)
+        assert scheduler.acquire_lease(db, "job", "worker-a", 60, now=now)
+        assert scheduler.acquire_lease(db, "job", "worker-b", 60, now=now + timedelta(seconds=61))
+        assert db.get(models.SchedulerLease, "job").holder == "worker-b"
+
+    def test_job_skips_when_another_worker_holds_it(self, db):
+        assert scheduler.run_overdue_job(db, holder="worker-a") == 0
+        assert scheduler.run_overdue_job(db, holder="worker-b") is None
+
+
+class TestTombstoneJob:
+    def test_prunes_past_max_age_and_records_the_run(self, db, test_user):
+        db.add(models.SyncTombstone(owner_id=test_user.id, entity="expenses", entity_id=1, deleted_at=datetime(2020, 1, 1)))
+        db.commit()
+        assert scheduler.run_tombstone_job(db, holder="worker-a") == 1
+        assert db.query(models.SyncTombstone).count() == 0
+        assert scheduler.job_status(db)[scheduler.TOMBSTONE_JOB]["last_result"] == 1
+
+
+class TestReporting:
+    def test_run_is_recorded_and_shown_in_health(self, client, auth_headers, db):
+        _invoice(client, auth_headers, "sent", "2026-04-10")
+        assert scheduler.run_overdue_job(db, holder="worker-a", today=date(2026, 5, 1)) == 1
+
+        health = client.get("/health").json()
+        job = health["scheduler"]["jobs"][scheduler.OVERDUE_JOB]
+        assert job["holder"] == "worker-a"
+        assert job["last_result"] == 1
+        assert job["last_run_at"] is not None and job["last_duration_ms"] >= 0
+        assert job["last_error"] is None
+
+
+class TestSchedulerLoop:
+    @pytest.mark.asyncio
+    async def test_runs_on_start_and_stops_cleanly(self, db, monkeypatch):
+        runs = []
+        monkeypatch.setattr(scheduler, "run_overdue_job", lambda session, **kw: runs.append(kw))
+        monkeypatch.setattr(scheduler, "run_tombstone_job", lambda session, **kw: runs.append(kw))
+
+        jobs = scheduler.Scheduler(lambda: db, interval_seconds=3600)
+        jobs.start()
+        for _ in range(100):
+            if len(runs) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await jobs.stop()
+
+        assert len(runs) == 2
+        assert all(run["ttl_seconds"] == 7200 for run in runs)
@@ -0,0 +1,69 @@
+"""
+Full-text search tests — trigram matching, Hinglish/Devanagari tokens, ranking, index sync.
+"""
+
+
+def _add_expense(client, headers, **fields):
+    payload = {"date": "2026-04-01", "amount": 100, **fields}
+    r = client.post("/api/expenses/", json=payload, headers=headers)
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+class TestExpenseSearchFilter:
+    def test_substring_and_case_insensitive(self, client, auth_headers):
+        _add_expense(client, auth_headers, description="Petrol", vendor="Indian Oil")
+        _add_expense(client, auth_headers, description="Lunch", vendor="Zomato")
+        response = client.get("/api/expenses/?search=PETR", headers=auth_headers)
+        assert [e["description"] for e in response.json()] == ["Petrol"]
+
+    def test_every_term_must_match_in_any_order(self, client, auth_headers):
+        _add_expense(client, auth_headers, description="Diesel bhara", vendor="HP Pump")
+        _add_expense(client, auth_headers, description="Diesel", vendor="Indian Oil")
+        response = client.get("/api/expenses/?search=pump diesel", headers=auth_headers)
+        assert [e["vendor"] for e in response.json()] == ["HP Pump"]
+
+    def test_devanagari_and_hinglish_tokens(self, client, auth_headers):
+        _add_expense(client, auth_headers, description="आज पेट्रोल भरा", notes="gaadi ka kharcha")
+        _add_expense(client, auth_headers, description="Chai pani")
+        assert len(client.get("/api/expenses/?search=पेट्रोल", headers=auth_headers).json()) == 1
+        assert len(client.get("/api/expenses/?search=kharch", headers=auth_headers).json()) == 1
+        assert len(client.get("/api/expenses/?search=chai-pani", headers=auth_headers).json()) == 1
+
+    def test_short_terms_fall_back_to_substring_match(self, client, auth_headers):
+        _add_expense(client, auth_headers, description="Tea", vendor="HP")
+        _add_expense(client, auth_headers, description="Lunch")
+        response = client.get("/api/expenses/?search=hp", headers=auth_headers)
+        assert [e["description"] for e in response.json()] == ["Tea"]
+
+    def test_index_follows_updates_and_deletes(self, client, auth_headers):
+        expense_id = _add_expense(client, auth_headers, description="Stationery")
+        client.put(f"/api/expenses/{expense_id}", json={"description": "Printer ink"}, headers=auth_headers)
+        assert client.get("/api/expenses/?search=stationery", headers=auth_headers).json() == []
+        assert len(client.get("/api/expenses/?search=printer", headers=auth_headers).json()) == 1
+        client.delete(f"/api/expenses/{expense_id}", headers=auth_headers)
+        assert client.get("/api/expenses/?search=printer", headers=auth_headers).json() == []
+
+    def test_search_is_owner_scoped(self, client, auth_headers, second_auth_headers):
+        _add_expense(client, auth_headers, description="Secret supplier")
+        response = client.get("/api/expenses/?search=supplier", headers=second_auth_headers)
+        assert response.json() == [], "DATA LEAKAGE via search!"
+
+
+class TestRankedSearch:
+    def test_best_match_first(self, client, auth_headers):
+        _add_expense(client, auth_headers, description="Office supplies", notes="cement bags for site")
+        _add_expense(client, auth_headers, description="Cement", vendor="Cement Depot")
+        response = client.get("/api/expenses/search?q=cement", headers=auth_headers)
+        assert response.status_code == 200
+        assert [e["description"] for e in response.json()] == ["Cement", "Office supplies"]
+
+    def test_invoice_search(self, client, auth_headers, second_auth_headers):
+        client.post("/api/invoices/", json={
+            "date": "2026-04-01", "customer_name": "Sharma Traders", "description": "Website",
+            "amount": 100, "total_amount": 118,
+        }, headers=auth_headers)
+        response = client.get("/api/invoices/search?q=sharma", headers=auth_headers)
+        assert [i["customer_name"] for i in response.json()] == ["Sharma Traders"]
+        assert client.get("/api/invoices/?search=trader", headers=auth_headers).json()[0]["customer_name"] == "Sharma Traders"
+        assert client.get("/api/invoices/search?q=sharma", headers=second_auth_headers).json() == []
@@ -0,0 +1,177 @@
+"""
+Single-flight tests — concurrent identical summary requests share one computation.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from backend import async_crud, crud, rollups, schemas, singleflight
+
+CALLERS = 8
+APRIL = (date(2026, 4, 1), date(2026, 4, 30))
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _run_threads(target, n):
+    results, errors = [None] * n, []
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+class TestGroup:
+    def test_concurrent_callers_share_one_call(self):
+        group, calls = singleflight.Group(), []
+
+        def slow():
+            calls.append(1)
+            _wait_for(lambda: group.shared == CALLERS - 1)
+            return {"total": 42}
+
+        results, errors = _run_threads(lambda: group.do("k", slow), CALLERS)
+        assert errors == [] and len(calls) == 1
+        assert all(r is results[0] for r in results)
+
+    def test_error_reaches_every_waiter(self):
+        group = singleflight.Group()
+
+        def failing():
+            _wait_for(lambda: group.shared == CALLERS - 1)
+            raise ValueError("boom")
+
+        _, errors = _run_threads(lambda: group.do("k", failing), CALLERS)
+        assert len(errors) == CALLERS and all(isinstance(e, ValueError) for e in errors)
+        assert group.do("k", lambda: "fresh") == "fresh"  # nothing left in flight
+
+    def test_different_keys_run_independently(self):
+        group = singleflight.Group()
+        assert group.do("a", lambda: 1) == 1
+        assert group.do("b", lambda: 2) == 2
+        assert group.shared == 0
+
+
+class TestSummaryCoalescing:
+    def test_threads_run_one_summary_query(self, db, test_user, monkeypatch):
+        user_id = test_user.id
+        crud.create_invoice(db, schemas.InvoiceCreate(
+            date=date(2026, 4, 1), customer_name="Rahul", amount=1000, total_amount=1180,
+        ), user_id)
+        engine = db.get_bind().engine
+        Session = sessionmaker(bind=engine, autoflush=False)
+        shared_before = crud.summary_flights.shared
+
+        compute = rollups.invoice_summary
+
+        def held_open(*args):
+            # Keep the flight open until every other caller has joined it
+            _wait_for(lambda: crud.summary_flights.shared - shared_before == CALLERS - 1)
+            return compute(*args)
+
+        monkeypatch.setattr(rollups, "invoice_summary", held_open)
+        queries = []
+        capture = lambda conn, cursor, statement, *args: queries.append(statement)
+
+        def request():
+            session = Session()
+            try:
+                return crud.get_invoice_summary(session, user_id, *APRIL, period_label="2026-04")
+            finally:
+                session.close()
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            results, errors = _run_threads(request, CALLERS)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert errors == []
+        assert len([q for q in queries if "invoice_daily_rollups" in q]) == 1
+        assert all(r["total_amount"] == 1180 for r in results)
+
+
+@pytest.mark.asyncio
+class TestAsyncSummaryCoalescing:
+    async def test_coroutines_share_one_round_trip(self, async_db, test_user, monkeypatch):
+        user_id = test_user.id
+        calls = []
+        compute = rollups.expense_summary
+        monkeypatch.setattr(rollups, "expense_summary", lambda *args: calls.append(1) or compute(*args))
+
+        sessions = [AsyncSession(async_db.bind) for _ in range(CALLERS)]
+        try:
+            results = await asyncio.gather(*(
+                async_crud.get_expense_summary(session, user_id, *APRIL, period_label="2026-04")
+                for session in sessions
+            ))
+        finally:
+            for session in sessions:
+                await session.close()
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+
+    async def test_cancelled_caller_does_not_cancel_the_flight(self):
+        group, started = singleflight.AsyncGroup(), asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(group.do("k", slow))
+        await started.wait()
+        second = asyncio.ensure_future(group.do("k", slow))
+        first.cancel()
+        assert await second == "done"
+        assert group.shared == 1
+
+    async def test_flight_does_not_use_the_leaders_session(self, async_db, test_user):
+        user_id = test_user.id
+        leader_db, follower_db = AsyncSession(async_db.bind), AsyncSession(async_db.bind)
+        dropped = False
+        run_sync = leader_db.run_sync
+
+        async def closing_run_sync(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            if dropped:
+                raise RuntimeError("leader's session was closed")
+            return await run_sync(*args, **kwargs)
+
+        leader_db.run_sync = closing_run_sync
+        try:
+            leader = asyncio.ensure_future(async_crud.get_expense_summary(leader_db, user_id, *APRIL))
+            await asyncio.sleep(0)  # the leader starts the flight
+            follower = asyncio.ensure_future(async_crud.get_expense_summary(follower_db, user_id, *APRIL))
+            await asyncio.sleep(0)
+            # The leader's request is dropped and get_async_db closes its session
+            leader.cancel()
+            dropped = True
+            summary = await follower
+        finally:
+            await leader_db.close()
+            await follower_db.close()
+
+        assert summary["total_amount"] == 0
+        assert leader.cancelled()
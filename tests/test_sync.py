@@ -0,0 +1,128 @@
+"""
+Delta sync tests — changed rows, tombstones for deletes, tokens and owner isolation.
+"""
+from datetime import datetime
+
+from sqlalchemy import text, update
+
+from backend import crud, models
+
+
+def _age_everything(db):
+    """Pretend every existing row was last touched long ago."""
+    long_ago = datetime(2020, 1, 1)
+    db.execute(update(models.Expense).values(updated_at=long_ago))
+    db.execute(update(models.Invoice).values(updated_at=long_ago))
+    db.execute(update(models.SyncTombstone).values(deleted_at=long_ago))
+    db.commit()
+
+
+def _expense(client, headers, description, amount=100):
+    r = client.post("/api/expenses/", json={"date": "2026-04-01", "description": description, "amount": amount}, headers=headers)
+    return r.json()["id"]
+
+
+class TestDeltaSync:
+    def test_initial_sync_returns_everything(self, client, auth_headers):
+        _expense(client, auth_headers, "Tea")
+        client.post("/api/invoices/", json={
+            "date": "2026-04-01", "customer_name": "Rahul", "amount": 100, "total_amount": 118,
+        }, headers=auth_headers)
+
+        data = client.get("/api/sync", headers=auth_headers).json()
+        assert [e["description"] for e in data["expenses"]] == ["Tea"]
+        assert [i["customer_name"] for i in data["invoices"]] == ["Rahul"]
+        assert data["deleted_expenses"] == [] and data["next_token"]
+
+    def test_only_changes_since_token_are_returned(self, client, auth_headers, db):
+        kept = _expense(client, auth_headers, "Unchanged")
+        deleted = _expense(client, auth_headers, "To delete")
+        edited = _expense(client, auth_headers, "To edit")
+        _age_everything(db)
+        token = client.get("/api/sync", headers=auth_headers).json()["next_token"]
+
+        client.put(f"/api/expenses/{edited}", json={"amount": 250}, headers=auth_headers)
+        client.delete(f"/api/expenses/{deleted}", headers=auth_headers)
+        added = _expense(client, auth_headers, "New")
+
+        data = client.get(f"/api/sync?since={token}", headers=auth_headers).json()
+        assert sorted(e["id"] for e in data["expenses"]) == sorted([edited, added])
+        assert kept not in [e["id"] for e in data["expenses"]]
+        assert data["deleted_expenses"] == [deleted]
+        assert data["invoices"] == [] and data["deleted_invoices"] == []
+
+    def test_bulk_and_background_updates_are_synced(self, client, auth_headers, db):
+        r = client.post("/api/invoices/", json={
+            "date": "2026-04-01", "customer_name": "Rahul", "amount": 100, "total_amount": 118,
+        }, headers=auth_headers)
+        _age_everything(db)
+        token = client.get("/api/sync", headers=auth_headers).json()["next_token"]
+
+        client.post("/api/invoices/bulk/mark-sent", json={"ids": [r.json()["id"]]}, headers=auth_headers)
+
+        data = client.get(f"/api/sync?since={token}", headers=auth_headers).json()
+        assert [i["status"] for i in data["invoices"]] == ["sent"]
+
+    def test_other_users_changes_are_invisible(self, client, auth_headers, second_auth_headers, db):
+        _age_everything(db)
+        token = client.get("/api/sync", headers=auth_headers).json()["next_token"]
+        theirs = _expense(client, second_auth_headers, "Theirs")
+        client.delete(f"/api/expenses/{theirs}", headers=second_auth_headers)
+
+        data = client.get(f"/api/sync?since={token}", headers=auth_headers).json()
+        assert data["expenses"] == [] and data["deleted_expenses"] == []
+
+    def test_reused_id_is_an_upsert_not_a_delete(self, client, auth_headers, db):
+        _expense(client, auth_headers, "Old")
+        last = _expense(client, auth_headers, "Last")
+        _age_everything(db)
+        token = client.get("/api/sync", headers=auth_headers).json()["next_token"]
+
+        client.delete(f"/api/expenses/{last}", headers=auth_headers)
+        reused = _expense(client, auth_headers, "Replacement")  # SQLite hands out the max id again
+
+        data = client.get(f"/api/sync?since={token}", headers=auth_headers).json()
+        assert [e["id"] for e in data["expenses"]] == [reused]
+        assert reused not in data["deleted_expenses"]
+
+    def test_write_in_the_same_second_as_the_token(self, client, auth_headers, db):
+        expense = _expense(client, auth_headers, "Boundary")
+        _age_everything(db)
+        token = client.get("/api/sync", headers=auth_headers).json()["next_token"]
+        # Stamp the row the way SQLite's CURRENT_TIMESTAMP would within the token's second
+        second = crud.decode_sync_token(token).strftime("%Y-%m-%d %H:%M:%S")
+        db.execute(text("UPDATE expenses SET updated_at = :t WHERE id = :id"), {"t": second, "id": expense})
+        db.execute(text("INSERT INTO sync_tombstones (owner_id, entity, entity_id, deleted_at) "
+                        "SELECT owner_id, 'invoices', 999, :t FROM expenses WHERE id = :id"), {"t": second, "id": expense})
+        db.commit()
+
+        data = client.get(f"/api/sync?since={token}", headers=auth_headers).json()
+        assert [e["id"] for e in data["expenses"]] == [expense]
+        assert data["deleted_invoices"] == [999]
+
+    def test_token_past_max_age_gets_a_full_resync(self, client, auth_headers, db):
+        kept = _expense(client, auth_headers, "Kept")
+        _age_everything(db)
+        stale = crud.encode_sync_token(datetime(2020, 1, 1))
+
+        data = client.get(f"/api/sync?since={stale}", headers=auth_headers).json()
+        assert data["full_resync"] is True
+        assert [e["id"] for e in data["expenses"]] == [kept]
+        fresh = client.get(f"/api/sync?since={data['next_token']}", headers=auth_headers).json()
+        assert fresh["full_resync"] is False and fresh["expenses"] == []
+
+    def test_old_tombstones_are_pruned(self, client, auth_headers, db):
+        client.delete(f"/api/expenses/{_expense(client, auth_headers, 'Old delete')}", headers=auth_headers)
+        _age_everything(db)
+        recent = _expense(client, auth_headers, "Recent delete")
+        client.delete(f"/api/expenses/{recent}", headers=auth_headers)
+
+        assert crud.prune_sync_tombstones(db) == 1
+        assert [t.entity_id for t in db.query(models.SyncTombstone)] == [recent]
+
+    def test_invalid_token(self, client, auth_headers):
+        response = client.get("/api/sync?since=not-a-token", headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_requires_auth(self, client):
+        assert client.get("/api/sync").status_code == 401
@@ -2,9 +2,26 @@
 Webhook endpoint tests — text processing and image upload with mocked Gemini API.
 Tests the full pipeline: text → intent → extraction → database save.
 """
+import json
 import pytest
+from types import SimpleNamespace
 from unittest.mock import patch, AsyncMock, MagicMock
 
+from backend import llm_service
+from backend.config import settings
+
+
+@pytest.fixture(autouse=True)
+def llm_intents_only(monkeypatch):
+    """Send every message to the mocked LLM; TestLocalIntent turns the local classifier back on."""
+    monkeypatch.setattr(settings, "LOCAL_INTENT_ENABLED", False)
+
+
+@pytest.fixture
+def two_step_path(monkeypatch):
+    """Route text through classify_intent + extract_* (the fallback path)."""
+    monkeypatch.setattr(settings, "LLM_COMBINED_EXTRACTION", False)
+
 
 # Mock the Gemini model responses
 def _mock_classify(intent):
@@ -56,6 +73,7 @@ def _mock_chat():
     return mock_fn
 
 
+@pytest.mark.usefixtures("two_step_path")
 class TestTextWebhook:
     @patch("backend.routers.webhook.llm_service")
     def test_expense_recording_via_text(self, mock_llm, client, auth_headers):
@@ -161,3 +179,156 @@ class TestImageWebhook:
         fake = io.BytesIO(b"\x00" * 10)
         response = client.post("/api/webhook/image", files={"image": ("x.png", fake, "image/png")})
         assert response.status_code == 401
+
+
+@pytest.mark.usefixtures("two_step_path")
+class TestWebhookSummary:
+    @patch("backend.routers.webhook.llm_service")
+    def test_summary_request_reads_this_month(self, mock_llm, client, auth_headers):
+        from datetime import date
+        today = date.today().isoformat()
+        client.post("/api/expenses/", json={
+            "date": today, "description": "Chai", "amount": 40, "gst_amount": 2,
+        }, headers=auth_headers)
+        mock_llm.classify_intent = AsyncMock(return_value="summary_request")
+
+        response = client.post("/api/webhook/text", json={"text": "Is mahine ka hisaab"}, headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["total_amount"] == 40.0
+        assert data["expense_count"] == 1
+        assert data["gst_total"] == 2.0
+
+
+class TestCombinedExtraction:
+    EXPENSE = {
+        "date": "2026-04-05", "description": "Petrol", "amount": 2200.0, "category": "fuel",
+        "vendor": "HP Pump", "payment_method": "upi", "gst_applicable": False,
+    }
+
+    @patch("backend.routers.webhook.llm_service")
+    def test_expense_needs_one_call(self, mock_llm, client, auth_headers):
+        mock_llm.classify_and_extract = AsyncMock(return_value={"intent": "expense_record", "data": self.EXPENSE})
+        mock_llm.classify_intent = AsyncMock()
+        mock_llm.extract_expense = AsyncMock()
+
+        response = client.post("/api/webhook/text", json={"text": "Paid 2200 for petrol"}, headers=auth_headers)
+
+        assert response.json()["data"]["expense_id"] > 0
+        mock_llm.classify_and_extract.assert_awaited_once()
+        mock_llm.classify_intent.assert_not_awaited()
+        mock_llm.extract_expense.assert_not_awaited()
+
+    @patch("backend.routers.webhook.llm_service")
+    def test_unusable_combined_answer_falls_back_to_two_calls(self, mock_llm, client, auth_headers):
+        mock_llm.classify_and_extract = AsyncMock(return_value=None)
+        mock_llm.classify_intent = AsyncMock(return_value="expense_record")
+        mock_llm.extract_expense = AsyncMock(return_value=self.EXPENSE)
+
+        response = client.post("/api/webhook/text", json={"text": "Paid 2200 for petrol"}, headers=auth_headers)
+
+        assert response.json()["status"] == "ok"
+        mock_llm.classify_intent.assert_awaited_once()
+        mock_llm.extract_expense.assert_awaited_once()
+
+    @patch("backend.routers.webhook.llm_service")
+    def test_missing_payload_is_extracted_separately(self, mock_llm, client, auth_headers):
+        mock_llm.classify_and_extract = AsyncMock(return_value={"intent": "expense_record", "data": None})
+        mock_llm.classify_intent = AsyncMock()
+        mock_llm.extract_expense = AsyncMock(return_value=self.EXPENSE)
+
+        response = client.post("/api/webhook/text", json={"text": "Paid 2200 for petrol"}, headers=auth_headers)
+
+        assert response.json()["status"] == "ok"
+        mock_llm.classify_intent.assert_not_awaited()
+        mock_llm.extract_expense.assert_awaited_once()
+
+
+class TestLocalIntent:
+    @pytest.fixture(autouse=True)
+    def local_intents(self, monkeypatch):
+        monkeypatch.setattr(settings, "LOCAL_INTENT_ENABLED", True)
+
+    @patch("backend.routers.webhook.llm_service")
+    def test_obvious_summary_needs_no_llm_call(self, mock_llm, client, auth_headers):
+        mock_llm.classify_and_extract = AsyncMock()
+        mock_llm.classify_intent = AsyncMock()
+
+        response = client.post("/api/webhook/text", json={"text": "Is mahine ka hisaab dikhao"}, headers=auth_headers)
+
+        assert response.json()["data"]["expense_count"] == 0
+        mock_llm.classify_and_extract.assert_not_awaited()
+        mock_llm.classify_intent.assert_not_awaited()
+
+    @patch("backend.routers.webhook.llm_service")
+    def test_local_expense_goes_straight_to_extraction(self, mock_llm, client, auth_headers):
+        mock_llm.classify_and_extract = AsyncMock()
+        mock_llm.extract_expense = AsyncMock(return_value=TestCombinedExtraction.EXPENSE)
+
+        response = client.post("/api/webhook/text", json={"text": "Paid 2200 for petrol"}, headers=auth_headers)
+
+        assert response.json()["status"] == "ok"
+        mock_llm.classify_and_extract.assert_not_awaited()
+        mock_llm.extract_expense.assert_awaited_once()
+
+    @patch("backend.routers.webhook.llm_service")
+    def test_unsure_messages_go_to_the_llm(self, mock_llm, client, auth_headers, monkeypatch):
+        monkeypatch.setattr(settings, "LOCAL_INTENT_THRESHOLD", 1.01)
+        mock_llm.classify_and_extract = AsyncMock(return_value={"intent": "fallback", "data": None})
+        mock_llm.chat_response = AsyncMock(return_value="Hello!")
+
+        client.post("/api/webhook/text", json={"text": "hello"}, headers=auth_headers)
+
+        mock_llm.classify_and_extract.assert_awaited_once()
+
+    def test_simple_expense_needs_no_gemini_call(self, client, auth_headers, monkeypatch):
+        calls = []
+
+        async def generate(prompt, **kwargs):
+            calls.append(prompt)
+            return SimpleNamespace(text="{}")
+
+        monkeypatch.setattr(llm_service, "_model", SimpleNamespace(generate_content_async=generate))
+        response = client.post("/api/webhook/text", json={"text": "₹500 petrol cash"}, headers=auth_headers)
+
+        extracted = response.json()["data"]["extracted"]
+        assert (extracted["amount"], extracted["category"], extracted["payment_method"]) == (500.0, "fuel", "cash")
+        assert calls == []
+
+
+class TestClassifyAndExtract:
+    """llm_service.classify_and_extract against a canned model reply."""
+
+    @pytest.fixture
+    def reply(self, monkeypatch):
+        calls = []
+
+        def set_reply(text):
+            async def generate(prompt, **kwargs):
+                calls.append(kwargs)
+                return SimpleNamespace(text=text)
+            monkeypatch.setattr(llm_service, "_model", SimpleNamespace(generate_content_async=generate))
+            return calls
+        return set_reply
+
+    @pytest.mark.asyncio
+    async def test_invoice_payload_gets_gst_and_total(self, reply):
+        calls = reply(json.dumps({"intent": "invoice_create", "expense": None, "invoice": {
+            "customer_name": "Rahul", "description": "Website design", "amount": 1000, "gst_rate": 18.0,
+        }}))
+        result = await llm_service.classify_and_extract("Invoice Rahul 1000 for website design")
+        assert result["intent"] == "invoice_create"
+        assert result["data"]["total_amount"] == 1180.0
+        assert calls[0]["generation_config"]["response_mime_type"] == "application/json"
+
+    @pytest.mark.asyncio
+    async def test_non_extraction_intents_carry_no_payload(self, reply):
+        reply('{"intent": "gst_query", "expense": null, "invoice": null}')
+        assert await llm_service.classify_and_extract("GST on cement?") == {"intent": "gst_query", "data": None}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("text", ["not json at all", '{"intent": "buy_stocks"}'])
+    async def test_unusable_replies_return_none(self, reply, text):
+        reply(text)
+        assert await llm_service.classify_and_extract("anything") is None